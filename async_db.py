@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+asyncio용 데이터베이스 접근 모듈
+SQLite 작업을 전용 스레드 하나에서 실행하여 이벤트 루프(브라우저 I/O)가 DB 대기로 멈추지 않게 합니다.
+
+    db = get_database()
+    await db.setup()
+    latest = await db.get_latest(url)
+    await db.save_snapshot(url, ...)   # 기록 대기열에 넣을 때까지만 대기 (가득 차면 자리가 날 때까지)
+    await db.write(commit_static_state, url, result)   # 그 밖의 쓰기도 같은 기록 대기열로
+    await db.run(record_fetch, url, "ok", ...)
+    await db.close()                   # 남은 스냅샷을 모두 커밋
+
+읽기는 run()으로 DB 스레드에서, 쓰기는 snapshot_writer의 일괄 기록 스레드에서 실행하고,
+아직 커밋되지 않은 쓰기 요청이 max_pending개를 넘으면 save_snapshot()/write()가 이벤트 루프를 막지 않고 기다립니다.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from config.config import SNAPSHOT_WRITER
+from database import setup_database, get_latest_snapshot_meta, close_connection
+from snapshot_writer import get_writer
+
+class AsyncDatabase:
+    """전용 DB 스레드 + 스냅샷 기록 대기열 (역압 적용)"""
+
+    def __init__(self, writer=None, max_pending=None):
+        self.writer = writer or get_writer()
+        self.max_pending = max_pending or SNAPSHOT_WRITER["queue_size"]
+        self._executor = None
+        self._pid = None
+        self._slots = None
+        self._stats = {"pending": 0, "waits": 0, "max_wait_ms": 0.0}
+
+    def _get_executor(self):
+        # fork된 자식 프로세스에서는 부모의 스레드를 쓸 수 없으므로 새로 만든다
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="async-db")
+            self._pid = os.getpid()
+        return self._executor
+
+    async def run(self, fn, *args, **kwargs):
+        """동기 DB 함수를 DB 스레드에서 실행하고 결과를 기다림"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), partial(fn, *args, **kwargs))
+
+    async def setup(self):
+        await self.run(setup_database)
+
+    async def get_latest(self, url):
+        """최신 스냅샷 메타데이터 (database.get_latest_snapshot_meta)"""
+        return await self.run(get_latest_snapshot_meta, url)
+
+    async def save_snapshot(self, url, content_hash, html_content, html_size=0, change_detected=False, change_details=None, blob_hash=None,
+                            normalized_hash=None, ruleset_version=None, fingerprint=None, dom_hash=None, surface=None, surface_hash=None):
+        """
+        스냅샷을 기록 대기열에 넣고 커밋 완료를 알리는 concurrent.futures.Future 반환
+        커밋되지 않은 요청이 max_pending개면 하나가 커밋될 때까지 대기 (이벤트 루프는 막지 않음)
+        """
+        return await self._submit(partial(
+            self.writer.submit, url, content_hash, html_content, html_size, change_detected, change_details, blob_hash=blob_hash,
+            normalized_hash=normalized_hash, ruleset_version=ruleset_version,
+            fingerprint=fingerprint, dom_hash=dom_hash, surface=surface, surface_hash=surface_hash
+        ))
+
+    async def write(self, fn, *args, **kwargs):
+        """
+        fn(conn, *args, **kwargs)를 기록 대기열에 넣고 Future 반환 (스냅샷과 같은 배치 트랜잭션에서 실행, 역압 동일)
+        """
+        return await self._submit(partial(self.writer.submit_write, fn, *args, **kwargs))
+
+    async def _submit(self, submit):
+        """대기열 자리를 확보한 뒤 submit()으로 요청을 넣고, 커밋되면 자리를 반환하도록 등록"""
+        loop = asyncio.get_running_loop()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        slots = self._slots
+        if slots.locked():
+            self._stats["waits"] += 1
+            started = time.perf_counter()
+            await slots.acquire()
+            self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], (time.perf_counter() - started) * 1000)
+        else:
+            await slots.acquire()
+
+        self._stats["pending"] += 1
+        # 대기열 자리는 세마포어로 확보했으므로 submit()은 막히지 않는다
+        future = submit()
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(self._release, slots)
+            except RuntimeError:
+                # 이벤트 루프가 이미 닫힘 (close() 없이 종료한 경우)
+                pass
+        future.add_done_callback(release)
+        return future
+
+    def _release(self, slots):
+        self._stats["pending"] -= 1
+        slots.release()
+
+    async def flush(self):
+        """지금까지 넣은 스냅샷이 모두 커밋될 때까지 대기"""
+        await asyncio.to_thread(self.writer.flush)
+
+    async def close(self):
+        """남은 스냅샷을 커밋하고 기록 스레드와 DB 스레드 종료"""
+        await asyncio.to_thread(self.writer.close)
+        if self._executor is not None and self._pid == os.getpid():
+            await self.run(close_connection)
+            self._executor.shutdown(wait=True)
+        self._executor, self._pid, self._slots = None, None, None
+
+    def stats(self):
+        """역압 통계: 커밋 대기 중인 요청 수, 대기열이 가득 차서 기다린 횟수와 최대 대기 시간"""
+        stats = dict(self._stats)
+        stats["max_wait_ms"] = round(stats["max_wait_ms"], 1)
+        return stats
+
+_database = AsyncDatabase()
+
+def get_database():
+    """프로세스 공용 비동기 DB 인터페이스 반환"""
+    return _database
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML 블롭 저장소 모듈
+HTML 본문을 SHA256 해시를 키로 blobs 테이블에 한 번만 저장하고,
+스냅샷 행은 해시(blob_hash)로 본문을 참조합니다.
+
+저장 방식(encoding)
+    raw  : UTF-8 원문
+    zlib : 압축된 원문 (키프레임)
+    delta: 이전 버전(base_hash)에 대한 압축된 차분
+delta 모드에서는 키프레임부터 최대 keyframe_interval - 1개의 차분만 적용하면
+어떤 버전이든 복원할 수 있습니다.
+"""
+
+import codecs
+import difflib
+import hashlib
+import json
+import re
+import zlib
+
+from config.config import SNAPSHOT_STORAGE
+
+# 스트리밍 읽기 단위 (바이트)
+CHUNK_SIZE = 64 * 1024
+
+# 차분 단위: 태그 끝('>')이나 줄바꿈까지 (한 줄로 압축된 HTML도 잘게 나뉨)
+TOKEN_PATTERN = re.compile(r'[^>\n]*[>\n]|[^>\n]+')
+
+def blob_key(html):
+    """HTML 본문의 저장 키 (UTF-8 바이트의 SHA256)"""
+    return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+def make_delta(old, new, level=6):
+    """
+    old -> new 차분을 압축하여 반환
+    형식: [[시작, 끝], "삽입 문자열", ...] (숫자 쌍은 old 토큰 구간 복사)
+    """
+    old_tokens = TOKEN_PATTERN.findall(old)
+    new_tokens = TOKEN_PATTERN.findall(new)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(new_tokens[j1:j2]))
+    return zlib.compress(json.dumps(ops, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), level)
+
+def apply_delta(old, delta):
+    """make_delta()로 만든 차분을 old에 적용하여 새 버전 복원"""
+    old_tokens = TOKEN_PATTERN.findall(old)
+    parts = []
+    for op in json.loads(zlib.decompress(delta).decode('utf-8')):
+        if isinstance(op, list):
+            parts.extend(old_tokens[op[0]:op[1]])
+        else:
+            parts.append(op)
+    return "".join(parts)
+
+def _blob_info(conn, key):
+    row = conn.execute("SELECT encoding, chain_length FROM blobs WHERE hash = ?", (key,)).fetchone()
+    return {"encoding": row[0], "chain_length": row[1]} if row else None
+
+def _encode(conn, html, base_key, storage):
+    """저장 방식에 맞게 본문을 인코딩 -> (encoding, content, base_hash, chain_length)"""
+    data = html.encode('utf-8')
+    if storage["mode"] != "delta":
+        return "raw", data, None, 0
+
+    keyframe = zlib.compress(data, storage["compression_level"])
+    base = _blob_info(conn, base_key) if base_key else None
+    if base and base["chain_length"] + 1 < storage["keyframe_interval"]:
+        delta = make_delta(get_blob(conn, base_key), html, storage["compression_level"])
+        # 차분이 충분히 작을 때만 사용 (크게 바뀐 버전은 키프레임으로)
+        if len(delta) < len(keyframe) * storage["max_delta_ratio"]:
+            return "delta", delta, base_key, base["chain_length"] + 1
+    return "zlib", keyframe, None, 0
+
+def put_blob(conn, html, created_at=None, base_key=None, storage=None):
+    """
+    본문을 저장하고 키를 반환 (같은 본문이 이미 있으면 저장하지 않음)
+    delta 모드에서는 base_key(보통 같은 URL의 직전 본문)에 대한 차분으로 저장
+    빈 본문은 저장하지 않고 None 반환
+    """
+    if not html:
+        return None
+    key = blob_key(html)
+    if conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (key,)).fetchone():
+        return key
+    encoding, content, base_hash, chain_length = _encode(conn, html, base_key, storage or SNAPSHOT_STORAGE)
+    conn.execute(
+        "INSERT OR IGNORE INTO blobs (hash, size, content, created_at, encoding, base_hash, chain_length) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (key, len(html.encode('utf-8')), content, created_at, encoding, base_hash, chain_length)
+    )
+    return key
+
+def get_blob(conn, key):
+    """키로 본문 조회 - 차분이면 키프레임부터 복원 (없으면 None)"""
+    if not key:
+        return None
+    chain = []
+    while True:
+        row = conn.execute("SELECT encoding, content, base_hash FROM blobs WHERE hash = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        encoding, content, base_hash = row
+        if encoding != "delta":
+            break
+        chain.append(bytes(content))
+        key = base_hash
+
+    html = bytes(content).decode('utf-8') if encoding == "raw" else zlib.decompress(content).decode('utf-8')
+    for delta in reversed(chain):
+        html = apply_delta(html, delta)
+    return html
+
+def iter_blob(conn, key, chunk_size=CHUNK_SIZE):
+    """
+    키로 본문을 chunk_size 바이트 단위로 읽어 문자열 조각으로 반환하는 제너레이터
+    raw/zlib은 incremental blob I/O로 필요한 만큼만 읽고, 차분은 복원 후 나누어 반환
+    """
+    row = conn.execute("SELECT id, encoding FROM blobs WHERE hash = ?", (key,)).fetchone() if key else None
+    if row is None:
+        return
+    blob_id, encoding = row
+    if encoding == "delta":
+        html = get_blob(conn, key)
+        for start in range(0, len(html), chunk_size):
+            yield html[start:start + chunk_size]
+        return
+
+    # 조각 경계에서 잘린 멀티바이트 문자는 다음 조각과 합쳐서 디코딩
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    decompressor = zlib.decompressobj() if encoding == "zlib" else None
+    with conn.blobopen("blobs", "content", blob_id, readonly=True) as blob:
+        while True:
+            data = blob.read(chunk_size)
+            if not data:
+                break
+            if decompressor:
+                data = decompressor.decompress(data)
+            text = decoder.decode(data)
+            if text:
+                yield text
+    tail = decoder.decode(decompressor.flush() if decompressor else b"", final=True)
+    if tail:
+        yield tail
+
+class LazyHtml:
+    """
+    저장된 본문에 대한 지연 핸들
+    만들 때는 키와 크기만 가지고 있고, 실제 본문은 chunks()/read()를 호출할 때 읽습니다.
+    connect: 읽을 때 사용할 연결을 반환하는 함수 (예: database.get_connection)
+    """
+
+    def __init__(self, connect, key, size=0):
+        self._connect = connect
+        self.key = key
+        self.size = size or 0
+
+    def __bool__(self):
+        return self.key is not None
+
+    def __repr__(self):
+        return f"LazyHtml(key={self.key!r}, size={self.size})"
+
+    def chunks(self, chunk_size=CHUNK_SIZE):
+        """본문을 조각 단위로 스트리밍"""
+        if self.key is None:
+            return iter(())
+        return iter_blob(self._connect(), self.key, chunk_size)
+
+    def read(self):
+        """본문 전체를 읽어 반환 (없으면 빈 문자열)"""
+        return "".join(self.chunks())
+
+def repack_blobs(conn, storage=None, batch_size=200):
+    """
+    기존 raw 블롭을 URL별 시간 순서에 따라 키프레임/차분으로 다시 저장
+    다른 블롭의 기준(base)으로 쓰이는 블롭은 키프레임으로만 바꾼다 (차분 체인 길이 유지)
+    반환: {"blobs": 변환 수, "bytes_before": ..., "bytes_after": ...}
+    """
+    storage = storage or SNAPSHOT_STORAGE
+    stats = {"blobs": 0, "bytes_before": 0, "bytes_after": 0}
+    urls = [row[0] for row in conn.execute("SELECT DISTINCT url FROM snapshots WHERE blob_hash IS NOT NULL")]
+    for url in urls:
+        previous = None
+        rows = conn.execute(
+            "SELECT blob_hash FROM snapshots WHERE url = ? AND blob_hash IS NOT NULL ORDER BY timestamp",
+            (url,)
+        ).fetchall()
+        for (key,) in rows:
+            if key == previous:
+                continue
+            row = conn.execute("SELECT encoding, content FROM blobs WHERE hash = ?", (key,)).fetchone()
+            if row and row[0] == "raw":
+                html = bytes(row[1]).decode('utf-8')
+                is_base = conn.execute("SELECT 1 FROM blobs WHERE base_hash = ? LIMIT 1", (key,)).fetchone()
+                base_key = None if is_base else previous
+                encoding, content, base_hash, chain_length = _encode(conn, html, base_key, storage)
+                conn.execute(
+                    "UPDATE blobs SET encoding = ?, content = ?, base_hash = ?, chain_length = ? WHERE hash = ?",
+                    (encoding, content, base_hash, chain_length, key)
+                )
+                stats["blobs"] += 1
+                stats["bytes_before"] += len(row[1])
+                stats["bytes_after"] += len(content)
+                if stats["blobs"] % batch_size == 0:
+                    conn.commit()
+            previous = key
+    conn.commit()
+    return stats
+
+if __name__ == "__main__":
+    from database import get_connection, setup_database
+
+    # 기존 raw 블롭을 현재 설정(SNAPSHOT_STORAGE)의 방식으로 다시 저장
+    setup_database()
+    with get_connection() as conn:
+        result = repack_blobs(conn)
+    print(f"블롭 {result['blobs']}개 변환: {result['bytes_before']:,} -> {result['bytes_after']:,} bytes")
+    print("디스크 공간을 회수하려면 VACUUM을 실행하세요.")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+브라우저 풀 모듈
+Chromium을 한 번만 실행하고, Stealth가 적용된 컨텍스트를 미리 만들어 두었다가
+요청마다 빌려주고 사용 후 정리하여 재사용합니다.
+
+컨텍스트는 같은 호스트끼리만 재사용합니다. 쿠키는 clear_cookies()로 지울 수 있지만
+localStorage/sessionStorage/IndexedDB/서비스 워커는 출처별로 남으므로,
+다른 호스트에 쓰였던 컨텍스트는 닫고 새로 만들어 사이트 사이에 상태가 넘어가지 않게 합니다.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from playwright.async_api import async_playwright
+from playwright_stealth import Stealth
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
+
+# 브라우저 컨텍스트 설정: 로케일, 타임존, 뷰포트
+CONTEXT_OPTIONS = {
+    "user_agent": USER_AGENT,
+    "extra_http_headers": {
+        "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7"
+    },
+    "locale": "ko-KR",  # 한국어 로케일 설정
+    "timezone_id": "Asia/Seoul",  # 한국 표준시 설정
+    "viewport": {"width": 1920, "height": 1080},  # 일반적인 데스크톱 해상도
+}
+
+class BrowserPool:
+    """
+    하나의 브라우저 프로세스 위에서 컨텍스트를 빌려주는 풀
+
+    size: 동시에 빌려줄 수 있는 최대 컨텍스트 수 (시작 시 모두 미리 생성)
+    max_uses: 한 컨텍스트를 재사용할 최대 횟수 (초과 시 닫고 새로 생성)
+    유휴 항목: [컨텍스트 (None이면 빌려줄 때 생성), 사용 횟수, 마지막으로 사용한 호스트 (새 컨텍스트는 None)]
+    """
+
+    def __init__(self, browser_type="chromium", headless=True, size=4, max_uses=20):
+        self.browser_type = browser_type
+        self.headless = headless
+        self.size = size
+        self.max_uses = max_uses
+        self._playwright = None
+        self._browser = None
+        self._stealth = Stealth()
+        self._idle = None
+        self._available = None
+
+    async def start(self):
+        """브라우저를 실행하고 컨텍스트를 미리 만들어 둡니다."""
+        if self._browser is not None:
+            return self
+        self._playwright = await async_playwright().start()
+        browser_launcher = getattr(self._playwright, self.browser_type)
+        try:
+            self._browser = await browser_launcher.launch(headless=self.headless)
+        except Exception:
+            # 실행 실패 시 드라이버 프로세스가 남지 않도록 정리
+            await self._playwright.stop()
+            self._playwright = None
+            raise
+        self._idle = [[await self._new_context(), 0, None] for _ in range(self.size)]
+        self._available = asyncio.Semaphore(self.size)
+        logging.info(f"브라우저 풀 시작: {self.browser_type}, 컨텍스트 {self.size}개")
+        return self
+
+    async def close(self):
+        """모든 컨텍스트와 브라우저를 종료합니다."""
+        if self._browser is None:
+            return
+        try:
+            await self._browser.close()
+        finally:
+            await self._playwright.stop()
+            self._browser = None
+            self._playwright = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _new_context(self):
+        """Stealth가 적용된 새 컨텍스트 생성"""
+        context = await self._browser.new_context(**CONTEXT_OPTIONS)
+        # Stealth 기능 적용 - bot 탐지 우회 (컨텍스트의 모든 페이지에 적용됨)
+        await self._stealth.apply_stealth_async(context)
+        return context
+
+    def _take_idle(self, host):
+        """유휴 항목 선택: 같은 호스트에 쓰던 것 > 새 컨텍스트 > 아무거나 (다른 호스트 것은 _acquire에서 교체)"""
+        for wanted in ((host,) if host is not None else ()) + (None,):
+            for index, entry in enumerate(self._idle):
+                if entry[2] == wanted:
+                    return self._idle.pop(index)
+        return self._idle.pop(0)
+
+    async def _acquire(self, host):
+        """유휴 컨텍스트를 빌려옴 (다른 호스트에 쓰였던 컨텍스트는 닫고, 비어 있는 항목은 새로 생성)"""
+        context, uses, last_host = self._take_idle(host)
+        if context is not None and last_host is not None and last_host != host:
+            try:
+                await context.close()
+            except Exception as e:
+                logging.warning(f"컨텍스트 종료 실패: {e}")
+            context = None
+        if context is None:
+            try:
+                context, uses = await self._new_context(), 0
+            except Exception:
+                # 생성에 실패해도 풀 크기는 유지 (다음 요청에서 다시 생성)
+                self._idle.append([None, 0, None])
+                raise
+        return context, uses
+
+    async def _recycle(self, context, uses, host):
+        """사용이 끝난 컨텍스트를 정리하여 풀에 반환 (사용 횟수 초과 시 닫고 다음 요청에서 새로 생성)"""
+        try:
+            if uses >= self.max_uses:
+                await context.close()
+                context = None
+            else:
+                for page in context.pages:
+                    await page.close()
+                await context.clear_cookies()
+        except Exception as e:
+            # 정리 중 오류가 난 컨텍스트는 버리고 다음 요청에서 새로 만든다
+            logging.warning(f"컨텍스트 정리 실패, 새로 생성합니다: {e}")
+            context = None
+        if context is None:
+            self._idle.append([None, 0, None])
+        else:
+            # 호스트를 모르고 쓴 컨텍스트는 어떤 호스트와도 공유하지 않음
+            self._idle.append([context, uses, host if host is not None else object()])
+
+    @asynccontextmanager
+    async def context(self, host=None):
+        """
+        풀에서 컨텍스트를 빌려오고, 블록이 끝나면 정리 후 반환합니다.
+        host: 방문할 호스트 (같은 호스트에 쓰였던 컨텍스트만 재사용, 생략하면 새 컨텍스트)
+        """
+        if self._browser is None:
+            await self.start()
+        # 풀이 비어 있으면 다른 작업이 컨텍스트를 반환할 때까지 대기
+        await self._available.acquire()
+        try:
+            context, uses = await self._acquire(host)
+            try:
+                yield context
+            finally:
+                await self._recycle(context, uses + 1, host)
+        finally:
+            self._available.release()
+
+    @asynccontextmanager
+    async def page(self, host=None):
+        """빌려온 컨텍스트에서 새 페이지를 열어 반환합니다."""
+        async with self.context(host) as context:
+            yield await context.new_page()
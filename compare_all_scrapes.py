@@ -10,19 +10,50 @@ import re
 from datetime import datetime
 from collections import defaultdict
 
-from compare_snapshots import read_html_file, find_differences
+from config.urls import KYOBO_URLS
+from compare_snapshots import read_html_file, find_differences, find_security_changes, find_structural_changes
+from pack_archive import PackReader, pack_paths
 
 # 스크랩된 HTML 파일이 저장된 기본 디렉토리
 BASE_SCRAPES_DIR = r"C:\Users\KICO\scrapes"
 
+# 비교 대상 파일명: <서비스>_<HHMMSS>.html 또는 <서비스>_<HHMMSS>_rendered.html (정적 HTML은 제외)
+SNAPSHOT_FILE_PATTERN = re.compile(r'(.+)_(\d{6})(?:_rendered)?\.html$')
+
+# (관계사, 서비스) -> 대상 URL (사이트별 정규화 규칙 적용용)
+TARGET_URLS = {(company, service): url for company, service, url in KYOBO_URLS}
+
 def get_latest_scrape_dir():
-    """가장 최근에 생성된 스크랩 디렉토리를 찾아서 반환"""
-    all_scrape_dirs = [d for d in os.listdir(BASE_SCRAPES_DIR) if os.path.isdir(os.path.join(BASE_SCRAPES_DIR, d)) and d.startswith("kyobo_scraping_")]
-    all_scrape_dirs.sort(key=lambda x: datetime.strptime(x, "kyobo_scraping_%Y-%m-%d"), reverse=True)
-    if all_scrape_dirs:
-        return os.path.join(BASE_SCRAPES_DIR, all_scrape_dirs[0])
+    """가장 최근 날짜의 스크랩 경로를 반환 (디렉토리 또는 같은 이름의 .pack 파일)"""
+    dates = set()
+    for name in os.listdir(BASE_SCRAPES_DIR):
+        match = re.match(r'kyobo_scraping_(\d{4}-\d{2}-\d{2})(\.pack)?$', name)
+        if match and (match.group(2) or os.path.isdir(os.path.join(BASE_SCRAPES_DIR, name))):
+            dates.add(match.group(1))
+    if dates:
+        latest = max(dates, key=lambda d: datetime.strptime(d, "%Y-%m-%d"))
+        return os.path.join(BASE_SCRAPES_DIR, f"kyobo_scraping_{latest}")
     return None
 
+def list_scrape_files(scrape_dir, pack_reader=None):
+    """
+    스크랩 경로의 HTML 목록 {(관계사, 파일명): 읽기 함수}
+    디렉토리의 파일과 팩 파일의 레코드를 모두 포함 (같은 이름이면 팩 우선)
+    """
+    files = {}
+    if os.path.isdir(scrape_dir):
+        for company_name in os.listdir(scrape_dir):
+            company_path = os.path.join(scrape_dir, company_name)
+            if os.path.isdir(company_path):
+                for filename in os.listdir(company_path):
+                    path = os.path.join(company_path, filename)
+                    files[(company_name, filename)] = lambda path=path: read_html_file(path)
+    if pack_reader is not None:
+        for name in pack_reader.names():
+            company_name, _, filename = name.partition("/")
+            files[(company_name, filename)] = lambda name=name: pack_reader.read(name)
+    return files
+
 def compare_latest_two_snapshots():
     """각 페이지별로 최근 두 개의 스냅샷을 비교하여 차이점을 출력"""
     latest_scrape_dir = get_latest_scrape_dir()
@@ -33,19 +64,25 @@ def compare_latest_two_snapshots():
     print(f"최근 스크랩 디렉토리: {latest_scrape_dir}")
     print("--------------------------------------------------")
 
+    pack_path, _ = pack_paths(latest_scrape_dir)
+    pack_reader = PackReader(latest_scrape_dir) if os.path.exists(pack_path) else None
+    try:
+        compare_scrape_files(list_scrape_files(latest_scrape_dir, pack_reader))
+    finally:
+        if pack_reader is not None:
+            pack_reader.close()
+
+def compare_scrape_files(files):
+    """list_scrape_files() 결과를 서비스별로 묶어 최근 두 개를 비교"""
     # 관계사별로 파일들을 그룹화
     company_files = defaultdict(lambda: defaultdict(list))
-    for company_name in os.listdir(latest_scrape_dir):
-        company_path = os.path.join(latest_scrape_dir, company_name)
-        if os.path.isdir(company_path):
-            for filename in os.listdir(company_path):
-                if filename.endswith(".html"):
-                    # 파일명에서 서비스명과 타임스탬프 추출
-                    match = re.match(r'(.+)_(\d{6})\.html', filename)
-                    if match:
-                        service_name = match.group(1)
-                        timestamp = match.group(2)
-                        company_files[company_name][service_name].append((timestamp, os.path.join(company_path, filename)))
+    for (company_name, filename), load in files.items():
+        # 파일명에서 서비스명과 타임스탬프 추출
+        match = SNAPSHOT_FILE_PATTERN.match(filename)
+        if match:
+            service_name = match.group(1)
+            timestamp = match.group(2)
+            company_files[company_name][service_name].append((timestamp, filename, load))
     
     # 각 서비스별로 최근 두 개의 스냅샷 비교
     for company, services in company_files.items():
@@ -55,17 +92,24 @@ def compare_latest_two_snapshots():
             snapshots.sort(key=lambda x: x[0], reverse=True)
             
             if len(snapshots) >= 2:
-                latest_timestamp, latest_file = snapshots[0]
-                second_latest_timestamp, second_latest_file = snapshots[1]
+                latest_timestamp, latest_file, load_latest = snapshots[0]
+                second_latest_timestamp, second_latest_file, load_second = snapshots[1]
 
                 print(f"\n--- 서비스: {service} ---")
-                print(f"  최신 스냅샷: {os.path.basename(latest_file)}")
-                print(f"  2번째 스냅샷: {os.path.basename(second_latest_file)}")
+                print(f"  최신 스냅샷: {latest_file}")
+                print(f"  2번째 스냅샷: {second_latest_file}")
 
-                html1 = read_html_file(latest_file)
-                html2 = read_html_file(second_latest_file)
+                html1 = load_latest()
+                html2 = load_second()
 
                 if html1 is not None and html2 is not None:
+                    url = TARGET_URLS.get((company, service))
+                    security = find_security_changes(html2, html1, url)
+                    if security:
+                        print(f"  보안 요소 변경: {security}")
+                    structural = find_structural_changes(html2, html1, url)
+                    if structural:
+                        print(f"  구조 변경: {structural}")
                     diff_result = find_differences(html1, html2, f"{service} (최신)", f"{service} (2번째)")
                     print(diff_result)
                 else:
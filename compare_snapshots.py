@@ -4,9 +4,16 @@
 HTML 파일 비교 유틸리티
 """
 
-import difflib
 import re
 
+from diff_engine import diff_html
+from dom_fingerprint import diff, fingerprint, format_changes
+from normalizer import normalize
+from security_surface import compare, extract, format_findings
+
+# 비교 결과에 표시할 최대 diff 줄 수
+MAX_DIFF_LINES = 50
+
 def read_html_file(filename):
     """HTML 파일을 읽어서 내용을 반환"""
     try:
@@ -25,23 +32,15 @@ def find_differences(html1, html2, label1, label2):
         diff_output.append("완전히 동일합니다.")
         return "\n".join(diff_output)
     
-    # 라인별로 분할
-    lines1 = html1.splitlines()
-    lines2 = html2.splitlines()
-    
-    # unified diff 생성
-    diff = list(difflib.unified_diff(
-        lines1, lines2, 
-        fromfile=label1, tofile=label2, 
-        lineterm='', n=3
-    ))
+    # 필요한 만큼(처음 50줄)만 계산하는 diff 엔진 (압축된 긴 줄은 태그 경계에서 나눠 비교)
+    diff = diff_html(html1, html2, label1, label2, max_lines=MAX_DIFF_LINES + 1)
     
     if diff:
         diff_output.append("차이점 발견:")
-        for line in diff[:50]:  # 처음 50줄만 출력
+        for line in diff[:MAX_DIFF_LINES]:
             diff_output.append(line)
-        if len(diff) > 50:
-            diff_output.append(f"... (총 {len(diff)}개 라인 중 처음 50개만 표시)")
+        if len(diff) > MAX_DIFF_LINES:
+            diff_output.append(f"... (처음 {MAX_DIFF_LINES}줄만 표시)")
     else:
         diff_output.append("라인별 차이는 없지만 전체 내용이 다릅니다.")
     
@@ -51,6 +50,20 @@ def find_differences(html1, html2, label1, label2):
 
     return "\n".join(diff_output)
 
+def find_structural_changes(old_html, new_html, url=None, limit=10):
+    """
+    두 HTML의 구조 지문을 비교하여 변경된 요소 경로 요약 반환 (구조 변경이 없으면 빈 문자열)
+    저장된 지문과 같이 동적 요소를 정규화한 뒤 비교 (url: 사이트별 정규화 규칙 적용)
+    """
+    return format_changes(diff(fingerprint(normalize(old_html, url)), fingerprint(normalize(new_html, url))), limit)
+
+def find_security_changes(old_html, new_html, url, limit=10):
+    """
+    두 HTML의 보안 표면(폼 action, 스크립트, iframe, 외부 출처, meta refresh)을 비교하여 심각도 순 요약 반환 (변경이 없으면 빈 문자열)
+    저장된 기록과 같이 동적 요소를 정규화한 뒤 추출 (url: 정규화 규칙, 상대 경로 해석과 외부 출처 판별 기준)
+    """
+    return format_findings(compare(extract(normalize(old_html, url), url), extract(normalize(new_html, url), url)), limit)
+
 def extract_dynamic_elements(html):
     """동적 요소들을 추출해서 표시"""
     # 타임스탬프 패턴
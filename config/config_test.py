@@ -11,3 +11,51 @@ DATABASE_PATH = "test_snapshots_monitor.db"
 
 # CSV 요약 보고서 파일 경로 (테스트용)
 CSV_REPORT_SIMPLE = "test_monitoring_report_simple.csv"
+
+# 브라우저 풀 크기
+BROWSER_POOL_SIZE = 1
+
+# 동시 가져오기 상한 (전체 / 호스트별)
+MAX_CONCURRENCY = 1
+MAX_PER_HOST = 1
+
+# HTTP 사전 검사(조건부 요청 + 정적 HTML 해시) 후 필요할 때만 브라우저 렌더링
+PRECHECK_ENABLED = True
+
+# 작업 큐 임대 시간 (초, 워커가 이 시간 안에 끝내지 못하면 다른 워커가 다시 가져감)
+JOB_LEASE_SECONDS = 300
+
+# 호스트별 회로 차단기 (연속 실패 failure_threshold회부터 base_backoff초 * 2^n, 최대 max_backoff초 동안 건너뜀)
+CIRCUIT_BREAKER = {"failure_threshold": 3, "base_backoff": 300, "max_backoff": 6 * 3600}
+
+# 대상별 적응형 타임아웃 (평균 + deviations * 편차, min_ms~max_ms 범위, min_samples 미만이면 max_ms)
+TIMEOUT_BUDGET = {"min_ms": 15000, "max_ms": 90000, "deviations": 4, "min_samples": 3}
+
+# 스냅샷 HTML 저장 방식
+#   mode: "blob"(원문) 또는 "delta"(압축 키프레임 + 직전 버전 대비 압축 차분)
+#   keyframe_interval: 키프레임 사이 최대 버전 수 (복원 시 적용하는 차분은 최대 keyframe_interval - 1개)
+#   max_delta_ratio: 차분이 키프레임 대비 이 비율보다 크면 키프레임으로 저장
+SNAPSHOT_STORAGE = {"mode": "delta", "keyframe_interval": 20, "compression_level": 6, "max_delta_ratio": 0.5}
+
+# 스냅샷 일괄 기록 (쓰기 전용 스레드가 최대 batch_size건 또는 flush_interval초마다 한 트랜잭션으로 커밋)
+#   queue_size: 대기열 상한 (가득 차면 제출하는 쪽이 대기)
+SNAPSHOT_WRITER = {"batch_size": 50, "flush_interval": 0.5, "queue_size": 1000}
+
+# 스냅샷 보존 정책 (retention.py)
+#   tiers: 스냅샷 나이가 after_days일 이상이면 keep 방식 적용 ("daily": 변경 시점 + 하루 한 건, "changes": 변경 시점만)
+#   batch_size: 한 트랜잭션에서 처리할 행 수, pause: 배치 사이 대기 시간 (초)
+RETENTION = {
+    "tiers": [
+        {"after_days": 7, "keep": "daily"},
+        {"after_days": 90, "keep": "changes"},
+    ],
+    "batch_size": 500,
+    "pause": 0.05,
+}
+
+# 스크랩 HTML 보관 방식 ("files": 관계사별 HTML 파일, "pack": 날짜별 압축 팩 파일 + 인덱스)
+# "pack"은 scrapes/<날짜>/<관계사>/*.html 파일을 만들지 않으므로 그 파일을 읽는 도구가 없을 때만 사용
+ARCHIVE_BACKEND = "files"
+
+# 가져오기 지표 (metrics.py) - 원본 행 보존 기간 (시간/일 집계는 계속 유지)
+METRICS = {"raw_retention_days": 30}
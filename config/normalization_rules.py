@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML 정규화 규칙
+스냅샷 비교 전에 동적 요소(타임스탬프, 세션 토큰 등)를 고정 문자열로 바꾸는 규칙입니다.
+normalizer.py가 규칙을 미리 컴파일해 두고 목록 순서대로 하나씩 적용합니다 (뒤 규칙은 앞 규칙의 결과에 적용).
+
+규칙 항목
+  name       : 규칙 이름 (고유해야 함)
+  pattern    : 정규식
+  replacement: 치환 문자열 (\\1 또는 \\g<1> 형식의 그룹 참조 가능)
+  flags      : re 플래그 (선택)
+
+기본 규칙 <- 호스트 규칙 <- URL 규칙 순서로 이어서 적용합니다 (SITE_NORMALIZATION_RULES의 키는 호스트 또는 전체 URL).
+규칙을 바꾸면 NORMALIZATION_RULESET_VERSION을 올리세요. 버전이 다른 정규화 해시는 서로 비교할 수 없습니다.
+"""
+
+from urllib.parse import urlsplit
+
+NORMALIZATION_RULESET_VERSION = 1
+
+DEFAULT_NORMALIZATION_RULES = [
+    # CSS/JS 파일의 타임스탬프/버전 파라미터 (?v=YYYY.MM.DD.NN, ?r=YYYY.MM.DD)
+    {"name": "asset_version_date", "pattern": r"\?[tvrdt]=\d{4}\.\d{2}\.\d{2}(?:\.\d+)?", "replacement": "?v=TIMESTAMP"},
+    # CSS/JS 파일의 숫자 파라미터 (?t=숫자, ?dt=YYYYMMDD)
+    {"name": "asset_version_number", "pattern": r"\?[tvrdt]=\d+", "replacement": "?t=TIMESTAMP"},
+    # JavaScript 세션 토큰 (TNK_SR)
+    {"name": "tnk_sr_token", "pattern": r'(var\s+TNK_SR\s*=\s*["])[a-f0-9]{32}(["])', "replacement": r"\1TNK_SR_TOKEN\2"},
+    # fncAesEnc 함수 내의 암호화된 데이터
+    {"name": "aes_encrypted", "pattern": r'(fncAesEnc\(["])[a-zA-Z0-9+/=]{20,}(["]\))', "replacement": r"\1ENCRYPTED_DATA\2"},
+    # URL 파라미터 내의 InitechEamNoCacheNonce 값 (URL 인코딩된 Base64)
+    {"name": "initech_nonce", "pattern": r"(InitechEamNoCacheNonce=)[a-zA-Z0-9%+/=]+", "replacement": r"\1INITECH_NONCE_TOKEN"},
+    # gitple-loader-frame의 title 속성 (동적으로 변하는 한글 타이틀) - 같은 태그 안에서만 찾는다
+    {"name": "gitple_title", "pattern": r'(iframe id="gitple-loader-frame" [^>]*? title=")[^"]*(")', "replacement": r"\1GITPLE_TITLE\2"},
+    # body 태그의 style 속성 (display: none; 등 동적으로 추가되는 스타일)
+    {"name": "body_style", "pattern": r'<body([^>]*?) style="[^"]*"([^>]*?)>', "replacement": r"<body\1\2>"},
+    # input 태그의 value 속성 내 동적 날짜/시간 값 (dateCheck, YYYYMMDDHHMMSS)
+    {"name": "datetime_value", "pattern": r'(value=")\d{14}(")', "replacement": r"\1DATETIME_VALUE\2"},
+    # JavaScript 변수 내 날짜/시간 값 (plainText)
+    {"name": "plaintext_datetime", "pattern": r'(var\s+plainText=loginId\+")\d{14}(")', "replacement": r"\1DATETIME_VALUE\2"},
+    # body 태그의 class 속성 내 동적 클래스 (is-header 등) - body_style이 치환한 태그에 적용
+    {"name": "body_dynamic_class", "pattern": r'(<body\b[^>]*?class="[^"]*?)(?:is-header|is-floatbots|cetis-full)("[^>]*?>)', "replacement": r"\1\2"},
+]
+
+# 대상별 추가 규칙 (기본 규칙 뒤에 적용)
+SITE_NORMALIZATION_RULES = {
+}
+
+def get_normalization_rules(url=None):
+    """URL에 적용할 규칙 목록 (기본 <- 호스트 <- URL 순서)"""
+    rules = list(DEFAULT_NORMALIZATION_RULES)
+    if url:
+        rules += SITE_NORMALIZATION_RULES.get(urlsplit(url).netloc.lower(), [])
+        rules += SITE_NORMALIZATION_RULES.get(url, [])
+    return rules
+
+def rules_key(url=None):
+    """컴파일한 정규화기를 재사용할 키 (같은 규칙이 적용되는 URL끼리 같음)"""
+    if not url:
+        return None
+    host = urlsplit(url).netloc.lower()
+    return (host if host in SITE_NORMALIZATION_RULES else None, url if url in SITE_NORMALIZATION_RULES else None)
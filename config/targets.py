@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+대상별 가져오기 설정
+TARGET_SETTINGS의 키는 호스트(예: "www.kyobo.com") 또는 전체 URL이며,
+기본값 <- 호스트 설정 <- URL 설정 순서로 덮어씁니다.
+"""
+
+from urllib.parse import urlsplit
+
+# 렌더링 완료 판단 전략
+#   dom_quiet  : DOM 변경이 quiet_ms 동안 없으면 완료
+#   selector   : selector 요소가 나타나면 완료
+#   networkidle: 네트워크 유휴 후 extra_delay(초, 최소~최대) 만큼 추가 대기 (기존 방식)
+# 모든 전략은 timeout_ms를 넘기면 기다리지 않고 현재 DOM을 사용합니다.
+#
+# 요청 차단 규칙 (block)
+#   resource_types: Playwright 리소스 타입 (image, font, media, stylesheet 등)
+#   url_patterns  : 요청 URL에 대해 검색할 정규식
+# 메인 문서는 항상 허용됩니다.
+#
+# extra_headers  : 페이지 요청에 추가할 HTTP 헤더
+# max_bytes      : 메인 문서/HTML의 최대 크기 (UTF-8 바이트, 수신 중 초과 시 중단)
+# timeout_ms     : 페이지 이동 타임아웃 (생략 시 host_health.timeout_budget()의 적응형 값)
+# render_required: True이면 HTTP 사전 검사 결과와 관계없이 항상 브라우저로 렌더링
+#
+# 스케줄러 주기 (schedule, 초 단위)
+#   base_interval: 이력이 부족할 때의 주기
+#   min_interval / max_interval: 자주 바뀌는 대상 / 안정적인 대상의 주기 한계
+#   jitter: 주기에 더할 무작위 비율 (0.1 = ±10%)
+DEFAULT_TARGET_SETTINGS = {
+    "max_bytes": 10 * 1024 * 1024,
+    "schedule": {"base_interval": 3600, "min_interval": 900, "max_interval": 6 * 3600, "jitter": 0.1},
+    "readiness": {"type": "dom_quiet", "quiet_ms": 1000, "timeout_ms": 15000},
+    "block": {
+        "resource_types": ["image", "font", "media"],
+        "url_patterns": [
+            r"google-analytics\.com",
+            r"googletagmanager\.com",
+            r"doubleclick\.net",
+            r"facebook\.net",
+            r"analytics\.kakao\.com",
+            r"wcs\.naver\.net",
+        ],
+    },
+}
+
+TARGET_SETTINGS = {
+    # 교보문고 통합 로그인 (CSR, 로그인 입력창이 그려지면 완료)
+    "mmbr.kyobobook.co.kr": {
+        "readiness": {"type": "selector", "selector": "input[type=password]", "timeout_ms": 20000},
+        "block": {
+            "resource_types": ["image", "font", "media"],
+            "url_patterns": [
+                r"google-analytics\.com",
+                r"googletagmanager\.com",
+                r"gitple",  # 채팅 위젯 (gitple-loader-frame)
+            ],
+        },
+    },
+    # 교보생명은 Eversafe 스크립트가 실행되어야 실제 페이지가 그려진다
+    "www.kyobo.com": {
+        "render_required": True,
+    },
+    # 사내 SSO는 응답이 느리므로 DOM 안정 구간을 길게 잡는다
+    "sso.kyobo.com:5443": {
+        "readiness": {"type": "dom_quiet", "quiet_ms": 2000, "timeout_ms": 30000},
+    },
+}
+
+def get_target_settings(url):
+    """URL에 적용할 설정을 기본값/호스트/URL 순으로 합쳐서 반환"""
+    settings = dict(DEFAULT_TARGET_SETTINGS)
+    settings.update(TARGET_SETTINGS.get(urlsplit(url).netloc.lower(), {}))
+    settings.update(TARGET_SETTINGS.get(url, {}))
+    return settings
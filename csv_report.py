@@ -1,26 +1,164 @@
-import csv
-import os
-from datetime import datetime
-from config import CSV_REPORT_SIMPLE
-
-def save_to_csv_simple(timestamp, url, change_detected, change_details, html_content, content_hash):
-    COLUMNS = ['날짜', '시간', 'URL', '변경감지', '변경내용', 'HTML크기(문자)', '해시값(앞10자리)']
-    if not os.path.exists(CSV_REPORT_SIMPLE):
-        with open(CSV_REPORT_SIMPLE, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(COLUMNS)
-    dt = datetime.fromisoformat(timestamp)
-    date_str = dt.strftime('%Y-%m-%d')
-    time_str = dt.strftime('%H:%M:%S')
-    with open(CSV_REPORT_SIMPLE, 'a', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow([
-            date_str,
-            time_str,
-            url,
-            '변경감지' if change_detected else '변경없음',
-            change_details if change_details else 'N/A',
-            len(html_content),
-            content_hash[:10]
-        ])
-    print(f"CSV 요약 보고서(단순) 업데이트 완료: {CSV_REPORT_SIMPLE}") 
\ No newline at end of file
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+보고서 생성 모듈
+snapshots 테이블을 커서로 조금씩 읽어 CSV(또는 gzip CSV, Parquet)로 저장합니다.
+HTML 본문은 읽지 않고 행을 batch_size 단위로만 메모리에 올리므로 기간이 길어도 메모리 사용량이 일정합니다.
+
+Parquet은 pyarrow가 설치되어 있을 때만 사용할 수 있습니다 (pip install pyarrow).
+"""
+
+import csv
+import gzip
+import io
+import os
+from datetime import datetime, timedelta
+from config.config import CSV_REPORT_SIMPLE
+from database import get_connection, setup_database
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+COLUMNS = ['날짜', '시간', 'URL', '변경감지', '변경내용', 'HTML크기(문자)', '해시값(앞10자리)']
+
+# 한 번에 읽고 쓰는 행 수
+BATCH_ROWS = 5000
+
+# 파일 쓰기 버퍼 크기 (바이트)
+WRITE_BUFFER = 1024 * 1024
+
+def _csv_row(timestamp, url, change_detected, change_details, html_size, content_hash):
+    dt = datetime.fromisoformat(timestamp)
+    return [
+        dt.strftime('%Y-%m-%d'),
+        dt.strftime('%H:%M:%S'),
+        url,
+        '변경감지' if change_detected else '변경없음',
+        change_details if change_details else 'N/A',
+        html_size or 0,
+        (content_hash or '')[:10]
+    ]
+
+def save_to_csv_simple(timestamp, url, change_detected, change_details, html_content, content_hash):
+    """행 하나를 CSV 요약 보고서에 추가 (대량 보고서는 generate_report 사용)"""
+    if not os.path.exists(CSV_REPORT_SIMPLE):
+        with open(CSV_REPORT_SIMPLE, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(COLUMNS)
+    with open(CSV_REPORT_SIMPLE, 'a', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(_csv_row(timestamp, url, change_detected, change_details, len(html_content), content_hash))
+    print(f"CSV 요약 보고서(단순) 업데이트 완료: {CSV_REPORT_SIMPLE}")
+
+def iter_snapshot_batches(start=None, end=None, url=None, batch_size=BATCH_ROWS):
+    """
+    조건에 맞는 스냅샷 행을 시간순으로 batch_size개씩 반환하는 제너레이터
+    행: (timestamp, url, change_detected, change_details, html_size, content_hash)
+    start/end: 'YYYY-MM-DD' (end 날짜 포함), url: 대상 URL (None이면 전체)
+    """
+    conditions, params = [], []
+    if start:
+        conditions.append("timestamp >= ?")
+        params.append(start)
+    if end:
+        conditions.append("timestamp < ?")
+        params.append((datetime.strptime(end, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d"))
+    if url:
+        conditions.append("url = ?")
+        params.append(url)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    # 커서는 fetchmany할 때마다 필요한 만큼만 읽는다 (정렬은 timestamp 인덱스 사용)
+    cursor = get_connection().execute(
+        f"""
+        SELECT timestamp, url, change_detected, change_details, html_size, content_hash
+        FROM snapshots {where} ORDER BY timestamp, id
+        """,
+        params
+    )
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+
+def write_csv(batches, path, compress=False):
+    """행 묶음을 CSV로 저장 (compress=True이면 gzip) - 저장한 행 수 반환"""
+    if compress:
+        raw = gzip.open(path, 'wb')
+        f = io.TextIOWrapper(io.BufferedWriter(raw, WRITE_BUFFER), encoding='utf-8', newline='')
+    else:
+        f = open(path, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER)
+    count = 0
+    with f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for rows in batches:
+            writer.writerows(_csv_row(*row) for row in rows)
+            count += len(rows)
+    return count
+
+def write_parquet(batches, path):
+    """행 묶음을 zstd 압축 Parquet로 저장 (묶음마다 row group 하나) - 저장한 행 수 반환"""
+    if pa is None:
+        raise RuntimeError("Parquet 보고서에는 pyarrow가 필요합니다: pip install pyarrow")
+    schema = pa.schema([
+        ("timestamp", pa.timestamp("us")),
+        ("url", pa.string()),
+        ("change_detected", pa.bool_()),
+        ("change_details", pa.string()),
+        ("html_size", pa.int64()),
+        ("content_hash", pa.string()),
+    ])
+    count = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for rows in batches:
+            columns = list(zip(*rows))
+            writer.write_batch(pa.record_batch([
+                pa.array([datetime.fromisoformat(t) for t in columns[0]], pa.timestamp("us")),
+                pa.array(columns[1], pa.string()),
+                pa.array([bool(v) for v in columns[2]], pa.bool_()),
+                pa.array(columns[3], pa.string()),
+                pa.array(columns[4], pa.int64()),
+                pa.array(columns[5], pa.string()),
+            ], schema=schema))
+            count += len(rows)
+    return count
+
+def report_format(path):
+    """파일 확장자로 보고서 형식 결정 ('csv', 'csv.gz', 'parquet')"""
+    lower = path.lower()
+    if lower.endswith(".parquet"):
+        return "parquet"
+    if lower.endswith(".csv.gz") or lower.endswith(".gz"):
+        return "csv.gz"
+    return "csv"
+
+def generate_report(path=CSV_REPORT_SIMPLE, start=None, end=None, url=None, fmt=None, batch_size=BATCH_ROWS):
+    """스냅샷 보고서를 생성하고 저장한 행 수 반환 (형식은 fmt 또는 확장자로 결정)"""
+    fmt = fmt or report_format(path)
+    batches = iter_snapshot_batches(start, end, url, batch_size)
+    if fmt == "parquet":
+        return write_parquet(batches, path)
+    return write_csv(batches, path, compress=(fmt == "csv.gz"))
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="스냅샷 보고서 생성")
+    parser.add_argument("--output", default=CSV_REPORT_SIMPLE, help="저장 경로 (.csv, .csv.gz, .parquet)")
+    parser.add_argument("--from", dest="start", help="시작 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", help="끝 날짜 (YYYY-MM-DD, 포함)")
+    parser.add_argument("--url", help="대상 URL")
+    args = parser.parse_args()
+
+    setup_database()
+    count = generate_report(args.output, args.start, args.end, args.url)
+    print(f"보고서 저장 완료: {args.output} ({count:,}행)")
@@ -5,15 +5,66 @@
 SQLite 데이터베이스와 관련된 모든 기능을 담당합니다.
 """
 
+import logging
+import os
 import sqlite3
+import threading
 from datetime import datetime
 from config.config import DATABASE_PATH
+from blob_store import blob_key, LazyHtml
+
+# 스레드별로 열어 두고 재사용하는 연결 (데이터베이스 경로 -> 연결)
+_local = threading.local()
+
+def _open_connection(path):
+    """WAL 모드로 새 연결 생성"""
+    # 여러 워커 프로세스가 같은 파일을 쓰므로 잠금 대기 시간을 넉넉하게 둔다
+    conn = sqlite3.connect(path, timeout=30)
+    # WAL: 쓰기 중에도 다른 연결의 읽기가 막히지 않음 (설정은 파일에 유지됨)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL에서는 NORMAL이어도 커밋 단위 일관성이 보장되고 fsync 횟수가 줄어든다
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def get_connection():
+    """
+    설정된 데이터베이스 파일에 대한 연결 반환
+
+    연결은 스레드마다 한 번 열어 계속 재사용합니다.
+    `with get_connection() as conn:`은 트랜잭션만 커밋/롤백하고 연결은 닫지 않으므로 close()를 호출하지 마세요.
+    """
+    connections = getattr(_local, "connections", None)
+    if connections is None or _local.pid != os.getpid():
+        # fork된 자식 프로세스는 부모의 연결을 물려받지 않고 새로 연다
+        connections = _local.connections = {}
+        _local.pid = os.getpid()
+    conn = connections.get(DATABASE_PATH)
+    if conn is None:
+        conn = connections[DATABASE_PATH] = _open_connection(DATABASE_PATH)
+    return conn
+
+def close_connection():
+    """현재 스레드에서 열어 둔 연결을 모두 닫음"""
+    connections = getattr(_local, "connections", None) or {}
+    if getattr(_local, "pid", None) == os.getpid():
+        for conn in connections.values():
+            conn.close()
+    connections.clear()
 
 def setup_database():
     """Initializes the database and creates the snapshots table if it doesn't exist."""
-    with sqlite3.connect(DATABASE_PATH) as conn:
+    with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("""
+        CREATE TABLE IF NOT EXISTS blobs (
+            id INTEGER PRIMARY KEY,
+            hash TEXT NOT NULL UNIQUE,
+            size INTEGER NOT NULL,
+            content BLOB NOT NULL,
+            created_at TEXT
+        )
+        """)
+        cursor.execute("""
         CREATE TABLE IF NOT EXISTS snapshots (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
@@ -25,14 +76,256 @@ def setup_database():
             change_details TEXT
         )
         """)
+        # HTTP 사전 검사용 상태 (조건부 요청 검증자 + 정적 HTML 정규화 해시)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS http_state (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            static_hash TEXT,
+            checked_at TEXT NOT NULL
+        )
+        """)
+        # 여러 모니터 프로세스가 나눠 가져가는 작업 큐
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            company TEXT,
+            service TEXT,
+            url TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            lease_owner TEXT,
+            lease_expires REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            finished_at TEXT
+        )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_run_status ON jobs (run_id, status, position)")
+        # 호스트별 연속 실패 수와 회로 차단 상태
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS host_health (
+            host TEXT PRIMARY KEY,
+            consecutive_failures INTEGER NOT NULL DEFAULT 0,
+            open_until REAL,
+            last_failure TEXT,
+            last_success TEXT,
+            last_error TEXT
+        )
+        """)
+        # 대상별 가져오기 소요 시간 (지수 이동 평균/편차)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS target_latency (
+            url TEXT PRIMARY KEY,
+            samples INTEGER NOT NULL DEFAULT 0,
+            mean_ms REAL NOT NULL,
+            dev_ms REAL NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """)
+        # 보존 정책으로 삭제된 "변경 없음" 스냅샷 구간 (anchor 스냅샷부터 last_timestamp까지 동일)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS snapshot_ranges (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL,
+            anchor_snapshot_id INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            first_timestamp TEXT NOT NULL,
+            last_timestamp TEXT NOT NULL,
+            collapsed INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (url, anchor_snapshot_id)
+        )
+        """)
+        # 가져오기 한 번마다 한 행 (본문 없이 소요 시간/크기/결과만)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS fetch_metrics (
+            id INTEGER PRIMARY KEY,
+            fetched_at TEXT NOT NULL,
+            url TEXT NOT NULL,
+            host TEXT NOT NULL,
+            status TEXT NOT NULL,
+            elapsed_ms INTEGER,
+            bytes INTEGER,
+            changed BOOLEAN DEFAULT FALSE
+        )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_fetch_metrics_fetched_at ON fetch_metrics (fetched_at)")
+        # 시간(period='hour')/일(period='day') 단위 호스트별 집계
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS metric_rollups (
+            period TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            host TEXT NOT NULL,
+            fetches INTEGER NOT NULL DEFAULT 0,
+            failures INTEGER NOT NULL DEFAULT 0,
+            changes INTEGER NOT NULL DEFAULT 0,
+            bytes INTEGER NOT NULL DEFAULT 0,
+            latency_count INTEGER NOT NULL DEFAULT 0,
+            latency_sum_ms REAL NOT NULL DEFAULT 0,
+            latency_max_ms INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (period, bucket, host)
+        )
+        """)
+        # 집계 구간별 소요 시간 히스토그램 (le_ms: 구간 상한)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS latency_histogram (
+            period TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            host TEXT NOT NULL,
+            le_ms INTEGER NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (period, bucket, host, le_ms)
+        )
+        """)
+        # DOM 구조 지문 (루트 해시를 키로 한 번만 저장, 압축 JSON - dom_fingerprint.py)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS dom_fingerprints (
+            id INTEGER PRIMARY KEY,
+            hash TEXT NOT NULL UNIQUE,
+            content BLOB NOT NULL,
+            created_at TEXT
+        )
+        """)
+        # 보안 표면 기록 (내용 해시를 키로 한 번만 저장, JSON - security_surface.py)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS security_surfaces (
+            id INTEGER PRIMARY KEY,
+            hash TEXT NOT NULL UNIQUE,
+            content TEXT NOT NULL,
+            created_at TEXT
+        )
+        """)
         conn.commit()
+        migrate(conn)
 
-def get_latest_snapshot(url):
-    """Retrieves the most recent snapshot for a given URL from the database."""
-    with sqlite3.connect(DATABASE_PATH) as conn:
+def _migrate_snapshots_to_blobs(conn):
+    """v1: 스냅샷의 html_content를 blobs 테이블로 옮기고 blob_hash로 참조"""
+    conn.execute("ALTER TABLE snapshots ADD COLUMN blob_hash TEXT")
+    moved = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, timestamp, html_content FROM snapshots WHERE blob_hash IS NULL AND html_content != '' LIMIT 500"
+        ).fetchall()
+        if not rows:
+            break
+        for snapshot_id, timestamp, html_content in rows:
+            # 이후 버전의 저장 방식과 무관하게 v1 스키마 그대로(raw) 저장
+            data = html_content.encode('utf-8')
+            key = blob_key(html_content)
+            conn.execute(
+                "INSERT OR IGNORE INTO blobs (hash, size, content, created_at) VALUES (?, ?, ?, ?)",
+                (key, len(data), data, timestamp)
+            )
+            conn.execute("UPDATE snapshots SET blob_hash = ?, html_content = '' WHERE id = ?", (key, snapshot_id))
+        moved += len(rows)
+    logging.info(f"스냅샷 {moved}건의 HTML을 blobs 테이블로 이전")
+
+def _add_blob_encoding(conn):
+    """v2: 블롭 압축/차분 저장을 위한 컬럼 추가 (기존 블롭은 raw)"""
+    conn.execute("ALTER TABLE blobs ADD COLUMN encoding TEXT NOT NULL DEFAULT 'raw'")
+    conn.execute("ALTER TABLE blobs ADD COLUMN base_hash TEXT")
+    conn.execute("ALTER TABLE blobs ADD COLUMN chain_length INTEGER NOT NULL DEFAULT 0")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_blobs_base_hash ON blobs (base_hash)")
+
+def _add_latest_snapshots(conn):
+    """v3: (url, timestamp) 인덱스와 URL별 최신 스냅샷 테이블 추가"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_url_timestamp ON snapshots (url, timestamp)")
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS latest_snapshots (
+        url TEXT PRIMARY KEY,
+        snapshot_id INTEGER NOT NULL,
+        timestamp TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        blob_hash TEXT,
+        html_size INTEGER,
+        change_detected BOOLEAN
+    )
+    """)
+    conn.execute("""
+    INSERT OR REPLACE INTO latest_snapshots (url, snapshot_id, timestamp, content_hash, blob_hash, html_size, change_detected)
+    SELECT s.url, s.id, s.timestamp, s.content_hash, s.blob_hash, s.html_size, s.change_detected
+    FROM snapshots s
+    WHERE s.id = (SELECT id FROM snapshots WHERE url = s.url ORDER BY timestamp DESC, id DESC LIMIT 1)
+    """)
+
+def _add_snapshot_blob_index(conn):
+    """v4: 고아 블롭 정리를 위한 snapshots.blob_hash 인덱스"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_blob_hash ON snapshots (blob_hash)")
+
+def _add_snapshot_timestamp_index(conn):
+    """v5: 기간별 보고서 조회를 위한 snapshots.timestamp 인덱스"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_timestamp ON snapshots (timestamp)")
+
+def _add_normalized_hash(conn):
+    """v6: 스냅샷별 정규화 해시와 정규화 규칙 버전 (기존 행은 비교할 때 다시 계산)"""
+    for table in ("snapshots", "latest_snapshots"):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN normalized_hash TEXT")
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN ruleset_version INTEGER")
+
+def _add_dom_hash(conn):
+    """v7: 스냅샷별 DOM 구조 지문 참조 (기존 행은 비교할 때 계산)"""
+    for table in ("snapshots", "latest_snapshots"):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN dom_hash TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_dom_hash ON snapshots (dom_hash)")
+
+def _add_surface_hash(conn):
+    """v8: 스냅샷별 보안 표면 기록 참조 (기존 행은 비교할 때 추출)"""
+    for table in ("snapshots", "latest_snapshots"):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN surface_hash TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_surface_hash ON snapshots (surface_hash)")
+
+# (스키마 버전, 마이그레이션 함수) - 새 버전은 목록 끝에 추가
+MIGRATIONS = [
+    (1, _migrate_snapshots_to_blobs),
+    (2, _add_blob_encoding),
+    (3, _add_latest_snapshots),
+    (4, _add_snapshot_blob_index),
+    (5, _add_snapshot_timestamp_index),
+    (6, _add_normalized_hash),
+    (7, _add_dom_hash),
+    (8, _add_surface_hash),
+]
+
+def migrate(conn):
+    """PRAGMA user_version 기준으로 아직 적용되지 않은 마이그레이션을 순서대로 실행"""
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    for version, migration in MIGRATIONS:
+        if version <= current:
+            continue
+        isolation_level = conn.isolation_level
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # 쓰기 잠금을 잡은 뒤 다시 확인 (다른 프로세스가 먼저 적용했으면 건너뜀)
+            current = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version <= current:
+                conn.execute("COMMIT")
+                continue
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.isolation_level = isolation_level
+        logging.info(f"데이터베이스 스키마 v{version} 적용")
+
+def get_latest_snapshot_meta(url):
+    """
+    URL의 최신 스냅샷 메타데이터 (본문은 읽지 않음)
+    html은 필요할 때 본문을 스트리밍으로 읽는 LazyHtml 핸들
+    """
+    with get_connection() as conn:
         cursor = conn.cursor()
+        # latest_snapshots는 스냅샷 저장과 같은 트랜잭션에서 갱신되므로 기본 키 조회 한 번으로 충분
         cursor.execute(
-            "SELECT timestamp, content_hash, html_content, html_size FROM snapshots WHERE url = ? ORDER BY timestamp DESC LIMIT 1",
+            """
+            SELECT timestamp, content_hash, blob_hash, html_size, snapshot_id, normalized_hash, ruleset_version, dom_hash, surface_hash
+            FROM latest_snapshots WHERE url = ?
+            """,
             (url,)
         )
         result = cursor.fetchone()
@@ -40,9 +333,104 @@ def get_latest_snapshot(url):
             return {
                 "timestamp": result[0],
                 "hash": result[1],
-                "html_content": result[2],
-                "html_size": result[3]
+                "blob_hash": result[2],
+                "html_size": result[3],
+                "snapshot_id": result[4],
+                "normalized_hash": result[5],
+                "ruleset_version": result[6],
+                "dom_hash": result[7],
+                "surface_hash": result[8],
+                "html": LazyHtml(get_connection, result[2], result[3])
+            }
+        return None
+
+def get_baseline_snapshot(url):
+    """
+    변경 비교의 기준이 되는 URL의 마지막 성공 스냅샷 메타데이터 (실패 기록은 건너뜀, 없으면 None)
+    반환: {"snapshot_id", "hash", "blob_hash", "html_size", "normalized_hash", "ruleset_version", "dom_hash", "surface_hash", "html": LazyHtml}
+    """
+    with get_connection() as conn:
+        # 대부분 최신 스냅샷이 기준이므로 latest_snapshots를 먼저 보고, 최신이 실패 기록일 때만 이력을 거슬러 올라간다
+        row = conn.execute(
+            """
+            SELECT snapshot_id, content_hash, blob_hash, html_size, normalized_hash, ruleset_version, dom_hash, surface_hash
+            FROM latest_snapshots WHERE url = ? AND content_hash != ''
+            """,
+            (url,)
+        ).fetchone()
+        if row is None:
+            row = conn.execute(
+                """
+                SELECT id, content_hash, blob_hash, html_size, normalized_hash, ruleset_version, dom_hash, surface_hash
+                FROM snapshots WHERE url = ? AND content_hash != ''
+                ORDER BY timestamp DESC, id DESC LIMIT 1
+                """,
+                (url,)
+            ).fetchone()
+    if row is None:
+        return None
+    return {
+        "snapshot_id": row[0],
+        "hash": row[1],
+        "blob_hash": row[2],
+        "html_size": row[3],
+        "normalized_hash": row[4],
+        "ruleset_version": row[5],
+        "dom_hash": row[6],
+        "surface_hash": row[7],
+        "html": LazyHtml(get_connection, row[2], row[3])
+    }
+
+def get_latest_snapshot(url):
+    """Retrieves the most recent snapshot for a given URL from the database."""
+    meta = get_latest_snapshot_meta(url)
+    if meta is None:
+        return None
+    return {
+        "timestamp": meta["timestamp"],
+        "hash": meta["hash"],
+        "html_content": meta["html"].read(),
+        "html_size": meta["html_size"]
+    }
+
+def get_change_history(url, limit=20):
+    """URL의 최근 스냅샷 (timestamp, change_detected) 목록 (최신순, HTML 제외)"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT timestamp, change_detected FROM snapshots WHERE url = ? ORDER BY timestamp DESC LIMIT ?",
+            (url, limit)
+        )
+        return [(timestamp, bool(changed)) for timestamp, changed in cursor.fetchall()]
+
+def get_http_state(url):
+    """URL의 마지막 HTTP 사전 검사 상태 조회"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT etag, last_modified, static_hash, checked_at FROM http_state WHERE url = ?",
+            (url,)
+        )
+        result = cursor.fetchone()
+        if result:
+            return {
+                "etag": result[0],
+                "last_modified": result[1],
+                "static_hash": result[2],
+                "checked_at": result[3]
             }
         return None
 
- 
\ No newline at end of file
+def save_http_state(conn, url, etag, last_modified, static_hash):
+    """URL의 HTTP 사전 검사 상태 저장 (덮어쓰기, 커밋은 호출자가 담당)"""
+    conn.execute(
+        """
+        INSERT INTO http_state (url, etag, last_modified, static_hash, checked_at) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(url) DO UPDATE SET
+            etag = excluded.etag,
+            last_modified = excluded.last_modified,
+            static_hash = excluded.static_hash,
+            checked_at = excluded.checked_at
+        """,
+        (url, etag, last_modified, static_hash, datetime.now().isoformat())
+    )
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML 텍스트 비교 엔진
+두 HTML을 줄 단위로 나누고(한 줄로 압축된 긴 줄은 태그 경계에서 다시 나눔), 각 줄을 정수로 바꾼 뒤
+Myers O(ND) 알고리즘(선형 공간 분할 정복)으로 편집 경로를 구합니다.
+양쪽에 한 번씩만 나오는 줄을 기준점으로 먼저 문서를 나누므로, Myers는 기준점 사이의 작은 구간에만 적용됩니다.
+
+편집 구간은 문서 앞쪽부터 필요할 때만 계산하는 제너레이터이므로,
+출력 줄 수 제한에 도달하면 뒤쪽 구간은 계산하지 않고 멈춥니다.
+한 구간의 편집 거리가 max_cost를 넘으면 그 구간은 통째로 삭제/추가로 보고합니다 (최악의 경우에도 시간 상한 유지).
+
+    python diff_engine.py            # test_pages/로 difflib.unified_diff와 처리 시간 비교
+"""
+
+import bisect
+import itertools
+import time
+
+# 이보다 긴 줄은 태그 경계('>')에서 나눔 (압축된 HTML)
+LONG_LINE = 200
+
+# 한 구간에서 탐색할 최대 편집 거리 (넘으면 구간 전체를 삭제/추가로 처리)
+MAX_COST = 2000
+
+def split_units(html, long_line=LONG_LINE):
+    """HTML을 비교 단위 목록으로 분할 (보통 줄 단위, 긴 줄은 태그 끝 '>' 뒤에서 나눔)"""
+    units = []
+    for line in html.splitlines():
+        if len(line) > long_line:
+            # 정규식(findall)보다 str.split이 훨씬 빠름
+            parts = line.split(">")
+            units.extend(part + ">" for part in parts[:-1])
+            if parts[-1]:
+                units.append(parts[-1])
+        else:
+            units.append(line)
+    return units
+
+def _intern(a, b):
+    """두 단위 목록을 같은 내용이면 같은 정수가 되도록 변환 (비교는 정수끼리)"""
+    ids = {}
+    return [ids.setdefault(unit, len(ids)) for unit in a], [ids.setdefault(unit, len(ids)) for unit in b]
+
+def _middle_snake(a, a0, n, b, b0, m, max_cost):
+    """
+    a[a0:a0+n]와 b[b0:b0+m]의 최단 편집 경로 가운데 있는 snake (x, y, u, v) - 구간 기준 상대 좌표
+    편집 거리가 max_cost를 넘으면 None
+    """
+    delta = n - m
+    odd = delta & 1
+    limit = min((n + m + 1) // 2, max_cost)
+    offset = limit + 1
+    forward = [0] * (2 * offset + 1)
+    backward = [0] * (2 * offset + 1)
+    for d in range(limit + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[offset + k - 1] < forward[offset + k + 1]):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            start_x, start_y = x, y
+            while x < n and y < m and a[a0 + x] == b[b0 + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            c = delta - k
+            if odd and -(d - 1) <= c <= d - 1 and x + backward[offset + c] >= n:
+                return start_x, start_y, x, y
+        # 뒤에서부터 (뒤집은 좌표)
+        for c in range(-d, d + 1, 2):
+            if c == -d or (c != d and backward[offset + c - 1] < backward[offset + c + 1]):
+                x = backward[offset + c + 1]
+            else:
+                x = backward[offset + c - 1] + 1
+            y = x - c
+            start_x, start_y = x, y
+            while x < n and y < m and a[a0 + n - 1 - x] == b[b0 + m - 1 - y]:
+                x += 1
+                y += 1
+            backward[offset + c] = x
+            k = delta - c
+            if not odd and -d <= k <= d and x + forward[offset + k] >= n:
+                return n - x, m - y, n - start_x, m - start_y
+    return None
+
+def _anchors(a, b):
+    """
+    양쪽에 한 번씩만 나오는 단위 중 순서가 유지되는 가장 긴 짝 목록 [(i, j), ...]
+    (patience 정렬로 j의 최장 증가 부분 수열을 구함)
+    """
+    counts = {}
+    for unit in a:
+        counts[unit] = counts.get(unit, 0) + 1
+    positions = {}
+    for j, unit in enumerate(b):
+        if counts.get(unit) == 1:
+            positions[unit] = -1 if unit in positions else j
+    pairs = [(i, positions[unit]) for i, unit in enumerate(a) if positions.get(unit, -1) >= 0]
+
+    tails, tail_index, previous = [], [], [None] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        slot = bisect.bisect_left(tails, j)
+        if slot:
+            previous[index] = tail_index[slot - 1]
+        if slot == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[slot] = j
+            tail_index[slot] = index
+    chain = []
+    index = tail_index[-1] if tail_index else None
+    while index is not None:
+        chain.append(pairs[index])
+        index = previous[index]
+    return chain[::-1]
+
+def edit_runs(a, b, max_cost=MAX_COST):
+    """
+    정수 목록 a -> b 편집 구간을 문서 순서대로 생성
+    구간: ("equal" | "delete" | "insert", i1, i2, j1, j2)
+    양쪽에 한 번씩만 나오는 줄을 기준점으로 문서를 작은 구간으로 나누고, 구간마다 Myers 알고리즘 적용
+    (편집이 흩어져 있어도 비용이 전체 길이 x 전체 편집 거리로 커지지 않음)
+    """
+    i, j = 0, 0
+    for anchor_i, anchor_j in _anchors(a, b) + [(len(a), len(b))]:
+        if anchor_i > i or anchor_j > j:
+            yield from _myers_runs(a, i, anchor_i, b, j, anchor_j, max_cost)
+        if anchor_i < len(a):
+            yield ("equal", anchor_i, anchor_i + 1, anchor_j, anchor_j + 1)
+        i, j = anchor_i + 1, anchor_j + 1
+
+def _myers_runs(a, a_lo, a_hi, b, b_lo, b_hi, max_cost):
+    """a[a_lo:a_hi] -> b[b_lo:b_hi] 구간의 편집 구간 (Myers 선형 공간 분할 정복)"""
+    # 스택 항목: ("range", a 시작, a 끝, b 시작, b 끝) 또는 ("run", 구간) - 나중에 처리할 것을 먼저 넣음
+    stack = [("range", a_lo, a_hi, b_lo, b_hi)]
+    while stack:
+        item = stack.pop()
+        if item[0] == "run":
+            yield item[1]
+            continue
+        _, a_lo, a_hi, b_lo, b_hi = item
+        start = a_lo
+        while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+            a_lo += 1
+            b_lo += 1
+        if a_lo > start:
+            yield ("equal", start, a_lo, b_lo - (a_lo - start), b_lo)
+        end = a_hi
+        while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+            a_hi -= 1
+            b_hi -= 1
+        if a_hi < end:
+            stack.append(("run", ("equal", a_hi, end, b_hi, b_hi + (end - a_hi))))
+
+        if a_lo == a_hi or b_lo == b_hi:
+            snake = None
+        else:
+            snake = _middle_snake(a, a_lo, a_hi - a_lo, b, b_lo, b_hi - b_lo, max_cost)
+        if snake is None or (snake[0] == a_hi - a_lo and snake[1] == b_hi - b_lo) or (snake[2] == 0 and snake[3] == 0):
+            # 한쪽이 비었거나 편집 거리가 상한을 넘음 (더 나눌 수 없는 구간)
+            if a_lo < a_hi:
+                yield ("delete", a_lo, a_hi, b_lo, b_lo)
+            if b_lo < b_hi:
+                yield ("insert", a_hi, a_hi, b_lo, b_hi)
+            continue
+        x, y, u, v = snake
+        stack.append(("range", a_lo + u, a_hi, b_lo + v, b_hi))
+        if u > x:
+            stack.append(("run", ("equal", a_lo + x, a_lo + u, b_lo + y, b_lo + v)))
+        stack.append(("range", a_lo, a_lo + x, b_lo, b_lo + y))
+
+def _merged(runs):
+    """이어진 같은 종류 구간 합치기"""
+    current = None
+    for run in runs:
+        if current and current[0] == run[0] and current[2] == run[1] and current[4] == run[3]:
+            current = (current[0], current[1], run[2], current[3], run[4])
+            continue
+        if current:
+            yield current
+        current = run
+    if current:
+        yield current
+
+def hunks(runs, context=3):
+    """편집 구간을 unified diff 덩어리(앞뒤 context줄 포함 구간 목록)로 묶어 하나씩 생성"""
+    hunk = []
+    leading = None
+    for run in _merged(runs):
+        tag, i1, i2, j1, j2 = run
+        if tag != "equal":
+            if not hunk and leading:
+                hunk.append(leading)
+            leading = None
+            hunk.append(run)
+        elif not hunk:
+            leading = ("equal", max(i1, i2 - context), i2, max(j1, j2 - context), j2)
+        elif i2 - i1 > 2 * context:
+            hunk.append(("equal", i1, i1 + context, j1, j1 + context))
+            yield hunk
+            hunk = []
+            leading = ("equal", i2 - context, i2, j2 - context, j2)
+        else:
+            hunk.append(run)
+    if hunk:
+        tag, i1, i2, j1, j2 = hunk[-1]
+        if tag == "equal":
+            hunk[-1] = ("equal", i1, min(i2, i1 + context), j1, min(j2, j1 + context))
+        yield hunk
+
+def _format_range(start, stop):
+    """unified diff 범위 표기 (difflib과 같은 형식)"""
+    length = stop - start
+    if length == 1:
+        return f"{start + 1}"
+    return f"{start + 1 if length else start},{length}"
+
+def unified_diff(old_units, new_units, fromfile="", tofile="", context=3, max_cost=MAX_COST):
+    """difflib.unified_diff와 같은 형식의 줄을 필요한 만큼만 계산하여 생성"""
+    a, b = _intern(old_units, new_units)
+    header = False
+    for hunk in hunks(edit_runs(a, b, max_cost), context):
+        if not header:
+            yield f"--- {fromfile}"
+            yield f"+++ {tofile}"
+            header = True
+        first, last = hunk[0], hunk[-1]
+        yield f"@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@"
+        for tag, i1, i2, j1, j2 in hunk:
+            if tag == "equal":
+                for line in old_units[i1:i2]:
+                    yield " " + line
+            elif tag == "delete":
+                for line in old_units[i1:i2]:
+                    yield "-" + line
+            else:
+                for line in new_units[j1:j2]:
+                    yield "+" + line
+
+def diff_html(html1, html2, label1="", label2="", context=3, max_lines=None):
+    """두 HTML의 unified diff 줄 목록 (max_lines까지만 계산)"""
+    lines = unified_diff(split_units(html1), split_units(html2), label1, label2, context)
+    return list(itertools.islice(lines, max_lines))
+
+def benchmark(pairs, max_lines=50, repeat=3):
+    """
+    difflib.unified_diff(기존 find_differences 방식)와 처리 시간/출력 크기 비교
+    pairs: [(이름, html1, html2), ...]
+    반환: [{"name", "difflib_ms", "engine_ms", "difflib_chars", "engine_chars"}, ...]
+    """
+    import difflib
+
+    results = []
+    for name, html1, html2 in pairs:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            old = list(difflib.unified_diff(html1.splitlines(), html2.splitlines(), lineterm="", n=3))[:max_lines]
+        difflib_ms = (time.perf_counter() - started) * 1000 / repeat
+        started = time.perf_counter()
+        for _ in range(repeat):
+            new = diff_html(html1, html2, max_lines=max_lines)
+        engine_ms = (time.perf_counter() - started) * 1000 / repeat
+        results.append({
+            "name": name,
+            "difflib_ms": round(difflib_ms, 2),
+            "engine_ms": round(engine_ms, 2),
+            "difflib_chars": sum(len(line) for line in old),
+            "engine_chars": sum(len(line) for line in new),
+        })
+    return results
+
+if __name__ == "__main__":
+    import argparse
+    import glob
+    import os
+
+    parser = argparse.ArgumentParser(description="HTML diff 엔진 처리 시간 측정 (difflib 대비)")
+    parser.add_argument("--pages", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_pages"), help="HTML 파일 디렉터리")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수")
+    parser.add_argument("--scale", type=int, default=10, help="압축(한 줄) HTML 측정 시 페이지를 이어 붙일 배수")
+    args = parser.parse_args()
+
+    def read(name):
+        with open(os.path.join(args.pages, name), "r", encoding="utf-8") as f:
+            return f.read()
+
+    original = read("original.html")
+    pairs = []
+    for path in sorted(glob.glob(os.path.join(args.pages, "*.html"))):
+        name = os.path.basename(path)
+        if name == "original.html":
+            continue
+        modified = read(name)
+        pairs.append((name, original, modified))
+        # 같은 변경을 줄바꿈 없는 큰 한 줄 HTML에서
+        pairs.append((f"{name} (한 줄 x{args.scale})",
+                      (original * args.scale).replace("\n", ""),
+                      (original * (args.scale - 1) + modified).replace("\n", "")))
+
+    print(f"{'비교':<40} {'difflib ms':>11} {'엔진 ms':>9} {'difflib 출력':>13} {'엔진 출력':>10}")
+    for row in benchmark(pairs, repeat=args.repeat):
+        print(f"{row['name']:<40} {row['difflib_ms']:>11} {row['engine_ms']:>9} {row['difflib_chars']:>13,} {row['engine_chars']:>10,}")
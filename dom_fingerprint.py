@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DOM 구조 지문 모듈
+HTML을 한 번 파싱하여 모든 요소의 하위 트리 해시를 아래에서 위로(Merkle 방식) 계산합니다.
+두 버전을 비교할 때는 해시가 다른 하위 트리로만 내려가므로, 비교 시간은 페이지 크기가 아니라 변경 크기에 비례합니다.
+
+지문 노드: [하위 트리 해시, 태그, {속성: 값 해시}, 직접 텍스트 해시, [자식 노드...]]
+지문은 루트 해시를 키로 dom_fingerprints 테이블에 한 번만 저장하고 스냅샷은 dom_hash로 참조합니다.
+
+변경 경로 예: "html > body > form[action]" (속성), "html > head > script[3]" (같은 태그 형제 중 세 번째)
+"""
+
+import hashlib
+import json
+import zlib
+from collections import defaultdict, deque
+from datetime import datetime
+from html.parser import HTMLParser
+
+# 닫는 태그가 없는 요소
+VOID_ELEMENTS = frozenset([
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+])
+
+# 같은 태그가 다시 열리면 앞의 것이 닫힌 것으로 보는 요소 (<li>a<li>b 처럼 닫는 태그 생략)
+IMPLICIT_CLOSE = frozenset(["p", "li", "option", "tr", "td", "th", "dt", "dd"])
+
+ROOT_TAG = "#document"
+
+# 비교 결과로 보고할 최대 변경 수
+MAX_CHANGES = 50
+
+def _digest(text, size=8):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=size).hexdigest()
+
+class _TreeBuilder(HTMLParser):
+    """html.parser로 가벼운 요소 트리 생성 (노드: [태그, 속성 목록, 자식 목록, 텍스트 조각 목록])"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = [ROOT_TAG, [], [], []]
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        if tag in IMPLICIT_CLOSE and self.stack[-1][0] == tag:
+            self.stack.pop()
+        node = [tag, attrs, [], []]
+        self.stack[-1][2].append(node)
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.stack[-1][2].append([tag, attrs, [], []])
+
+    def handle_endtag(self, tag):
+        # 짝이 맞지 않는 닫는 태그는 무시하고, 열린 태그가 있으면 그 안쪽 요소까지 함께 닫는다
+        for depth in range(len(self.stack) - 1, 0, -1):
+            if self.stack[depth][0] == tag:
+                del self.stack[depth:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1][3].append(data)
+
+def _hash_node(node, child_nodes):
+    tag, attrs, _, texts = node[:4]
+    attr_hashes = {}
+    for name, value in attrs:
+        attr_hashes[name] = _digest(value or "", 4)
+    text = " ".join("".join(texts).split())
+    text_hash = _digest(text, 4) if text else 0
+    subtree = _digest("\x00".join([
+        tag,
+        ",".join(f"{name}={value}" for name, value in sorted(attr_hashes.items())),
+        str(text_hash),
+        *(child[0] for child in child_nodes),
+    ]))
+    return [subtree, tag, attr_hashes or 0, text_hash, child_nodes]
+
+def _build(root):
+    """요소 트리를 아래에서 위로 해시하여 지문 노드로 변환 (깊은 트리도 재귀 한도에 걸리지 않게 반복문으로)"""
+    stack = [(root, False)]
+    while stack:
+        node, visited = stack.pop()
+        if visited:
+            # 자식의 지문은 각 자식 노드 끝에 붙여 둔다
+            node.append(_hash_node(node, [child[4] for child in node[2]]))
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node[2])
+    return root[4]
+
+def fingerprint(html):
+    """HTML의 구조 지문 (루트 노드, 루트 해시는 fingerprint(html)[0])"""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return _build(builder.root)
+
+def encode(tree):
+    """지문을 저장용 바이트로 변환 (압축 JSON)"""
+    return zlib.compress(json.dumps(tree, separators=(",", ":")).encode("utf-8"))
+
+def decode(data):
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+def _child_names(children):
+    """자식 요소의 경로 이름 (같은 태그 형제가 여럿이면 1부터 시작하는 순번 표시)"""
+    totals = defaultdict(int)
+    for child in children:
+        totals[child[1]] += 1
+    seen = defaultdict(int)
+    names = []
+    for child in children:
+        tag = child[1]
+        seen[tag] += 1
+        names.append(f"{tag}[{seen[tag]}]" if totals[tag] > 1 else tag)
+    return names
+
+def _join(path, name):
+    return f"{path} > {name}" if path else name
+
+def _compare_node(old, new, path, changes, pending):
+    """해시가 다른 두 노드의 자기 속성/텍스트를 비교하고, 내려가 볼 자식 쌍을 pending에 추가"""
+    old_attrs, new_attrs = old[2] or {}, new[2] or {}
+    if old_attrs != new_attrs:
+        for name in sorted(set(old_attrs) | set(new_attrs)):
+            if old_attrs.get(name) != new_attrs.get(name):
+                changes.append({"path": f"{path}[{name}]", "kind": "attr"})
+    if old[3] != new[3]:
+        changes.append({"path": path, "kind": "text"})
+
+    old_children, new_children = old[4], new[4]
+    # 해시가 같은 자식은 (위치가 바뀌었어도) 변경 없음으로 보고 짝지음
+    unchanged = defaultdict(deque)
+    for index, child in enumerate(old_children):
+        unchanged[child[0]].append(index)
+    matched_old = set()
+    new_rest = []
+    for index, child in enumerate(new_children):
+        if unchanged[child[0]]:
+            matched_old.add(unchanged[child[0]].popleft())
+        else:
+            new_rest.append(index)
+    if not new_rest and len(matched_old) == len(old_children):
+        return
+
+    # 나머지는 같은 태그끼리 순서대로 짝지어 내려가고, 남는 것은 추가/삭제
+    old_by_tag = defaultdict(deque)
+    for index, child in enumerate(old_children):
+        if index not in matched_old:
+            old_by_tag[child[1]].append(index)
+    new_names = _child_names(new_children)
+    pairs = []
+    for index in new_rest:
+        child = new_children[index]
+        if old_by_tag[child[1]]:
+            pairs.append((old_children[old_by_tag[child[1]].popleft()], child, _join(path, new_names[index])))
+        else:
+            changes.append({"path": _join(path, new_names[index]), "kind": "added"})
+    if any(old_by_tag.values()):
+        old_names = _child_names(old_children)
+        for indexes in old_by_tag.values():
+            for index in indexes:
+                changes.append({"path": _join(path, old_names[index]), "kind": "removed"})
+    # 스택이므로 역순으로 넣어 문서 순서대로 내려간다
+    pending.extend(reversed(pairs))
+
+def diff(old, new, limit=MAX_CHANGES):
+    """
+    두 지문의 변경된 요소 경로 목록 (최대 limit개)
+    반환: [{"path": "html > body > form[action]", "kind": "attr" | "text" | "added" | "removed"}, ...]
+    """
+    changes = []
+    pending = [(old, new, "")]
+    while pending and len(changes) < limit:
+        old_node, new_node, path = pending.pop()
+        if old_node[0] != new_node[0]:
+            _compare_node(old_node, new_node, path, changes, pending)
+    return changes[:limit]
+
+def format_changes(changes, limit=5):
+    """변경 목록을 한 줄 요약으로 변환 (예: "html > body > form[action] (속성), ... 외 3곳")"""
+    labels = {"attr": "속성", "text": "텍스트", "added": "추가", "removed": "삭제"}
+    summary = ", ".join(f"{change['path']} ({labels[change['kind']]})" for change in changes[:limit])
+    if len(changes) > limit:
+        summary += f" 외 {len(changes) - limit}곳"
+    return summary
+
+def save_fingerprint(conn, tree):
+    """지문을 dom_fingerprints에 저장 (이미 있으면 건너뜀, 커밋은 호출자가 담당) - 루트 해시 반환"""
+    conn.execute(
+        "INSERT OR IGNORE INTO dom_fingerprints (hash, content, created_at) VALUES (?, ?, ?)",
+        (tree[0], encode(tree), datetime.now().isoformat())
+    )
+    return tree[0]
+
+def load_fingerprint(conn, dom_hash):
+    """루트 해시로 지문 읽기 (없으면 None)"""
+    row = conn.execute("SELECT content FROM dom_fingerprints WHERE hash = ?", (dom_hash,)).fetchone()
+    return decode(row[0]) if row else None
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+호스트 상태 관리 모듈
+호스트별 연속 실패를 기록하여 지수 백오프로 회로를 차단하고,
+대상별 과거 소요 시간으로 가져오기 타임아웃을 정합니다.
+상태는 데이터베이스에 저장되므로 실행이 바뀌어도 유지됩니다.
+"""
+
+import time
+from datetime import datetime
+
+from database import get_connection
+from config.config import CIRCUIT_BREAKER, TIMEOUT_BUDGET
+
+# 이동 평균 가중치 (TCP RTO 계산과 같은 방식)
+LATENCY_ALPHA = 0.125
+DEVIATION_BETA = 0.25
+
+def backoff_seconds(failures, breaker=CIRCUIT_BREAKER):
+    """연속 실패 수에 따른 차단 시간 (임계값 미만이면 0)"""
+    if failures < breaker["failure_threshold"]:
+        return 0
+    exponent = failures - breaker["failure_threshold"]
+    return min(breaker["max_backoff"], breaker["base_backoff"] * 2 ** exponent)
+
+def get_host_health(host):
+    """호스트 상태 조회 (기록이 없으면 None)"""
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT consecutive_failures, open_until, last_failure, last_success, last_error FROM host_health WHERE host = ?",
+            (host,)
+        ).fetchone()
+    if row is None:
+        return None
+    return {
+        "consecutive_failures": row[0],
+        "open_until": row[1],
+        "last_failure": row[2],
+        "last_success": row[3],
+        "last_error": row[4]
+    }
+
+def allow_request(host, trial_seconds=None):
+    """
+    호스트로 요청을 보내도 되는지 확인
+
+    차단 중이면 (False, 남은 초)를 반환합니다. 차단 시간이 지났으면 반열림 상태로
+    보고 한 작업만 시험 요청을 보내도록 허용하며, 그동안 다른 작업은 계속 차단됩니다.
+    """
+    now = time.time()
+    trial_seconds = trial_seconds or TIMEOUT_BUDGET["max_ms"] / 1000
+    with get_connection() as conn:
+        row = conn.execute("SELECT open_until FROM host_health WHERE host = ?", (host,)).fetchone()
+        if row is None or row[0] is None:
+            return True, 0
+        if row[0] > now:
+            return False, row[0] - now
+        # 시험 요청 권한 확보 (동시에 여러 작업이 시도해도 한 곳만 성공)
+        cursor = conn.execute(
+            "UPDATE host_health SET open_until = ? WHERE host = ? AND open_until = ?",
+            (now + trial_seconds, host, row[0])
+        )
+        if cursor.rowcount == 1:
+            return True, 0
+        return False, trial_seconds
+
+def record_success(host):
+    """성공 기록 - 연속 실패 수와 차단 상태 초기화"""
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO host_health (host, consecutive_failures, open_until, last_success) VALUES (?, 0, NULL, ?)
+            ON CONFLICT(host) DO UPDATE SET consecutive_failures = 0, open_until = NULL, last_success = excluded.last_success
+            """,
+            (host, datetime.now().isoformat())
+        )
+
+def record_failure(host, error=None, breaker=CIRCUIT_BREAKER):
+    """실패 기록 - 연속 실패가 임계값을 넘으면 지수 백오프로 회로 차단. 차단 시간(초) 반환"""
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO host_health (host, consecutive_failures) VALUES (?, 0)
+            ON CONFLICT(host) DO NOTHING
+            """,
+            (host,)
+        )
+        failures = conn.execute(
+            "UPDATE host_health SET consecutive_failures = consecutive_failures + 1 WHERE host = ? RETURNING consecutive_failures",
+            (host,)
+        ).fetchone()[0]
+        backoff = backoff_seconds(failures, breaker)
+        conn.execute(
+            "UPDATE host_health SET open_until = ?, last_failure = ?, last_error = ? WHERE host = ?",
+            (time.time() + backoff if backoff else None, datetime.now().isoformat(), str(error) if error else None, host)
+        )
+    return backoff
+
+def record_latency(url, elapsed_ms):
+    """대상의 가져오기 소요 시간을 이동 평균/편차에 반영"""
+    with get_connection() as conn:
+        row = conn.execute("SELECT samples, mean_ms, dev_ms FROM target_latency WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            samples, mean_ms, dev_ms = 1, float(elapsed_ms), elapsed_ms / 2
+        else:
+            samples = row[0] + 1
+            dev_ms = (1 - DEVIATION_BETA) * row[2] + DEVIATION_BETA * abs(elapsed_ms - row[1])
+            mean_ms = (1 - LATENCY_ALPHA) * row[1] + LATENCY_ALPHA * elapsed_ms
+        conn.execute(
+            """
+            INSERT INTO target_latency (url, samples, mean_ms, dev_ms, updated_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                samples = excluded.samples, mean_ms = excluded.mean_ms,
+                dev_ms = excluded.dev_ms, updated_at = excluded.updated_at
+            """,
+            (url, samples, mean_ms, dev_ms, datetime.now().isoformat())
+        )
+
+def timeout_budget(url, budget=TIMEOUT_BUDGET):
+    """대상의 과거 소요 시간으로 계산한 타임아웃(ms)"""
+    with get_connection() as conn:
+        row = conn.execute("SELECT samples, mean_ms, dev_ms FROM target_latency WHERE url = ?", (url,)).fetchone()
+    if row is None or row[0] < budget["min_samples"]:
+        return budget["max_ms"]
+    timeout_ms = row[1] + budget["deviations"] * row[2]
+    return int(max(budget["min_ms"], min(budget["max_ms"], timeout_ms)))
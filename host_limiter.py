@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+동시 실행 제한 모듈
+전체 동시 실행 수와 호스트별 동시 실행 수를 함께 제한합니다.
+"""
+
+import asyncio
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+def host_of(url):
+    """URL에서 호스트(포트 포함) 추출"""
+    return urlsplit(url).netloc.lower()
+
+class HostLimiter:
+    """
+    전역 상한(max_concurrency)과 호스트별 상한(max_per_host)을 모두 지키도록
+    비동기 작업의 진입을 제어합니다.
+    """
+
+    def __init__(self, max_concurrency=4, max_per_host=2):
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._hosts = defaultdict(lambda: asyncio.Semaphore(max_per_host))
+
+    @asynccontextmanager
+    async def slot(self, url):
+        """url의 호스트 슬롯과 전역 슬롯을 차례로 확보"""
+        # 호스트 슬롯을 먼저 잡아야 같은 호스트 대기 작업이 전역 슬롯을 점유하지 않는다
+        async with self._hosts[host_of(url)]:
+            async with self._global:
+                yield
+
+    async def run(self, url, coro):
+        """슬롯을 확보한 뒤 코루틴 실행"""
+        async with self.slot(url):
+            return await coro
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+가져오기 지표 모듈
+가져오기 한 번마다 fetch_metrics에 작은 행 하나(소요 시간, 크기, 결과, 변경 여부)를 남기고,
+같은 트랜잭션에서 시간/일 단위 집계(metric_rollups)와 소요 시간 히스토그램(latency_histogram)을 갱신합니다.
+"호스트별 지난주 p95 가져오기 시간" 같은 조회는 원본 행이 아니라 집계만 읽습니다.
+"""
+
+import bisect
+from datetime import datetime, timedelta
+
+from config.config import METRICS
+from database import get_connection
+from host_limiter import host_of
+
+# 히스토그램 구간 상한 (ms) - 마지막 구간은 그보다 긴 모든 값
+LATENCY_BUCKETS_MS = [250, 500, 1000, 2000, 3000, 5000, 7500, 10000, 15000, 20000, 30000, 45000, 60000, 90000]
+OVERFLOW_MS = 10 ** 9
+
+# 집계 단위와 구간 키 형식 (문자열 정렬 = 시간 순서)
+PERIODS = {"hour": "%Y-%m-%dT%H", "day": "%Y-%m-%d"}
+
+# 실패로 집계하지 않는 결과
+NON_FAILURE_STATUSES = ("ok", "skipped")
+
+def latency_bucket(elapsed_ms):
+    """소요 시간이 속한 히스토그램 구간 상한"""
+    index = bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)
+    return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else OVERFLOW_MS
+
+def _lower_bound(le_ms):
+    """히스토그램 구간의 하한 (바로 앞 구간의 상한)"""
+    index = bisect.bisect_left(LATENCY_BUCKETS_MS, le_ms)
+    return LATENCY_BUCKETS_MS[index - 1] if index > 0 else 0
+
+def record_fetch(url, status, elapsed_ms=None, size=0, changed=False, fetched_at=None):
+    """
+    가져오기 결과 한 건 기록 + 시간/일 집계 갱신
+    status: ok, skipped, failed, too_large, circuit_open, error
+    elapsed_ms가 None이면(가져오지 않음) 소요 시간 집계에서 제외
+    """
+    fetched_at = fetched_at or datetime.now()
+    host = host_of(url)
+    failed = int(status not in NON_FAILURE_STATUSES)
+    timed = elapsed_ms is not None
+    with get_connection() as conn:
+        conn.execute(
+            "INSERT INTO fetch_metrics (fetched_at, url, host, status, elapsed_ms, bytes, changed) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (fetched_at.isoformat(), url, host, status, elapsed_ms, size, bool(changed))
+        )
+        for period, fmt in PERIODS.items():
+            bucket = fetched_at.strftime(fmt)
+            conn.execute(
+                """
+                INSERT INTO metric_rollups (period, bucket, host, fetches, failures, changes, bytes, latency_count, latency_sum_ms, latency_max_ms)
+                VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(period, bucket, host) DO UPDATE SET
+                    fetches = fetches + 1,
+                    failures = failures + excluded.failures,
+                    changes = changes + excluded.changes,
+                    bytes = bytes + excluded.bytes,
+                    latency_count = latency_count + excluded.latency_count,
+                    latency_sum_ms = latency_sum_ms + excluded.latency_sum_ms,
+                    latency_max_ms = max(latency_max_ms, excluded.latency_max_ms)
+                """,
+                (period, bucket, host, failed, int(bool(changed)), size or 0, int(timed), elapsed_ms or 0, elapsed_ms or 0)
+            )
+            if timed:
+                conn.execute(
+                    """
+                    INSERT INTO latency_histogram (period, bucket, host, le_ms, count) VALUES (?, ?, ?, ?, 1)
+                    ON CONFLICT(period, bucket, host, le_ms) DO UPDATE SET count = count + 1
+                    """,
+                    (period, bucket, host, latency_bucket(elapsed_ms))
+                )
+
+def _range(period, since, until):
+    fmt = PERIODS[period]
+    return since.strftime(fmt), (until or datetime.now()).strftime(fmt)
+
+def percentile_from_histogram(counts, percentile):
+    """[(구간 상한, 개수), ...] (상한 오름차순)에서 백분위수 추정 (구간 안은 선형 보간)"""
+    total = sum(count for _, count in counts)
+    if total == 0:
+        return None
+    target = percentile * total
+    cumulative = 0
+    for le_ms, count in counts:
+        if count and cumulative + count >= target:
+            lower = _lower_bound(le_ms)
+            if le_ms == OVERFLOW_MS:
+                # 마지막 구간은 상한이 없으므로 하한으로 보고
+                return float(lower)
+            return lower + (le_ms - lower) * (target - cumulative) / count
+        cumulative += count
+    return float(_lower_bound(counts[-1][0]))
+
+def latency_percentile(host=None, since=None, until=None, percentile=0.95, period="hour"):
+    """
+    집계 히스토그램으로 소요 시간 백분위수(ms) 추정 (host=None이면 전체)
+    since/until: datetime (until 포함, 기본: 지난 7일)
+    """
+    since = since or datetime.now() - timedelta(days=7)
+    start, end = _range(period, since, until)
+    query = "SELECT le_ms, SUM(count) FROM latency_histogram WHERE period = ? AND bucket BETWEEN ? AND ?"
+    params = [period, start, end]
+    if host:
+        query += " AND host = ?"
+        params.append(host)
+    with get_connection() as conn:
+        counts = conn.execute(query + " GROUP BY le_ms ORDER BY le_ms", params).fetchall()
+    return percentile_from_histogram(counts, percentile)
+
+def host_summary(since=None, until=None, period="day", percentile=0.95):
+    """
+    호스트별 요약 {host: {fetches, failures, changes, bytes, avg_ms, max_ms, p95_ms}}
+    since/until: datetime (기본: 지난 7일)
+    """
+    since = since or datetime.now() - timedelta(days=7)
+    start, end = _range(period, since, until)
+    with get_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT host, SUM(fetches), SUM(failures), SUM(changes), SUM(bytes),
+                   SUM(latency_count), SUM(latency_sum_ms), MAX(latency_max_ms)
+            FROM metric_rollups WHERE period = ? AND bucket BETWEEN ? AND ?
+            GROUP BY host ORDER BY host
+            """,
+            (period, start, end)
+        ).fetchall()
+        histograms = {}
+        for host, le_ms, count in conn.execute(
+            """
+            SELECT host, le_ms, SUM(count) FROM latency_histogram
+            WHERE period = ? AND bucket BETWEEN ? AND ?
+            GROUP BY host, le_ms ORDER BY host, le_ms
+            """,
+            (period, start, end)
+        ):
+            histograms.setdefault(host, []).append((le_ms, count))
+
+    summary = {}
+    for host, fetches, failures, changes, size, latency_count, latency_sum, latency_max in rows:
+        p = percentile_from_histogram(histograms.get(host, []), percentile)
+        summary[host] = {
+            "fetches": fetches,
+            "failures": failures,
+            "changes": changes,
+            "bytes": size,
+            "avg_ms": round(latency_sum / latency_count) if latency_count else None,
+            "max_ms": latency_max if latency_count else None,
+            "p95_ms": round(p) if p is not None else None,
+        }
+    return summary
+
+def prune_fetch_metrics(now=None, batch_size=1000):
+    """보존 기간(METRICS["raw_retention_days"])이 지난 원본 지표 행 삭제 (집계는 유지) - 삭제 수 반환"""
+    cutoff = ((now or datetime.now()) - timedelta(days=METRICS["raw_retention_days"])).isoformat()
+    deleted = 0
+    conn = get_connection()
+    while True:
+        with conn:
+            cursor = conn.execute(
+                "DELETE FROM fetch_metrics WHERE id IN (SELECT id FROM fetch_metrics WHERE fetched_at < ? LIMIT ?)",
+                (cutoff, batch_size)
+            )
+        deleted += cursor.rowcount
+        if cursor.rowcount < batch_size:
+            return deleted
+
+if __name__ == "__main__":
+    import argparse
+    from database import setup_database
+
+    parser = argparse.ArgumentParser(description="호스트별 가져오기 지표 요약")
+    parser.add_argument("--days", type=int, default=7, help="최근 며칠 (기본 7일)")
+    args = parser.parse_args()
+
+    setup_database()
+    summary = host_summary(since=datetime.now() - timedelta(days=args.days))
+    print(f"{'호스트':<32} {'가져오기':>8} {'실패':>6} {'변경':>6} {'평균ms':>8} {'p95ms':>8} {'최대ms':>8}")
+    for host, row in summary.items():
+        print(f"{host:<32} {row['fetches']:>8} {row['failures']:>6} {row['changes']:>6} "
+              f"{row['avg_ms'] or '-':>8} {row['p95_ms'] or '-':>8} {row['max_ms'] or '-':>8}")
@@ -10,25 +10,276 @@ import sys
 from datetime import datetime
 import os
 import asyncio
+import multiprocessing
+import platform
 
-from database import setup_database
+from database import setup_database, get_baseline_snapshot, get_connection, get_http_state
+from async_db import get_database
 from logger import setup_logging
+from config.config import BROWSER_POOL_SIZE, MAX_CONCURRENCY, MAX_PER_HOST, PRECHECK_ENABLED, JOB_LEASE_SECONDS
+from config.targets import get_target_settings
 from config.urls import KYOBO_URLS
+from browser_pool import BrowserPool
+from host_limiter import HostLimiter, host_of
+from host_health import allow_request, record_success, record_failure, record_latency, timeout_budget
+from metrics import record_fetch
+from config.normalization_rules import NORMALIZATION_RULESET_VERSION
+from precheck import check_static, commit_static_state
+from dom_fingerprint import diff, fingerprint, format_changes, load_fingerprint
+from security_surface import compare as compare_surfaces, extract as extract_surface, format_findings, load_surface, max_severity
+from simple_compare import compare_normalized_hash, normalize_dynamic_content
 from scrape_all_sites import fetch_html_async
-from saver import create_folders, save_html_to_file, save_snapshot
+from saver import create_folders, save_html_to_file, update_snapshot_analysis
+from work_queue import enqueue_targets, lease_job, renew_lease, complete_job, fail_job, reclaim_expired_leases, queue_counts
 
 # 표준 출력 인코딩 설정 (Windows 환경에서 한글 깨짐 방지)
 if sys.stdout.encoding != 'utf-8':
     sys.stdout.reconfigure(encoding='utf-8')
 
-async def monitor_all_sites():
+async def crawl_target(pool, url, tiered=False):
+    """
+    한 대상을 가져오기
+    tiered=True이면 HTTP 사전 검사로 변경이 없다고 판단될 때 브라우저 렌더링을 건너뜁니다.
+    """
+    settings = dict(get_target_settings(url))
+    host = host_of(url)
+    db = get_database()
+
+    # 최근 계속 실패한 호스트는 차단 시간이 끝날 때까지 건너뜀
+    allowed, retry_in = await db.run(allow_request, host)
+    if not allowed:
+        return {"circuit_open": retry_in}
+    if "timeout_ms" not in settings:
+        settings["timeout_ms"] = await db.run(timeout_budget, url)
+
+    precheck = None
+    if tiered:
+        # HTTP 요청은 작업 스레드에서, 이전 상태 읽기와 새 상태 저장은 DB 스레드/기록 대기열에서
+        previous_state = await db.run(get_http_state, url)
+        precheck = await asyncio.to_thread(
+            check_static, url, previous_state, settings.get("render_required", False), max_bytes=settings["max_bytes"]
+        )
+        if not precheck["render"]:
+            await db.write(commit_static_state, url, precheck)
+            await db.run(record_success, host)
+            return {"skipped": precheck["reason"]}
+
+    html_results = await fetch_html_async(url, pool=pool, settings=settings)
+    html_results["precheck"] = precheck
+
+    if html_results.get("rendered_html") or html_results.get("initial_html"):
+        await db.run(record_success, host)
+        await db.run(record_latency, url, html_results["elapsed_ms"])
+    elif not html_results.get("too_large"):
+        html_results["backoff"] = await db.run(record_failure, host, html_results.get("error"))
+    return html_results
+
+def analyze_html(html, url=None):
+    """
+    HTML을 한 번 정규화하여 (정규화 해시, DOM 구조 지문, 보안 표면 기록) 반환
+    스냅샷에 함께 저장하여 다음 비교 때 이전 본문을 다시 처리하지 않도록 함
+    """
+    normalized = normalize_dynamic_content(html, url)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest(), fingerprint(normalized), extract_surface(normalized, url)
+
+def read_baseline(url):
+    """
+    변경 비교 기준인 URL의 마지막 성공 스냅샷에 저장된 값 읽기 (DB 스레드에서 실행, 없으면 None)
+    반환: {"snapshot_id", "normalized_hash", "surface", "fingerprint", "html"}
+    현재 규칙 버전의 정규화 해시나 보안 표면 기록/구조 지문이 없으면 그 값은 None이고, 다시 계산할 수 있도록 본문(html)도 읽음
+    """
+    baseline = get_baseline_snapshot(url)
+    if baseline is None or not baseline["html"]:
+        return None
+    conn = get_connection()
+    previous = {
+        "snapshot_id": baseline["snapshot_id"],
+        "normalized_hash": baseline["normalized_hash"] if baseline["ruleset_version"] == NORMALIZATION_RULESET_VERSION else None,
+        "surface": load_surface(conn, baseline["surface_hash"]) if baseline["surface_hash"] else None,
+        "fingerprint": load_fingerprint(conn, baseline["dom_hash"]) if baseline["dom_hash"] else None,
+        "html": None,
+    }
+    if None in (previous["normalized_hash"], previous["surface"], previous["fingerprint"]):
+        previous["html"] = baseline["html"].read()
+    return previous
+
+async def load_baseline(db, url):
+    """
+    비교 기준 스냅샷의 정규화 해시/보안 표면 기록/구조 지문 (없으면 None)
+    저장되지 않은 값은 이전 본문을 한 번만 정규화하여 계산하고, 기록 대기열을 통해 그 스냅샷에 저장
+    """
+    previous = await db.run(read_baseline, url)
+    if previous is None:
+        return None
+    html = previous.pop("html")
+    if html is None:
+        return previous
+    digest, tree, surface = await asyncio.to_thread(analyze_html, html, url)
+    backfill = {}
+    if previous["normalized_hash"] is None:
+        previous["normalized_hash"] = backfill["normalized_hash"] = digest
+        backfill["ruleset_version"] = NORMALIZATION_RULESET_VERSION
+    if previous["fingerprint"] is None:
+        previous["fingerprint"] = backfill["fingerprint"] = tree
+    if previous["surface"] is None:
+        previous["surface"] = backfill["surface"] = surface
+    await db.write(update_snapshot_analysis, previous["snapshot_id"], **backfill)
+    return previous
+
+async def record_skipped(logger, db, url, reason):
+    """사전 검사로 렌더링을 건너뛴 대상을 이전 스냅샷 기준으로 기록"""
+    latest = await db.get_latest(url)
+    change_details = f"변경 없음 (HTTP 사전 검사: {reason})"
+    if latest and latest["hash"]:
+        # 본문은 이미 저장되어 있으므로 읽지 않고 같은 블롭을 참조
+        await db.save_snapshot(
+            url, latest["hash"], None, latest["html_size"], False, change_details, blob_hash=latest["blob_hash"],
+            normalized_hash=latest["normalized_hash"], ruleset_version=latest["ruleset_version"], dom_hash=latest["dom_hash"],
+            surface_hash=latest["surface_hash"]
+        )
+    logger.info(f"  ⏭️  렌더링 생략: {change_details}")
+
+def log_writer_stats(logger, db):
+    """스냅샷 기록 통계 로그"""
+    stats = db.writer.stats()
+    backpressure = db.stats()
+    logger.info(
+        f"DB 기록: {stats['written']}건 / 배치 {stats['batches']}회 (평균 {stats['avg_batch']}건, 최대 {stats['max_batch']}건), "
+        f"지연 평균 {stats['avg_latency_ms']}ms / 최대 {stats['max_latency_ms']}ms, 실패 {stats['failed']}건, "
+        f"대기열 가득 참 {backpressure['waits']}회 (최대 {backpressure['max_wait_ms']}ms)"
+    )
+
+def fetch_status(html_results, error, success):
+    """지표에 남길 가져오기 결과 (ok, circuit_open, too_large, failed, error)"""
+    if success:
+        return "ok"
+    if error is not None or html_results is None:
+        return "error"
+    if html_results.get("circuit_open"):
+        return "circuit_open"
+    if html_results.get("too_large"):
+        return "too_large"
+    return "failed"
+
+async def record_result(logger, base_dir, timestamp, company, service, url, html_results, error=None):
+    """
+    한 대상의 가져오기 결과를 로그로 남기고 파일과 데이터베이스에 저장
+    성공 여부를 반환합니다.
+    파일/DB 쓰기는 다른 스레드에서 실행되어 진행 중인 가져오기를 막지 않습니다.
+    """
+    db = get_database()
+    change_detected = False
+    change_details = ""
+    content_hash = ""
+    page_hash = None
+    page_fingerprint = None
+    page_surface = None
+    html_to_process = None
+    html_size = 0
+    success = False
+
+    if error is None and html_results.get("skipped"):
+        await record_skipped(logger, db, url, html_results["skipped"])
+        await db.run(record_fetch, url, "skipped")
+        return True
+
+    try:
+        if error is not None:
+            raise error
+
+        initial_html = html_results.get("initial_html")
+        rendered_html = html_results.get("rendered_html")
+        
+        html_to_process = rendered_html if rendered_html else initial_html
+
+        if html_to_process:
+            if html_results.get("ready"):
+                logger.info(f"  렌더링 대기 종료: {html_results['ready']} ({html_results.get('elapsed_ms', 0):,} ms)")
+            if html_results.get("requests"):
+                requests_stats = html_results["requests"]
+                logger.info(f"  요청: 허용 {requests_stats['allowed']}, 차단 {requests_stats['blocked']} {requests_stats['blocked_by_type']}")
+
+            # 초기(정적) HTML 저장
+            if initial_html:
+                initial_filepath = await asyncio.to_thread(save_html_to_file, base_dir, company, service, f"{timestamp}_initial", initial_html)
+                logger.info(f"  저장 (정적): {initial_filepath} ({len(initial_html):,} 문자)")
+
+            # 최종(동적) HTML 저장
+            if rendered_html:
+                rendered_filepath = await asyncio.to_thread(save_html_to_file, base_dir, company, service, f"{timestamp}_rendered", rendered_html)
+                logger.info(f"  저장 (동적): {rendered_filepath} ({len(rendered_html):,} 문자)")
+
+            success = True
+            if html_results.get("precheck"):
+                logger.info(f"  HTTP 사전 검사: {html_results['precheck']['reason']}")
+                await db.write(commit_static_state, url, html_results["precheck"])
+            
+            content_hash = hashlib.sha256(html_to_process.encode('utf-8')).hexdigest()
+            html_size = len(html_to_process)
+            # 새 페이지만 정규화하고, 이전 스냅샷은 저장된 정규화 해시와 비교
+            page_hash, page_fingerprint, page_surface = await asyncio.to_thread(analyze_html, html_to_process, url)
+            previous = await load_baseline(db, url)
+            change_detected, change_details = compare_normalized_hash(previous["normalized_hash"] if previous else None, page_hash)
+            if change_detected and previous is not None:
+                # 보안 표면(폼 action, 스크립트, iframe, 외부 출처, meta refresh) 기록을 먼저 비교하여 심각도 표시
+                findings = compare_surfaces(previous["surface"], page_surface)
+                if findings:
+                    change_details += f" [보안 요소 {format_findings(findings)}]"
+                    if max_severity(findings) == "high":
+                        logger.warning(f"  🚨 보안 요소 변경 (심각도 높음): {format_findings(findings)}")
+                # 구조 지문에서 해시가 다른 하위 트리만 따라가 변경 위치 기록
+                changes = diff(previous["fingerprint"], page_fingerprint)
+                if changes:
+                    change_details += f": {format_changes(changes)}"
+            logger.info(f"  {change_details}")
+            logger.info(f"  ✅ 성공")
+        elif html_results.get("circuit_open"):
+            change_details = f"회로 차단: 호스트 연속 실패로 건너뜀 ({html_results['circuit_open'] / 60:.0f}분 후 재시도)"
+            logger.warning(f"  ⛔ {change_details}")
+        elif html_results.get("too_large"):
+            change_details = f"HTML 크기 상한 초과: {html_results['too_large']}"
+            logger.error(f"  ❌ 실패: {change_details}")
+        else:
+            change_details = "페이지 가져오기 실패"
+            logger.error(f"  ❌ 실패: {change_details}")
+            if html_results.get("backoff"):
+                logger.warning(f"  ⛔ 연속 실패로 호스트 차단: {html_results['backoff'] / 60:.0f}분")
+    except Exception as e:
+        change_details = f"스크래핑 중 오류 발생: {e}"
+        logger.error(f"  ❌ 실패: {change_details}")
+    finally:
+        # 가져오기 지표 기록 (시간/일 집계 포함)
+        await db.run(
+            record_fetch,
+            url,
+            fetch_status(html_results, error, success),
+            (html_results or {}).get("elapsed_ms"),
+            len(html_to_process.encode('utf-8')) if html_to_process else 0,
+            change_detected
+        )
+        # 데이터베이스에 결과 저장 (쓰기 스레드가 모아서 커밋)
+        await db.save_snapshot(
+            url, content_hash, html_to_process if html_to_process else "", html_size, change_detected, change_details,
+            normalized_hash=page_hash, ruleset_version=NORMALIZATION_RULESET_VERSION if page_hash else None,
+            fingerprint=page_fingerprint, surface=page_surface
+        )
+
+    return success
+
+async def monitor_all_sites(max_concurrency=MAX_CONCURRENCY, max_per_host=MAX_PER_HOST, tiered=PRECHECK_ENABLED):
     """
     모든 교보 계열사 사이트를 모니터링하고 결과를 데이터베이스에 저장
+
+    가져오기는 전역/호스트별 상한 안에서 동시에 진행하고,
+    결과 기록(로그, 파일, DB)은 KYOBO_URLS 순서대로 수행합니다.
+    tiered=True이면 HTTP 사전 검사를 먼저 수행합니다.
     """
     logger = setup_logging()
-    setup_database()
+    db = get_database()
+    await db.setup()
 
     logger.info("교보 계열사 사이트 모니터링 시작")
+    logger.info(f"동시 실행: 전체 {max_concurrency}, 호스트별 {max_per_host}, HTTP 사전 검사: {'사용' if tiered else '미사용'}")
     logger.info("="*50)
     
     base_dir = create_folders() # scrape_all_sites에서 폴더 생성 함수 재사용
@@ -36,70 +287,155 @@ async def monitor_all_sites():
     
     success_count = 0
     total = len(KYOBO_URLS)
+    limiter = HostLimiter(max_concurrency, max_per_host)
     
-    for i, (company, service, url) in enumerate(KYOBO_URLS, 1):
-        logger.info(f"[{i}/{total}] {company} - {service}")
-        logger.info(f"  URL: {url}")
-        
-        html = None
-        change_detected = False
-        change_details = ""
-        content_hash = ""
-        html_size = 0
-
-        try:
-            # HTML 가져오기
-            html_results = await fetch_html_async(url)
-            initial_html = html_results.get("initial_html")
-            rendered_html = html_results.get("rendered_html")
-            
-            html_to_process = rendered_html if rendered_html else initial_html
-
-            if html_to_process:
-                # 초기(정적) HTML 저장
-                if initial_html:
-                    initial_filepath = save_html_to_file(base_dir, company, service, f"{timestamp}_initial", initial_html)
-                    logger.info(f"  저장 (정적): {initial_filepath} ({len(initial_html):,} 문자)")
+    # 브라우저는 실행마다 한 번만 띄우고 컨텍스트를 재사용
+    async with BrowserPool(size=min(BROWSER_POOL_SIZE, max_concurrency)) as pool:
+        tasks = [
+            asyncio.create_task(limiter.run(url, crawl_target(pool, url, tiered)))
+            for _, _, url in KYOBO_URLS
+        ]
 
-                # 최종(동적) HTML 저장
-                if rendered_html:
-                    rendered_filepath = save_html_to_file(base_dir, company, service, f"{timestamp}_rendered", rendered_html)
-                    logger.info(f"  저장 (동적): {rendered_filepath} ({len(rendered_html):,} 문자)")
+        # 완료 순서와 관계없이 목록 순서대로 기록하여 로그/저장 순서를 고정
+        for i, ((company, service, url), task) in enumerate(zip(KYOBO_URLS, tasks), 1):
+            html_results, error = None, None
+            try:
+                html_results = await task
+            except Exception as e:
+                error = e
 
+            logger.info(f"[{i}/{total}] {company} - {service}")
+            logger.info(f"  URL: {url}")
+            if await record_result(logger, base_dir, timestamp, company, service, url, html_results, error):
                 success_count += 1
-                
-                content_hash = hashlib.sha256(html_to_process.encode('utf-8')).hexdigest()
-                html_size = len(html_to_process)
-                change_detected = True # 첫 스크래핑이므로 변경으로 간주
-                change_details = "최초 스크래핑 성공"
-                # TODO: simple_compare.py의 is_html_exactly_equal_filtered 함수를 사용하여
-                # TODO: 이전 스냅샷과 현재 HTML을 비교하는 로직을 여기에 추가할 수 있습니다.
-                # TODO: 예시: 
-                # TODO: from simple_compare import is_html_exactly_equal_filtered
-                # TODO: previous_html = get_previous_html_from_db(url) # 이전 HTML을 DB에서 가져오는 함수 필요
-                # TODO: if previous_html and not is_html_exactly_equal_filtered(previous_html, html_to_process):
-                # TODO:     change_detected = True
-                # TODO:     change_details = "내용 변경 감지"
-                # TODO: else:
-                # TODO:     change_detected = False
-                # TODO:     change_details = "변경 없음 (동적 요소 필터링 후 동일)"
-                logger.info(f"  ✅ 성공")
-            else:
-                change_details = "페이지 가져오기 실패"
-                logger.error(f"  ❌ 실패: {change_details}")
-        except Exception as e:
-            change_details = f"스크래핑 중 오류 발생: {e}"
-            logger.error(f"  ❌ 실패: {change_details}")
-        finally:
-            # 데이터베이스에 결과 저장
-            save_snapshot(url, content_hash, html if html else "", html_size, change_detected, change_details)
-        
-        logger.info("") # 빈 줄 추가
+            logger.info("") # 빈 줄 추가
     
+    await db.close()
+    log_writer_stats(logger, db)
+
     logger.info("완료 요약")
     logger.info("="*50)
     logger.info(f"성공: {success_count}/{total}")
     logger.info(f"저장 위치: {base_dir}")
 
+async def keep_lease(db, job_id, worker_id, task):
+    """
+    작업을 처리하는 동안 임대 시간의 1/3마다 임대 연장
+    임대가 다른 워커에게 넘어갔으면 진행 중인 가져오기(task)를 취소하고 종료
+    """
+    while True:
+        await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+        try:
+            renewed = await db.run(renew_lease, job_id, worker_id, JOB_LEASE_SECONDS)
+        except Exception as e:
+            # 일시적인 DB 오류는 다음 주기에 다시 시도
+            logging.warning(f"임대 연장 실패: {e}")
+            continue
+        if not renewed:
+            task.cancel()
+            return
+
+async def run_worker(worker_id, run_id, base_dir, timestamp, tiered=PRECHECK_ENABLED, poll_interval=5):
+    """
+    작업 큐에서 대상을 하나씩 임대하여 처리하는 워커
+    남은 작업이 없고 다른 워커가 처리 중인 작업도 없으면 종료합니다.
+    """
+    logger = setup_logging()
+    db = get_database()
+    processed = 0
+
+    async with BrowserPool(size=1) as pool:
+        while True:
+            job = await db.run(lease_job, run_id, worker_id, JOB_LEASE_SECONDS)
+            if job is None:
+                # 죽은 워커의 작업이 만료되면 다시 가져갈 수 있도록 대기
+                await db.run(reclaim_expired_leases, run_id)
+                counts = await db.run(queue_counts, run_id)
+                if counts["pending"] == 0 and counts["leased"] == 0:
+                    break
+                await asyncio.sleep(poll_interval)
+                continue
+
+            company, service, url = job["company"], job["service"], job["url"]
+            # 렌더링/대기/재시도가 임대 시간보다 길어져도 다른 워커가 같은 작업을 가져가지 않도록 연장
+            crawl = asyncio.create_task(crawl_target(pool, url, tiered))
+            heartbeat = asyncio.create_task(keep_lease(db, job["id"], worker_id, crawl))
+            try:
+                html_results, error = None, None
+                try:
+                    html_results = await crawl
+                except asyncio.CancelledError:
+                    if not heartbeat.done():
+                        raise
+                except Exception as e:
+                    error = e
+                if heartbeat.done():
+                    # 임대를 잃은 작업은 새로 임대한 워커가 기록하므로 결과를 버림
+                    logger.warning(f"[{worker_id}] 임대를 잃어 결과를 기록하지 않음: {company} - {service}")
+                    continue
+                logger.info(f"[{worker_id}] {company} - {service} (시도 {job['attempts']})")
+                logger.info(f"  URL: {url}")
+                await record_result(logger, base_dir, timestamp, company, service, url, html_results, error)
+                # 스냅샷이 커밋된 뒤에 작업을 완료 처리 (중간에 죽으면 다른 워커가 다시 처리)
+                await db.flush()
+                await db.run(complete_job, job["id"], worker_id)
+                processed += 1
+            except Exception as e:
+                logger.error(f"  ❌ 작업 처리 실패: {e}")
+                await db.run(fail_job, job["id"], worker_id, e)
+            finally:
+                heartbeat.cancel()
+
+    await db.close()
+    log_writer_stats(logger, db)
+    logger.info(f"[{worker_id}] 워커 종료: {processed}건 처리")
+
+def worker_main(worker_id, run_id, base_dir, timestamp, tiered):
+    """워커 프로세스 진입점"""
+    asyncio.run(run_worker(worker_id, run_id, base_dir, timestamp, tiered))
+
+def monitor_with_workers(workers, tiered=PRECHECK_ENABLED):
+    """
+    대상 목록을 작업 큐에 등록하고 워커 프로세스 workers개로 나누어 처리
+    """
+    logger = setup_logging()
+    setup_database()
+
+    base_dir = create_folders()
+    timestamp = datetime.now().strftime("%H%M%S")
+    run_id = enqueue_targets(KYOBO_URLS)
+    logger.info(f"작업 큐 모니터링 시작: 실행 {run_id}, 워커 {workers}개, 대상 {len(KYOBO_URLS)}개")
+
+    processes = [
+        multiprocessing.Process(
+            target=worker_main,
+            args=(f"{platform.node()}-{os.getpid()}-{n}", run_id, base_dir, timestamp, tiered),
+            name=f"monitor-worker-{n}"
+        )
+        for n in range(1, workers + 1)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    counts = queue_counts(run_id)
+    logger.info("완료 요약")
+    logger.info("="*50)
+    logger.info(f"완료: {counts['done']}/{len(KYOBO_URLS)}, 실패: {counts['failed']}, 미처리: {counts['pending'] + counts['leased']}")
+    logger.info(f"저장 위치: {base_dir}")
+
 if __name__ == "__main__":
-    asyncio.run(monitor_all_sites())
+    import argparse
+
+    parser = argparse.ArgumentParser(description="교보 계열사 사이트 모니터링")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY, help="전체 동시 가져오기 수 (1이면 순차 실행)")
+    parser.add_argument("--per-host", type=int, default=MAX_PER_HOST, help="호스트별 동시 가져오기 수")
+    parser.add_argument("--tiered", action=argparse.BooleanOptionalAction, default=PRECHECK_ENABLED, help="HTTP 사전 검사 후 필요할 때만 브라우저 렌더링")
+    parser.add_argument("--workers", type=int, default=0, help="작업 큐를 공유하는 워커 프로세스 수 (0이면 단일 프로세스)")
+    args = parser.parse_args()
+
+    if args.workers > 0:
+        monitor_with_workers(args.workers, args.tiered)
+    else:
+        asyncio.run(monitor_all_sites(args.concurrency, args.per_host, args.tiered))
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML 아카이브 팩 파일 모듈
+하루치 스크랩 HTML을 압축된 추가 전용(append-only) 팩 파일 하나에 모아 저장합니다.
+
+    scrapes/kyobo_scraping_<날짜>.pack  : 레코드를 이어 붙인 본문 파일
+    scrapes/kyobo_scraping_<날짜>.idx   : 레코드 위치 목록 (한 줄에 JSON 하나)
+
+레코드: MAGIC + 이름 길이(4바이트) + 이름(UTF-8) + 본문 길이(4바이트) + zlib 압축 본문
+레코드마다 따로 압축하므로 인덱스의 offset/length로 mmap에서 바로 읽을 수 있고,
+인덱스가 손상되어도 팩 파일을 처음부터 훑어 다시 만들 수 있습니다(rebuild_index).
+이름은 파일 저장 방식의 상대 경로와 같습니다 (예: "교보문고/로그인_093000_rendered.html").
+"""
+
+import json
+import mmap
+import os
+import struct
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+MAGIC = b"KPK1"
+_LENGTH = struct.Struct(">I")
+COMPRESSION_LEVEL = 6
+
+def pack_paths(base_dir):
+    """스크랩 디렉터리 경로(scrapes/kyobo_scraping_<날짜>)에 대응하는 (팩, 인덱스) 경로"""
+    base = base_dir.rstrip("/\\")
+    # 팩/인덱스 파일 경로를 직접 주어도 같은 결과
+    root, ext = os.path.splitext(base)
+    if ext in (".pack", ".idx"):
+        base = root
+    return base + ".pack", base + ".idx"
+
+class _FileLock:
+    """여러 워커 프로세스가 같은 팩에 추가할 때 쓰는 잠금 파일"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "a+b")
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if fcntl:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+
+def append_html(base_dir, name, html_content, level=COMPRESSION_LEVEL):
+    """
+    팩 파일 끝에 본문 하나를 추가하고 인덱스에 위치를 기록
+    반환: 로그용 위치 문자열 ("<팩 경로>#<이름>")
+    """
+    pack_path, index_path = pack_paths(base_dir)
+    name_bytes = name.encode("utf-8")
+    data = zlib.compress(html_content.encode("utf-8"), level)
+    record = MAGIC + _LENGTH.pack(len(name_bytes)) + name_bytes + _LENGTH.pack(len(data)) + data
+
+    with _FileLock(pack_path + ".lock"):
+        with open(pack_path, "ab") as pack:
+            start = pack.seek(0, os.SEEK_END)
+            pack.write(record)
+            pack.flush()
+            os.fsync(pack.fileno())
+        # 본문을 먼저 쓰고 인덱스를 나중에 기록 (중간에 죽으면 인덱스에 없는 레코드만 남음)
+        entry = {
+            "name": name,
+            "offset": start + len(record) - len(data),
+            "length": len(data),
+            "size": len(html_content),
+        }
+        with open(index_path, "a", encoding="utf-8") as index:
+            index.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return f"{pack_path}#{name}"
+
+def _scan_records(data):
+    """팩 파일 내용을 처음부터 훑어 인덱스 항목 생성 (끝이 잘린 레코드는 무시)"""
+    position = 0
+    header = len(MAGIC) + _LENGTH.size
+    while position + header <= len(data):
+        if data[position:position + len(MAGIC)] != MAGIC:
+            break
+        name_length = _LENGTH.unpack_from(data, position + len(MAGIC))[0]
+        name_end = position + header + name_length
+        if name_end + _LENGTH.size > len(data):
+            break
+        data_length = _LENGTH.unpack_from(data, name_end)[0]
+        offset = name_end + _LENGTH.size
+        if offset + data_length > len(data):
+            break
+        name = bytes(data[position + header:name_end]).decode("utf-8")
+        yield {"name": name, "offset": offset, "length": data_length}
+        position = offset + data_length
+
+def rebuild_index(base_dir):
+    """팩 파일을 훑어 인덱스를 다시 작성하고 레코드 수 반환"""
+    pack_path, index_path = pack_paths(base_dir)
+    with PackReader(base_dir, index=False) as reader:
+        entries = list(_scan_records(reader._data))
+        for entry in entries:
+            entry["size"] = len(reader._read(entry))
+    with open(index_path, "w", encoding="utf-8") as index:
+        for entry in entries:
+            index.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return len(entries)
+
+class PackReader:
+    """
+    팩 파일 읽기 (mmap으로 필요한 레코드만 읽음)
+    같은 이름이 여러 번 추가되었으면 마지막 레코드를 사용
+    """
+
+    def __init__(self, base_dir, index=True):
+        self.pack_path, self.index_path = pack_paths(base_dir)
+        self._file = open(self.pack_path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # 빈 파일은 mmap할 수 없으므로 빈 바이트열로 대신
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._entries = {}
+        if index:
+            self._load_index(size)
+
+    def _load_index(self, size):
+        if not os.path.exists(self.index_path):
+            for entry in _scan_records(self._data):
+                self._entries[entry["name"]] = entry
+            return
+        with open(self.index_path, encoding="utf-8") as index:
+            for line in index:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 기록 중 끊긴 마지막 줄
+                    continue
+                if entry["offset"] + entry["length"] <= size:
+                    self._entries[entry["name"]] = entry
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def names(self):
+        """저장된 이름 목록 (추가된 순서)"""
+        return list(self._entries)
+
+    def _read(self, entry):
+        return zlib.decompress(self._data[entry["offset"]:entry["offset"] + entry["length"]]).decode("utf-8")
+
+    def read(self, name):
+        """이름으로 본문 읽기 (없으면 KeyError)"""
+        return self._read(self._entries[name])
+
+def convert_directory(base_dir, remove=False):
+    """
+    기존 스크랩 디렉터리(관계사별 HTML 파일)를 팩 파일로 변환
+    이미 팩에 있는 이름은 건너뛰므로 여러 번 실행해도 됨
+    remove=True이면 팩에서 다시 읽어 내용이 같은 것을 확인한 뒤 원본 파일 삭제
+    반환: {"added": 추가 수, "skipped": 건너뛴 수, "removed": 삭제 수, "bytes_before": 원본 크기}
+    """
+    stats = {"added": 0, "skipped": 0, "removed": 0, "bytes_before": 0}
+    pack_path, _ = pack_paths(base_dir)
+    existing = set()
+    if os.path.exists(pack_path):
+        with PackReader(base_dir) as reader:
+            existing = set(reader.names())
+
+    files = []
+    for company in sorted(os.listdir(base_dir)):
+        company_dir = os.path.join(base_dir, company)
+        if not os.path.isdir(company_dir):
+            continue
+        for filename in sorted(os.listdir(company_dir)):
+            if filename.endswith(".html"):
+                files.append((f"{company}/{filename}", os.path.join(company_dir, filename)))
+
+    for name, path in files:
+        if name in existing:
+            stats["skipped"] += 1
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+        append_html(base_dir, name, html)
+        stats["added"] += 1
+        stats["bytes_before"] += os.path.getsize(path)
+
+    if remove:
+        with PackReader(base_dir) as reader:
+            for name, path in files:
+                with open(path, "r", encoding="utf-8") as f:
+                    if name not in reader or reader.read(name) != f.read():
+                        continue
+                os.remove(path)
+                stats["removed"] += 1
+        for company in os.listdir(base_dir):
+            company_dir = os.path.join(base_dir, company)
+            if os.path.isdir(company_dir) and not os.listdir(company_dir):
+                os.rmdir(company_dir)
+        if not os.listdir(base_dir):
+            os.rmdir(base_dir)
+    return stats
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="스크랩 HTML 팩 파일 관리")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    convert_parser = subparsers.add_parser("convert", help="스크랩 디렉터리를 팩 파일로 변환")
+    convert_parser.add_argument("dirs", nargs="+", help="scrapes/kyobo_scraping_<날짜> 디렉터리")
+    convert_parser.add_argument("--remove", action="store_true", help="변환 확인 후 원본 파일 삭제")
+    list_parser = subparsers.add_parser("list", help="팩에 저장된 이름 목록")
+    list_parser.add_argument("base_dir")
+    cat_parser = subparsers.add_parser("cat", help="팩에서 본문 하나 출력")
+    cat_parser.add_argument("base_dir")
+    cat_parser.add_argument("name")
+    reindex_parser = subparsers.add_parser("reindex", help="팩 파일을 훑어 인덱스 재작성")
+    reindex_parser.add_argument("base_dir")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        for base_dir in args.dirs:
+            result = convert_directory(base_dir, remove=args.remove)
+            pack_size = os.path.getsize(pack_paths(base_dir)[0]) if os.path.exists(pack_paths(base_dir)[0]) else 0
+            print(f"{base_dir}: 추가 {result['added']}, 건너뜀 {result['skipped']}, 삭제 {result['removed']} "
+                  f"({result['bytes_before']:,} bytes -> 팩 {pack_size:,} bytes)")
+    elif args.command == "list":
+        with PackReader(args.base_dir) as reader:
+            for name in reader.names():
+                print(name)
+    elif args.command == "cat":
+        with PackReader(args.base_dir) as reader:
+            print(reader.read(args.name))
+    elif args.command == "reindex":
+        print(f"레코드 {rebuild_index(args.base_dir)}개")
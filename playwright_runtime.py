@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+동기 호출용 Playwright 런타임 모듈
+백그라운드 스레드에서 이벤트 루프와 BrowserPool을 계속 유지하여,
+동기 코드(fetcher.fetch_page 등)도 매번 브라우저를 띄우지 않고 풀을 재사용합니다.
+여러 스레드에서 동시에 호출해도 안전하며, 인터프리터 종료 시 자동으로 정리됩니다.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import os
+import threading
+
+from browser_pool import BrowserPool
+from config.config import BROWSER_POOL_SIZE
+
+class PlaywrightRuntime:
+    """백그라운드 이벤트 루프 스레드 + 브라우저 풀"""
+
+    def __init__(self, pool_size=BROWSER_POOL_SIZE, headless=True):
+        self.pool_size = pool_size
+        self.headless = headless
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._pool = None
+        self._pid = None
+
+    @property
+    def running(self):
+        # fork된 자식 프로세스에는 부모의 스레드가 없으므로 실행 중이 아닌 것으로 본다
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    def start(self):
+        """런타임이 실행 중이 아니면 시작 (이미 실행 중이면 아무것도 하지 않음)"""
+        with self._lock:
+            if self.running:
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="playwright-runtime", daemon=True)
+            thread.start()
+            pool = BrowserPool(size=self.pool_size, headless=self.headless)
+            try:
+                asyncio.run_coroutine_threadsafe(pool.start(), loop).result()
+            except Exception:
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
+                raise
+            self._loop, self._thread, self._pool, self._pid = loop, thread, pool, os.getpid()
+            logging.info("Playwright 런타임 시작")
+
+    def run(self, coro_factory, timeout=None):
+        """
+        coro_factory(pool)가 만든 코루틴을 런타임 루프에서 실행하고 결과를 반환 (블로킹)
+        timeout을 넘기면 코루틴을 취소하여 빌린 브라우저 컨텍스트와 호스트 슬롯을 돌려준 뒤 TimeoutError를 다시 발생
+        """
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coro_factory(self._pool), self._loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def shutdown(self, timeout=30):
+        """브라우저 풀과 이벤트 루프 스레드 종료"""
+        with self._lock:
+            if not self.running:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._pool.close(), self._loop).result(timeout)
+            except Exception as e:
+                logging.warning(f"Playwright 런타임 종료 중 오류: {e}")
+            finally:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout)
+                self._loop.close()
+                self._loop, self._thread, self._pool, self._pid = None, None, None, None
+
+_runtime = PlaywrightRuntime()
+atexit.register(_runtime.shutdown)
+
+def get_runtime():
+    """프로세스 공용 런타임 반환"""
+    return _runtime
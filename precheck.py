@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP 사전 검사 모듈
+헤드리스 브라우저를 띄우기 전에 keep-alive HTTP 세션으로 조건부 요청
+(ETag / If-Modified-Since)을 보내고, 정적 HTML의 정규화 해시를 이전 값과 비교하여
+렌더링이 필요한지 판단합니다.
+check_static()은 HTTP 요청만 하고 DB에는 접근하지 않습니다. 이전 상태(database.get_http_state)는
+호출자가 읽어 넘기고, 새 상태는 commit_static_state()로 호출자의 트랜잭션에서 저장합니다.
+"""
+
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from database import save_http_state
+from simple_compare import normalized_hash
+from size_guard import DEFAULT_MAX_BYTES, content_length_exceeds
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """호스트별 keep-alive 연결을 재사용하는 공용 세션 반환"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+def static_hash(html, url=None):
+    """동적 요소를 정규화한 정적 HTML의 SHA256 해시 (url: 사이트별 정규화 규칙 적용)"""
+    return normalized_hash(html, url)
+
+def read_limited(response, max_bytes, chunk_size=64 * 1024):
+    """
+    스트리밍 응답 본문을 max_bytes까지만 읽어 문자열로 반환
+    상한을 넘으면 즉시 연결을 닫고 None 반환
+    """
+    if content_length_exceeds(response.headers, max_bytes):
+        response.close()
+        return None
+
+    body = bytearray()
+    for chunk in response.iter_content(chunk_size):
+        body += chunk
+        if len(body) > max_bytes:
+            response.close()
+            return None
+
+    # charset이 명시되지 않은 text/*는 requests가 ISO-8859-1로 가정하므로 UTF-8 사용
+    content_type = response.headers.get("Content-Type", "")
+    encoding = response.encoding if "charset" in content_type.lower() else "utf-8"
+    return body.decode(encoding or "utf-8", errors="replace")
+
+def check_static(url, previous=None, render_required=False, timeout=15, session=None, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    조건부 요청으로 정적 HTML을 확인하고 렌더링 필요 여부를 반환합니다.
+    previous: 이전 검사 상태 (database.get_http_state, 없으면 None)
+
+    반환값:
+        {"render": bool, "reason": str, "status": int|None, "state": dict|None}
+    state는 렌더링까지 성공한 뒤(렌더링을 건너뛰면 바로) commit_static_state()로 저장해야 합니다.
+    (렌더링이 실패했는데 바뀐 상태만 저장되면 다음 검사에서 변경을 놓칠 수 있음)
+    """
+    session = session or get_session()
+
+    headers = {}
+    if previous:
+        if previous["etag"]:
+            headers["If-None-Match"] = previous["etag"]
+        if previous["last_modified"]:
+            headers["If-Modified-Since"] = previous["last_modified"]
+
+    try:
+        with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+            if response.status_code == 304 and previous:
+                return {"render": render_required, "reason": "not_modified", "status": 304, "state": None}
+
+            if response.status_code != 200:
+                return {"render": True, "reason": f"http_{response.status_code}", "status": response.status_code, "state": None}
+
+            html = read_limited(response, max_bytes)
+            validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    except requests.RequestException as e:
+        logging.warning(f"HTTP 사전 검사 실패, 브라우저로 진행: {url}, 오류: {e}")
+        return {"render": True, "reason": "request_failed", "status": None, "state": None}
+
+    if html is None:
+        # 브라우저 경로에서도 같은 상한으로 중단되어 실패로 기록됨
+        return {"render": True, "reason": "too_large", "status": 200, "state": None}
+
+    state = {
+        "etag": validators[0],
+        "last_modified": validators[1],
+        "static_hash": static_hash(html, url),
+    }
+
+    if not previous or not previous["static_hash"]:
+        reason = "first_check"
+    elif previous["static_hash"] != state["static_hash"]:
+        reason = "static_changed"
+    else:
+        # 본문은 같지만 검증자가 바뀌었을 수 있으므로 상태는 갱신
+        return {"render": render_required, "reason": "static_same", "status": 200, "state": state}
+
+    return {"render": True, "reason": reason, "status": 200, "state": state}
+
+def commit_static_state(conn, url, result):
+    """check_static() 결과의 상태를 저장 (렌더링 성공 후 호출, 커밋은 호출자가 담당)"""
+    if result and result.get("state"):
+        state = result["state"]
+        save_http_state(conn, url, state["etag"], state["last_modified"], state["static_hash"])
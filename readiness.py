@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+페이지 렌더링 완료 대기 전략 모듈
+고정 sleep 대신 DOM 안정(변경 없음) 구간이나 특정 요소의 등장을 기다리며,
+모든 전략은 상한 시간(timeout_ms)을 넘지 않습니다.
+"""
+
+import asyncio
+import random
+import time
+
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+DEFAULT_READINESS = {"type": "dom_quiet", "quiet_ms": 1000, "timeout_ms": 15000}
+
+# MutationObserver로 DOM 변경을 감시하다가 quietMs 동안 조용하면 resolve
+DOM_QUIET_SCRIPT = """
+([quietMs, timeoutMs]) => new Promise(resolve => {
+    const start = performance.now();
+    let done = false;
+    let quietTimer = null;
+    let observer = null;
+    const finish = (reason) => {
+        if (done) return;
+        done = true;
+        if (observer) observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(hardTimer);
+        resolve({reason: reason, elapsed: performance.now() - start});
+    };
+    const hardTimer = setTimeout(() => finish('timeout'), timeoutMs);
+    quietTimer = setTimeout(() => finish('quiet'), quietMs);
+    observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => finish('quiet'), quietMs);
+    });
+    observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+})
+"""
+
+def _remaining_ms(deadline):
+    return max(0, int((deadline - time.monotonic()) * 1000))
+
+def _is_navigation_error(error):
+    """리다이렉트 등으로 실행 컨텍스트가 바뀐 경우인지 확인"""
+    message = str(error)
+    return "Execution context was destroyed" in message or "navigation" in message.lower()
+
+async def wait_until_ready_async(page, strategy=None):
+    """
+    전략에 따라 페이지가 준비될 때까지 대기 (비동기)
+    완료 사유('quiet', 'selector', 'networkidle', 'timeout')를 반환합니다.
+    """
+    strategy = strategy or DEFAULT_READINESS
+    kind = strategy.get("type", "dom_quiet")
+    timeout_ms = strategy.get("timeout_ms", DEFAULT_READINESS["timeout_ms"])
+    deadline = time.monotonic() + timeout_ms / 1000
+
+    try:
+        if kind == "selector":
+            await page.wait_for_selector(strategy["selector"], state="attached", timeout=timeout_ms)
+            return "selector"
+
+        if kind == "networkidle":
+            await page.wait_for_load_state("networkidle", timeout=timeout_ms)
+            # CSR 동작 및 봇 탐지 회피를 위한 추가 무작위 지연
+            low, high = strategy.get("extra_delay", (0, 0))
+            await asyncio.sleep(min(random.uniform(low, high), _remaining_ms(deadline) / 1000))
+            return "networkidle"
+
+        quiet_ms = strategy.get("quiet_ms", DEFAULT_READINESS["quiet_ms"])
+        while _remaining_ms(deadline) > 0:
+            try:
+                await page.wait_for_load_state("domcontentloaded", timeout=_remaining_ms(deadline) or 1)
+                result = await page.evaluate(DOM_QUIET_SCRIPT, [quiet_ms, _remaining_ms(deadline) or 1])
+                return result["reason"]
+            except PlaywrightTimeoutError:
+                raise
+            except PlaywrightError as e:
+                # 대기 중 페이지가 이동했으면 새 문서에서 다시 감시
+                if not _is_navigation_error(e):
+                    raise
+    except PlaywrightTimeoutError:
+        pass
+    return "timeout"
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+요청 차단 모듈
+해시 대상 HTML에 영향을 주지 않는 리소스(이미지, 폰트, 채팅 위젯, 분석 비콘 등)를
+Playwright 요청 라우팅으로 차단하고, 가져오기마다 차단/허용 건수를 집계합니다.
+"""
+
+import re
+from collections import Counter
+
+class RequestFilter:
+    """
+    rules 예시:
+        {"resource_types": ["image", "font"], "url_patterns": [r"gitple\\.io"]}
+    메인 문서 요청은 규칙과 관계없이 항상 허용합니다.
+    """
+
+    def __init__(self, rules=None):
+        rules = rules or {}
+        self.resource_types = set(rules.get("resource_types", []))
+        self.url_patterns = [re.compile(p) for p in rules.get("url_patterns", [])]
+        self.allowed = 0
+        self.blocked = 0
+        self.blocked_by_type = Counter()
+
+    @property
+    def enabled(self):
+        return bool(self.resource_types or self.url_patterns)
+
+    def should_block(self, request):
+        """요청을 차단해야 하는지 판단"""
+        if request.is_navigation_request() and request.frame.parent_frame is None:
+            return False
+        if request.resource_type in self.resource_types:
+            return True
+        return any(p.search(request.url) for p in self.url_patterns)
+
+    def _count(self, request):
+        if self.should_block(request):
+            self.blocked += 1
+            self.blocked_by_type[request.resource_type] += 1
+            return True
+        self.allowed += 1
+        return False
+
+    async def handle_async(self, route):
+        """라우트 핸들러"""
+        if self._count(route.request):
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    async def attach_async(self, page):
+        """페이지에 라우팅 등록 (규칙이 없으면 등록하지 않음)"""
+        if self.enabled:
+            await page.route("**/*", self.handle_async)
+
+    def stats(self):
+        """가져오기 1회의 차단/허용 집계"""
+        return {
+            "allowed": self.allowed,
+            "blocked": self.blocked,
+            "blocked_by_type": dict(self.blocked_by_type),
+        }
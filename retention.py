@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스냅샷 보존 정책 및 압축(compaction) 모듈
+오래된 스냅샷 중 변경 시점이 아닌 행을 보존 단계(RETENTION["tiers"])에 따라 삭제하고,
+삭제된 "변경 없음" 구간은 snapshot_ranges에 "T1부터 T2까지 동일"로 남깁니다.
+
+보존 단계 (스냅샷 나이 기준)
+    all    : 모두 보존 (첫 단계 이전)
+    daily  : 변경 시점 + 하루 한 건
+    changes: 변경 시점만
+URL별 최신 스냅샷과 변경 시점(직전 행과 정규화 해시가 다른 행)은 항상 보존합니다.
+원문 content_hash는 요청마다 바뀌는 토큰/nonce 때문에 거의 매번 달라지므로 변경 시점 판단에 쓰지 않고,
+정규화 해시는 규칙 버전과 함께 비교합니다 (정규화 해시가 없는 예전 행만 content_hash로 비교).
+작업은 batch_size 행 단위의 짧은 트랜잭션으로 나누어 실행하므로 모니터링과 동시에 돌려도 됩니다.
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta
+
+from config.config import RETENTION
+from database import get_connection, setup_database
+from metrics import prune_fetch_metrics
+
+def keep_mode(timestamp, now, tiers):
+    """스냅샷 시각이 속한 보존 단계 ('all', 'daily', 'changes')"""
+    age = now - datetime.fromisoformat(timestamp)
+    mode = "all"
+    for tier in sorted(tiers, key=lambda t: t["after_days"]):
+        if age >= timedelta(days=tier["after_days"]):
+            mode = tier["keep"]
+    return mode
+
+def _free_bytes(conn):
+    """데이터베이스 파일 안의 빈 페이지 크기 (VACUUM으로 회수 가능한 공간)"""
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    return conn.execute("PRAGMA freelist_count").fetchone()[0] * page_size
+
+def _collapse(conn, url, anchor, last_timestamp, count):
+    """anchor 스냅샷부터 last_timestamp까지 변경 없음 구간 기록 (기존 구간이면 연장)"""
+    conn.execute(
+        """
+        INSERT INTO snapshot_ranges (url, anchor_snapshot_id, content_hash, first_timestamp, last_timestamp, collapsed)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(url, anchor_snapshot_id) DO UPDATE SET
+            last_timestamp = max(last_timestamp, excluded.last_timestamp),
+            collapsed = collapsed + excluded.collapsed
+        """,
+        (url, anchor[0], anchor[2], anchor[1], last_timestamp, count)
+    )
+
+def change_key(content_hash, normalized_hash, ruleset_version):
+    """변경 시점 판단 기준 (정규화 해시와 규칙 버전, 정규화 해시가 없으면 원문 해시)"""
+    if normalized_hash:
+        return (normalized_hash, ruleset_version)
+    return content_hash
+
+def compact_url(conn, url, now, policy, stats, dry_run=False):
+    """URL 하나의 스냅샷을 시간 순서대로 훑으며 보존 정책 적용"""
+    tiers = policy["tiers"]
+    if not tiers:
+        return
+    # 첫 단계보다 최근 스냅샷은 모두 보존하므로 볼 필요 없음
+    cutoff = (now - timedelta(days=min(t["after_days"] for t in tiers))).isoformat()
+    latest = conn.execute("SELECT snapshot_id FROM latest_snapshots WHERE url = ?", (url,)).fetchone()
+    latest_id = latest[0] if latest else None
+
+    prev_key, anchor, kept_day = None, None, None
+    position = ("", 0)
+    while True:
+        rows = conn.execute(
+            """
+            SELECT id, timestamp, content_hash, normalized_hash, ruleset_version FROM snapshots
+            WHERE url = ? AND timestamp < ? AND (timestamp, id) > (?, ?)
+            ORDER BY timestamp, id LIMIT ?
+            """,
+            (url, cutoff, position[0], position[1], policy["batch_size"])
+        ).fetchall()
+        if not rows:
+            break
+
+        delete_ids = []
+        collapsed = {}
+        for row in rows:
+            snapshot_id, timestamp, content_hash, normalized_hash, ruleset_version = row
+            key = change_key(content_hash, normalized_hash, ruleset_version)
+            mode = keep_mode(timestamp, now, tiers)
+            day = timestamp[:10]
+            if key != prev_key:
+                # 변경 시점: 이후 같은 내용의 행은 이 행을 기준으로 구간에 합친다
+                anchor = (snapshot_id, timestamp, content_hash)
+                keep = True
+            elif snapshot_id == latest_id:
+                keep = True
+            elif mode == "daily" and day != kept_day:
+                keep = True
+            else:
+                keep = False
+            prev_key = key
+            if keep:
+                kept_day = day
+            else:
+                delete_ids.append(snapshot_id)
+                last, count = collapsed.get(anchor, (timestamp, 0))
+                collapsed[anchor] = (max(last, timestamp), count + 1)
+        position = (rows[-1][1], rows[-1][0])
+
+        stats["scanned"] += len(rows)
+        stats["snapshots_deleted"] += len(delete_ids)
+        stats["ranges_updated"] += len(collapsed)
+        if dry_run or not delete_ids:
+            continue
+        # 배치마다 짧게 커밋하여 모니터의 쓰기를 오래 막지 않는다
+        with conn:
+            conn.executemany("DELETE FROM snapshots WHERE id = ?", [(i,) for i in delete_ids])
+            for anchor_row, (last_timestamp, count) in collapsed.items():
+                _collapse(conn, url, anchor_row, last_timestamp, count)
+        time.sleep(policy.get("pause", 0))
+
+def delete_orphan_blobs(conn, policy, stats):
+    """
+    어떤 스냅샷도 참조하지 않는 블롭 삭제
+    다른 블롭의 차분 기준(base)인 블롭은 남기고, 차분이 지워져 기준이 고아가 되면 다음 반복에서 삭제
+    """
+    while True:
+        with conn:
+            rows = conn.execute(
+                """
+                SELECT id, length(content) FROM blobs b
+                WHERE NOT EXISTS (SELECT 1 FROM snapshots s WHERE s.blob_hash = b.hash)
+                  AND NOT EXISTS (SELECT 1 FROM latest_snapshots l WHERE l.blob_hash = b.hash)
+                  AND NOT EXISTS (SELECT 1 FROM blobs d WHERE d.base_hash = b.hash)
+                LIMIT ?
+                """,
+                (policy["batch_size"],)
+            ).fetchall()
+            if not rows:
+                return
+            conn.executemany("DELETE FROM blobs WHERE id = ?", [(row[0],) for row in rows])
+        stats["blobs_deleted"] += len(rows)
+        stats["blob_bytes_deleted"] += sum(row[1] for row in rows)
+        time.sleep(policy.get("pause", 0))
+
+def _delete_unreferenced(conn, table, column, policy):
+    """어떤 스냅샷도 column으로 참조하지 않는 table 행을 batch_size건씩 삭제하고 삭제 건수 반환"""
+    deleted = 0
+    while True:
+        with conn:
+            cursor = conn.execute(
+                f"""
+                DELETE FROM {table} WHERE id IN (
+                    SELECT id FROM {table} t
+                    WHERE NOT EXISTS (SELECT 1 FROM snapshots s WHERE s.{column} = t.hash)
+                      AND NOT EXISTS (SELECT 1 FROM latest_snapshots l WHERE l.{column} = t.hash)
+                    LIMIT ?
+                )
+                """,
+                (policy["batch_size"],)
+            )
+        deleted += cursor.rowcount
+        if cursor.rowcount < policy["batch_size"]:
+            return deleted
+        time.sleep(policy.get("pause", 0))
+
+def delete_orphan_fingerprints(conn, policy, stats):
+    """어떤 스냅샷도 참조하지 않는 DOM 구조 지문 삭제"""
+    stats["fingerprints_deleted"] += _delete_unreferenced(conn, "dom_fingerprints", "dom_hash", policy)
+
+def delete_orphan_surfaces(conn, policy, stats):
+    """어떤 스냅샷도 참조하지 않는 보안 표면 기록 삭제"""
+    stats["surfaces_deleted"] += _delete_unreferenced(conn, "security_surfaces", "surface_hash", policy)
+
+def compact(policy=None, now=None, dry_run=False):
+    """
+    모든 URL에 보존 정책을 적용하고 고아 블롭을 정리
+    반환: {"scanned", "snapshots_deleted", "ranges_updated", "blobs_deleted", "blob_bytes_deleted", "fingerprints_deleted", "surfaces_deleted", "metrics_deleted", "free_bytes"}
+    free_bytes는 정리로 늘어난 빈 페이지 크기 (VACUUM 시 파일에서 회수됨)
+    dry_run=True이면 삭제 대상만 집계하고 아무것도 바꾸지 않음 (블롭은 집계하지 않음)
+    """
+    policy = policy or RETENTION
+    now = now or datetime.now()
+    stats = {"scanned": 0, "snapshots_deleted": 0, "ranges_updated": 0, "blobs_deleted": 0, "blob_bytes_deleted": 0, "fingerprints_deleted": 0, "surfaces_deleted": 0, "metrics_deleted": 0, "free_bytes": 0}
+    conn = get_connection()
+    free_before = _free_bytes(conn)
+
+    urls = [row[0] for row in conn.execute("SELECT url FROM latest_snapshots ORDER BY url")]
+    for url in urls:
+        compact_url(conn, url, now, policy, stats, dry_run)
+    if not dry_run:
+        delete_orphan_blobs(conn, policy, stats)
+        delete_orphan_fingerprints(conn, policy, stats)
+        delete_orphan_surfaces(conn, policy, stats)
+        # 원본 가져오기 지표도 보존 기간이 지나면 삭제 (시간/일 집계는 유지)
+        stats["metrics_deleted"] = prune_fetch_metrics(now)
+
+    stats["free_bytes"] = max(0, _free_bytes(conn) - free_before)
+    logging.info(
+        f"스냅샷 정리: {stats['scanned']}건 검사, {stats['snapshots_deleted']}건 삭제, 구간 {stats['ranges_updated']}개 갱신, "
+        f"블롭 {stats['blobs_deleted']}개 ({stats['blob_bytes_deleted']:,} bytes) 삭제"
+    )
+    return stats
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="스냅샷 보존 정책 적용 및 정리")
+    parser.add_argument("--dry-run", action="store_true", help="삭제 대상만 집계하고 변경하지 않음")
+    args = parser.parse_args()
+
+    setup_database()
+    result = compact(dry_run=args.dry_run)
+    print(f"검사 {result['scanned']:,}건, 삭제 {result['snapshots_deleted']:,}건, 구간 갱신 {result['ranges_updated']:,}개")
+    print(f"블롭 {result['blobs_deleted']:,}개 삭제: {result['blob_bytes_deleted']:,} bytes")
+    print(f"빈 페이지 증가: {result['free_bytes']:,} bytes (파일 크기를 줄이려면 VACUUM을 실행하세요)")
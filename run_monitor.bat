@@ -1,4 +1,4 @@
 @echo off
 cd /d "C:\Users\KICO\web_page_monitor"
-py -3.11 monitor.py
+py -3.11 monitor_all_sites.py
 pause 
\ No newline at end of file
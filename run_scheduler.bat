@@ -0,0 +1,4 @@
+@echo off
+cd /d "C:\Users\KICO\web_page_monitor"
+py -3.11 scheduler.py
+pause 
\ No newline at end of file
@@ -6,9 +6,13 @@ HTML 파일 저장 및 데이터베이스 스냅샷 저장을 담당합니다.
 """
 
 import os
-import sqlite3
 from datetime import datetime
-from config.config import DATABASE_PATH
+from config.config import ARCHIVE_BACKEND
+from database import get_connection
+from blob_store import put_blob
+from dom_fingerprint import save_fingerprint
+from pack_archive import append_html
+from security_surface import save_surface
 
 def create_folders():
     """날짜별 폴더 구조 생성"""
@@ -16,6 +20,11 @@ def create_folders():
     # 저장 경로를 scrapes 폴더로 변경
     base_dir = os.path.join("scrapes", f"kyobo_scraping_{date_str}")
     
+    # 팩 파일 방식은 scrapes 폴더에 날짜별 팩 파일만 만든다
+    if ARCHIVE_BACKEND == "pack":
+        os.makedirs(os.path.dirname(base_dir), exist_ok=True)
+        return base_dir
+    
     # 기본 폴더 생성
     os.makedirs(base_dir, exist_ok=True)
     
@@ -28,8 +37,10 @@ def create_folders():
     return base_dir
 
 def save_html_to_file(base_dir, company, service, timestamp, html_content):
-    """스크래핑한 HTML을 파일로 저장"""
+    """스크래핑한 HTML을 파일(또는 날짜별 팩 파일)로 저장하고 저장 위치 반환"""
     filename = f"{service}_{timestamp}.html"
+    if ARCHIVE_BACKEND == "pack":
+        return append_html(base_dir, f"{company}/{filename}", html_content)
     filepath = os.path.join(base_dir, company, filename)
     
     with open(filepath, 'w', encoding='utf-8') as f:
@@ -37,15 +48,76 @@ def save_html_to_file(base_dir, company, service, timestamp, html_content):
     
     return filepath
 
-def save_snapshot(url, content_hash, html_content, html_size=0, change_detected=False, change_details=None):
+def _store_html(conn, url, html_content, timestamp):
+    """본문을 blobs 테이블에 저장하고 키 반환 (빈 본문이면 None)"""
+    # 본문은 blobs 테이블에 한 번만 저장하고 스냅샷은 해시로 참조
+    # (delta 모드에서는 같은 URL의 직전 본문에 대한 차분으로 저장)
+    previous = conn.execute("SELECT blob_hash FROM latest_snapshots WHERE url = ?", (url,)).fetchone()
+    if previous is not None and previous[0] is None:
+        # 직전 스냅샷이 실패 기록이면 마지막으로 본문이 있던 스냅샷 사용
+        previous = conn.execute(
+            "SELECT blob_hash FROM snapshots WHERE url = ? AND blob_hash IS NOT NULL ORDER BY timestamp DESC LIMIT 1",
+            (url,)
+        ).fetchone()
+    return put_blob(conn, html_content, timestamp, base_key=previous[0] if previous else None)
+
+def insert_snapshot(conn, url, content_hash, html_content, html_size=0, change_detected=False, change_details=None, timestamp=None, blob_hash=None,
+                    normalized_hash=None, ruleset_version=None, fingerprint=None, dom_hash=None, surface=None, surface_hash=None):
+    """
+    스냅샷 한 건을 현재 트랜잭션에 추가 (커밋은 호출자가 담당)
+    blob_hash를 주면 이미 저장된 본문을 그대로 참조 (html_content는 무시)
+    normalized_hash/ruleset_version: 정규화 해시와 계산에 쓴 정규화 규칙 버전 (변경 비교용)
+    fingerprint: DOM 구조 지문 (dom_fingerprint.fingerprint, 같은 트랜잭션에서 저장), dom_hash: 이미 저장된 지문 참조
+    surface: 보안 표면 기록 (security_surface.extract, 같은 트랜잭션에서 저장), surface_hash: 이미 저장된 기록 참조
+    저장된 스냅샷의 timestamp 반환
+    """
+    cursor = conn.cursor()
+    timestamp = timestamp or datetime.now().isoformat()
+    if blob_hash is None:
+        blob_hash = _store_html(conn, url, html_content, timestamp)
+    if fingerprint is not None:
+        dom_hash = save_fingerprint(conn, fingerprint)
+    if surface is not None:
+        surface_hash = save_surface(conn, surface)
+    
+    cursor.execute(
+        """
+        INSERT INTO snapshots (timestamp, url, content_hash, html_content, html_size, change_detected, change_details, blob_hash, normalized_hash, ruleset_version, dom_hash, surface_hash)
+        VALUES (?, ?, ?, '', ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (timestamp, url, content_hash, html_size, change_detected, change_details, blob_hash, normalized_hash, ruleset_version, dom_hash, surface_hash)
+    )
+    # 최신 상태 테이블도 같은 트랜잭션에서 갱신
+    cursor.execute(
+        """
+        INSERT OR REPLACE INTO latest_snapshots (url, snapshot_id, timestamp, content_hash, blob_hash, html_size, change_detected, normalized_hash, ruleset_version, dom_hash, surface_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (url, cursor.lastrowid, timestamp, content_hash, blob_hash, html_size, change_detected, normalized_hash, ruleset_version, dom_hash, surface_hash)
+    )
+    return timestamp
+
+def update_snapshot_analysis(conn, snapshot_id, normalized_hash=None, ruleset_version=None, fingerprint=None, surface=None):
+    """
+    이미 저장된 스냅샷에 나중에 계산한 정규화 해시/구조 지문/보안 표면 기록 저장 (커밋은 호출자가 담당)
+    주어진 값만 갱신하며, 최신 상태 테이블도 같은 스냅샷이면 함께 갱신
+    """
+    values = {}
+    if normalized_hash is not None:
+        values["normalized_hash"] = normalized_hash
+        values["ruleset_version"] = ruleset_version
+    if fingerprint is not None:
+        values["dom_hash"] = save_fingerprint(conn, fingerprint)
+    if surface is not None:
+        values["surface_hash"] = save_surface(conn, surface)
+    if not values:
+        return
+    assignments = ", ".join(f"{column} = ?" for column in values)
+    conn.execute(f"UPDATE snapshots SET {assignments} WHERE id = ?", (*values.values(), snapshot_id))
+    conn.execute(f"UPDATE latest_snapshots SET {assignments} WHERE snapshot_id = ?", (*values.values(), snapshot_id))
+
+def save_snapshot(url, content_hash, html_content, html_size=0, change_detected=False, change_details=None, normalized_hash=None, ruleset_version=None):
     """Saves a new snapshot to the database."""
-    with sqlite3.connect(DATABASE_PATH) as conn:
-        cursor = conn.cursor()
-        timestamp = datetime.now().isoformat()
-        
-        cursor.execute(
-            "INSERT INTO snapshots (timestamp, url, content_hash, html_content, html_size, change_detected, change_details) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (timestamp, url, content_hash, html_content, html_size, change_detected, change_details)
-        )
-        conn.commit()
-        return timestamp
+    with get_connection() as conn:
+        return insert_snapshot(conn, url, content_hash, html_content, html_size, change_detected, change_details,
+                               normalized_hash=normalized_hash, ruleset_version=ruleset_version)
@@ -1,7 +1,7 @@
 # PowerShell 스케줄링 스크립트
 # 이 스크립트를 실행하면 매일 오전 9시에 모니터링이 실행됩니다
 
-$Action = New-ScheduledTaskAction -Execute "py" -Argument "-3.11 monitor.py" -WorkingDirectory "C:\Users\KICO\web_page_monitor"
+$Action = New-ScheduledTaskAction -Execute "py" -Argument "-3.11 monitor_all_sites.py" -WorkingDirectory "C:\Users\KICO\web_page_monitor"
 $Trigger = New-ScheduledTaskTrigger -Daily -At 9AM
 $Principal = New-ScheduledTaskPrincipal -UserId "$env:USERDOMAIN\$env:USERNAME" -LogonType Interactive -RunLevel Highest
 
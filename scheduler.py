@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+적응형 모니터링 스케줄러
+대상별로 주기와 지터를 두고 계속 실행되는 asyncio 데몬입니다.
+snapshots 테이블의 change_detected 이력을 보고 자주 바뀌는 대상은 더 자주,
+안정적인 대상은 더 드물게 확인합니다.
+"""
+
+import asyncio
+import heapq
+import random
+import signal
+import sys
+import time
+from datetime import datetime
+
+from async_db import get_database
+from database import get_change_history
+from logger import setup_logging
+from config.config import BROWSER_POOL_SIZE, MAX_CONCURRENCY, MAX_PER_HOST, PRECHECK_ENABLED
+from config.targets import get_target_settings
+from config.urls import KYOBO_URLS
+from browser_pool import BrowserPool
+from host_limiter import HostLimiter
+from monitor_all_sites import crawl_target, log_writer_stats, record_result
+from saver import create_folders
+
+# 주기 계산에 사용할 최근 스냅샷 수
+HISTORY_SIZE = 20
+# 이력이 이보다 적으면 base_interval 사용
+MIN_HISTORY = 3
+
+# 표준 출력 인코딩 설정 (Windows 환경에서 한글 깨짐 방지)
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+def compute_interval(history, schedule):
+    """
+    변경 이력(최신순 change_detected 목록)으로 다음 확인까지의 주기(초) 계산
+
+    변경 비율이 0이면 max_interval, 1이면 min_interval이 되도록 기하 보간하고,
+    직전 확인에서 변경이 있었으면 주기를 절반으로 줄인다.
+    """
+    min_interval = schedule["min_interval"]
+    max_interval = schedule["max_interval"]
+    if len(history) < MIN_HISTORY:
+        return schedule["base_interval"]
+
+    change_rate = sum(history) / len(history)
+    interval = max_interval * (min_interval / max_interval) ** change_rate
+    if history[0]:
+        interval /= 2
+    return max(min_interval, min(max_interval, interval))
+
+def with_jitter(interval, jitter):
+    """주기에 ±jitter 비율의 무작위 오차 추가"""
+    return interval * random.uniform(1 - jitter, 1 + jitter)
+
+class AdaptiveScheduler:
+    """대상별 다음 확인 시각을 힙으로 관리하며 도래한 대상을 가져오는 데몬"""
+
+    def __init__(self, targets=KYOBO_URLS, max_concurrency=MAX_CONCURRENCY,
+                 max_per_host=MAX_PER_HOST, tiered=PRECHECK_ENABLED):
+        self.targets = list(targets)
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.tiered = tiered
+        self.logger = None
+        self._heap = []
+        self._in_flight = set()
+        self._wakeup = None
+        self._stopping = None
+
+    def _schedule(self, index, history):
+        """이력으로 주기를 계산하여 다음 확인 시각을 힙에 넣는다"""
+        company, service, url = self.targets[index]
+        schedule = get_target_settings(url)["schedule"]
+        interval = with_jitter(compute_interval([changed for _, changed in history], schedule), schedule["jitter"])
+
+        # 재시작한 경우 마지막 확인 시각부터 주기를 이어서 계산
+        last_checked = datetime.fromisoformat(history[0][0]).timestamp() if history else 0
+        next_run = max(time.time(), last_checked + interval) if history else time.time() + random.uniform(0, 5)
+
+        heapq.heappush(self._heap, (next_run, index))
+        self._wakeup.set()
+        return interval, next_run
+
+    async def _poll(self, pool, limiter, index):
+        """대상 하나를 가져와 기록하고 다음 확인을 예약"""
+        company, service, url = self.targets[index]
+        db = get_database()
+        html_results, error = None, None
+        try:
+            try:
+                html_results = await limiter.run(url, crawl_target(pool, url, self.tiered))
+            except Exception as e:
+                error = e
+
+            self.logger.info(f"{company} - {service}")
+            self.logger.info(f"  URL: {url}")
+            timestamp = datetime.now().strftime("%H%M%S")
+            await record_result(self.logger, create_folders(), timestamp, company, service, url, html_results, error)
+        except Exception as e:
+            self.logger.error(f"  ❌ 기록 실패: {url}, 오류: {e}")
+        finally:
+            # 어떤 경우에도 다음 확인은 예약한다 (방금 기록한 스냅샷이 커밋된 뒤의 이력으로)
+            try:
+                await db.flush()
+                history = await db.run(get_change_history, url, HISTORY_SIZE)
+            except Exception as e:
+                self.logger.error(f"  ❌ 변경 이력 조회 실패: {url}, 오류: {e}")
+                history = []
+            interval, _ = self._schedule(index, history)
+            self.logger.info(f"  다음 확인: {interval / 60:.1f}분 후")
+
+    def stop(self):
+        """실행 중인 가져오기를 마친 뒤 종료하도록 요청"""
+        if self._stopping is not None:
+            self._stopping.set()
+            self._wakeup.set()
+
+    async def run(self):
+        """스케줄러 메인 루프 (stop() 또는 종료 시그널까지 실행)"""
+        self.logger = setup_logging()
+        db = get_database()
+        await db.setup()
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows 등에서는 KeyboardInterrupt로 종료
+
+        for index, (_, _, url) in enumerate(self.targets):
+            self._schedule(index, await db.run(get_change_history, url, HISTORY_SIZE))
+
+        self.logger.info(f"적응형 스케줄러 시작: 대상 {len(self.targets)}개")
+        limiter = HostLimiter(self.max_concurrency, self.max_per_host)
+
+        try:
+            async with BrowserPool(size=min(BROWSER_POOL_SIZE, self.max_concurrency)) as pool:
+                while not self._stopping.is_set():
+                    self._wakeup.clear()
+                    delay = self._heap[0][0] - time.time() if self._heap else None
+                    if delay is None or delay > 0:
+                        try:
+                            await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                        except asyncio.TimeoutError:
+                            pass
+                        continue
+
+                    _, index = heapq.heappop(self._heap)
+                    task = asyncio.create_task(self._poll(pool, limiter, index))
+                    self._in_flight.add(task)
+                    task.add_done_callback(self._in_flight.discard)
+
+                if self._in_flight:
+                    self.logger.info(f"진행 중인 {len(self._in_flight)}건 완료 대기 후 종료")
+                    await asyncio.gather(*self._in_flight, return_exceptions=True)
+        finally:
+            # 남은 스냅샷을 모두 커밋하고 DB 스레드 종료
+            await db.close()
+            log_writer_stats(self.logger, db)
+
+        self.logger.info("적응형 스케줄러 종료")
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="적응형 모니터링 스케줄러")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY, help="전체 동시 가져오기 수")
+    parser.add_argument("--per-host", type=int, default=MAX_PER_HOST, help="호스트별 동시 가져오기 수")
+    parser.add_argument("--tiered", action=argparse.BooleanOptionalAction, default=PRECHECK_ENABLED, help="HTTP 사전 검사 후 필요할 때만 브라우저 렌더링")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(AdaptiveScheduler(KYOBO_URLS, args.concurrency, args.per_host, args.tiered).run())
+    except KeyboardInterrupt:
+        pass
@@ -4,70 +4,78 @@
 HTML 가져오기 유틸리티 (Playwright 사용)
 """
 
-import asyncio
-import random
-from playwright.async_api import async_playwright
-from playwright_stealth import Stealth # Stealth 클래스를 직접 사용한다고 가정
+import time
 
-async def fetch_html_async(url, browser_type="chromium", headless=True):
+from browser_pool import BrowserPool
+from config.targets import get_target_settings
+from host_limiter import host_of
+from readiness import wait_until_ready_async
+from request_filter import RequestFilter
+from size_guard import SizeGuard, DEFAULT_MAX_BYTES
+
+async def fetch_html_async(url, browser_type="chromium", headless=True, pool=None, settings=None):
     """
     Playwright Stealth를 사용하여 탐지 우회 및 HTML 가져오기 (비동기)
     CSR 페이지의 경우 정적 HTML과 동적 HTML을 모두 반환합니다.
+
+    pool(BrowserPool)을 넘기면 풀의 브라우저/컨텍스트를 재사용하고,
+    없으면 이 호출만을 위한 브라우저를 실행했다가 종료합니다.
+    settings를 생략하면 config/targets.py의 대상별 설정을 사용합니다.
     """
-    user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
-    extra_headers = {
-        "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7"
-    }
-    
+    settings = settings or get_target_settings(url)
     initial_html = None
     rendered_html = None
+    ready = None
+    error = None
+    timeout_ms = settings.get("timeout_ms", 90000)
+    request_filter = RequestFilter(settings.get("block"))
+    size_guard = SizeGuard(settings.get("max_bytes", DEFAULT_MAX_BYTES))
+    started = time.monotonic()
 
     try:
-        async with async_playwright() as p:
-            browser_launcher = getattr(p, browser_type)
-            browser = await browser_launcher.launch(headless=headless)
-            
-            # 브라우저 컨텍스트 설정 강화: 로케일, 타임존, 뷰포트
-            context = await browser.new_context(
-                user_agent=user_agent,
-                extra_http_headers=extra_headers,
-                locale="ko-KR",  # 한국어 로케일 설정
-                timezone_id="Asia/Seoul", # 한국 표준시 설정
-                viewport={"width": 1920, "height": 1080}, # 일반적인 데스크톱 해상도
-            )
-            page = await context.new_page()
-            
-            # Stealth 기능 적용 - bot 탐지 우회
-            stealth = Stealth()
-            await stealth.apply_stealth_async(page)
-            
+        if pool is None:
+            async with BrowserPool(browser_type=browser_type, headless=headless, size=1) as own_pool:
+                return await fetch_html_async(url, pool=own_pool, settings=settings)
+
+        # 같은 호스트에 쓰였던 컨텍스트만 재사용 (다른 사이트의 저장소/서비스 워커가 넘어오지 않도록)
+        async with pool.page(host_of(url)) as page:
+            # 해시에 영향 없는 리소스(이미지, 폰트, 위젯, 비콘) 요청 차단
+            await request_filter.attach_async(page)
+            if settings.get("extra_headers"):
+                await page.set_extra_http_headers(settings["extra_headers"])
+            # 메인 문서 수신 바이트 감시 (상한 초과 시 즉시 중단)
+            await size_guard.attach_async(page)
+
             # 1. 페이지로 이동하고 초기 HTML(정적) 가져오기
-            # timeout을 넉넉하게 설정하여 Eversafe 등의 지연에 대비
-            response = await page.goto(url, wait_until="commit", timeout=90000) # commit: 응답 헤더를 받았을 때
-            if response:
+            # timeout은 대상별 과거 소요 시간으로 정해짐 (기본 90초, Eversafe 등의 지연에 대비)
+            response = await page.goto(url, wait_until="commit", timeout=timeout_ms) # commit: 응답 헤더를 받았을 때
+            if response and not size_guard.exceeded:
                 initial_html = await response.text() # 초기 응답의 텍스트 (정적 HTML)
             
-            # 2. CSR 렌더링 완료를 위한 대기 (networkidle) 후 추가 지연
-            # networkidle로 완전히 로드될 때까지 기다림
-            await page.wait_for_load_state("networkidle", timeout=90000) 
-            # CSR 동작 및 봇 탐지 회피를 위한 추가 무작위 지연
-            await asyncio.sleep(random.uniform(3, 8)) 
+            # 2. CSR 렌더링 완료 대기 (대상별 전략, 상한 시간 내에서 준비되는 즉시 진행)
+            ready = await wait_until_ready_async(page, settings["readiness"])
             
             # 3. 렌더링 완료된 HTML (동적) 가져오기
             rendered_html = await page.content()
-            
-            return {
-                "initial_html": initial_html,
-                "rendered_html": rendered_html
-            }
+            if size_guard.check_text(rendered_html):
+                rendered_html = None
             
     except Exception as e:
+        error = str(e)
         print(f"오류 발생: {e}")
         # 오류 발생 시에도 어떤 HTML이든 가져온 것이 있다면 반환
-        return {
-            "initial_html": initial_html,
-            "rendered_html": rendered_html
-        }
-    finally:
-        if 'browser' in locals() and browser:
-            await browser.close()
\ No newline at end of file
+
+    if size_guard.exceeded:
+        # 상한을 넘은 문서는 일부만 받았더라도 사용하지 않음
+        initial_html = None
+        rendered_html = None
+
+    return {
+        "initial_html": initial_html,
+        "rendered_html": rendered_html,
+        "ready": ready,
+        "elapsed_ms": int((time.monotonic() - started) * 1000),
+        "requests": request_filter.stats(),
+        "too_large": size_guard.exceeded,
+        "error": error
+    }
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+보안 표면(security surface) 추출/비교 모듈
+변조 감지에 중요한 요소만 HTML 한 번 훑기로 뽑아 작은 정렬된 기록으로 만듭니다.
+  forms: "METHOD action" / scripts: 외부 스크립트 src / inline_scripts: 인라인 스크립트 내용 해시
+  iframes: iframe/frame src / origins: 페이지 호스트가 아닌 외부 출처 / meta_refresh: meta refresh 내용
+
+전체 정규화 해시가 달라졌을 때 이 기록끼리만 비교하면 폼 action 변조, 스크립트 삽입,
+iframe/스크립트 출처 교체를 문서 전체 diff 없이 바로 심각도와 함께 보고할 수 있습니다.
+기록은 내용 해시를 키로 security_surfaces 테이블에 한 번만 저장하고 스냅샷은 surface_hash로 참조합니다.
+"""
+
+import hashlib
+import html as html_lib
+import json
+import re
+from collections import Counter
+from datetime import datetime
+from urllib.parse import urljoin, urlsplit
+
+FIELDS = ("forms", "scripts", "inline_scripts", "iframes", "origins", "meta_refresh")
+
+# 항목이 추가되었을 때의 심각도 (삭제는 모두 낮음)
+ADDED_SEVERITY = {
+    "forms": "high",
+    "scripts": "high",
+    "iframes": "high",
+    "meta_refresh": "high",
+    "inline_scripts": "medium",
+    "origins": "medium",
+}
+SEVERITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+SEVERITY_LABELS = {"high": "높음", "medium": "중간", "low": "낮음"}
+
+# 관심 있는 태그만 찾음 (스크립트는 닫는 태그까지 내용 포함, 주석은 건너뛰도록 함께 매칭)
+_TAG_PATTERN = re.compile(
+    r"<(?:!--.*?-->|(script)\b([^>]*)>(.*?)</script\s*>|(form|iframe|frame|meta|link|img|embed|object|source|a)\b([^>]*)>)",
+    re.IGNORECASE | re.DOTALL
+)
+_ATTR_PATTERN = re.compile(r"""([^\s=/>"']+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+
+# 외부 출처를 확인할 속성
+_URL_ATTRS = ("src", "href", "action", "data")
+
+def _attrs(text):
+    """태그 속성 문자열을 {소문자 이름: 값} 으로 변환"""
+    attrs = {}
+    for name, double, single, bare in _ATTR_PATTERN.findall(text):
+        attrs.setdefault(name.lower(), html_lib.unescape(double or single or bare))
+    return attrs
+
+def _resolve(value, base_url):
+    value = value.strip()
+    return urljoin(base_url, value) if base_url else value
+
+def _origin(value):
+    """http(s) URL의 출처 (scheme://host), 그 밖에는 None"""
+    parts = urlsplit(value)
+    if parts.scheme in ("http", "https") and parts.netloc:
+        return f"{parts.scheme}://{parts.netloc.lower()}"
+    return None
+
+def _script_hash(text):
+    return hashlib.blake2b(" ".join(text.split()).encode("utf-8"), digest_size=8).hexdigest()
+
+def extract(html, url=None):
+    """
+    정규화된 HTML에서 보안 표면 기록 추출 (url: 상대 경로 해석과 외부 출처 판별 기준)
+    반환: {필드: 정렬된 문자열 목록}
+    """
+    surface = {field: [] for field in FIELDS}
+    origins = set()
+    own_host = urlsplit(url).netloc.lower() if url else None
+    for match in _TAG_PATTERN.finditer(html):
+        script_attrs, script_body, tag = match.group(2), match.group(3), match.group(4)
+        if script_attrs is not None:
+            attrs = _attrs(script_attrs)
+            if attrs.get("src"):
+                surface["scripts"].append(_resolve(attrs["src"], url))
+            elif script_body.strip():
+                surface["inline_scripts"].append(_script_hash(script_body))
+        elif tag is not None:
+            tag = tag.lower()
+            attrs = _attrs(match.group(5))
+            if tag == "form":
+                surface["forms"].append(f"{attrs.get('method', 'get').upper()} {_resolve(attrs.get('action', ''), url)}")
+            elif tag in ("iframe", "frame") and attrs.get("src"):
+                surface["iframes"].append(_resolve(attrs["src"], url))
+            elif tag == "meta" and attrs.get("http-equiv", "").lower() == "refresh":
+                surface["meta_refresh"].append(attrs.get("content", ""))
+        else:
+            continue
+        for name in _URL_ATTRS:
+            if attrs.get(name):
+                origin = _origin(_resolve(attrs[name], url))
+                if origin and urlsplit(origin).netloc != own_host:
+                    origins.add(origin)
+    surface["origins"] = list(origins)
+    for values in surface.values():
+        values.sort()
+    return surface
+
+def surface_hash(surface):
+    """기록의 내용 해시 (저장 키)"""
+    return hashlib.blake2b(encode(surface), digest_size=16).hexdigest()
+
+def encode(surface):
+    return json.dumps(surface, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+def decode(data):
+    surface = json.loads(data)
+    # 필드가 추가되기 전에 저장된 기록도 같은 형태로
+    return {field: surface.get(field, []) for field in FIELDS}
+
+def compare(old, new):
+    """
+    두 기록의 추가/삭제 항목을 심각도 순으로 반환
+    반환: [{"field", "change": "added" | "removed", "value", "severity": "high" | "medium" | "low"}, ...]
+    """
+    findings = []
+    for field in FIELDS:
+        old_values, new_values = Counter(old.get(field, [])), Counter(new.get(field, []))
+        if old_values == new_values:
+            continue
+        for value in sorted((new_values - old_values).elements()):
+            findings.append({"field": field, "change": "added", "value": value, "severity": ADDED_SEVERITY[field]})
+        for value in sorted((old_values - new_values).elements()):
+            findings.append({"field": field, "change": "removed", "value": value, "severity": "low"})
+    findings.sort(key=lambda finding: SEVERITY_ORDER[finding["severity"]])
+    return findings
+
+def max_severity(findings):
+    """가장 높은 심각도 (변경이 없으면 None)"""
+    return findings[0]["severity"] if findings else None
+
+def format_findings(findings, limit=5):
+    """비교 결과를 한 줄 요약으로 변환 (예: "[높음] scripts 추가 https://evil.example/a.js, ... 외 2건")"""
+    changes = {"added": "추가", "removed": "삭제"}
+    summary = ", ".join(
+        f"[{SEVERITY_LABELS[finding['severity']]}] {finding['field']} {changes[finding['change']]} {finding['value']}"
+        for finding in findings[:limit]
+    )
+    if len(findings) > limit:
+        summary += f" 외 {len(findings) - limit}건"
+    return summary
+
+def save_surface(conn, surface):
+    """기록을 security_surfaces에 저장 (이미 있으면 건너뜀, 커밋은 호출자가 담당) - 내용 해시 반환"""
+    digest = surface_hash(surface)
+    conn.execute(
+        "INSERT OR IGNORE INTO security_surfaces (hash, content, created_at) VALUES (?, ?, ?)",
+        (digest, encode(surface).decode("utf-8"), datetime.now().isoformat())
+    )
+    return digest
+
+def load_surface(conn, digest):
+    """내용 해시로 기록 읽기 (없으면 None)"""
+    row = conn.execute("SELECT content FROM security_surfaces WHERE hash = ?", (digest,)).fetchone()
+    return decode(row[0]) if row else None
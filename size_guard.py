@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+응답 크기 제한 모듈
+메인 문서를 받는 도중에 바이트 수를 세어 상한을 넘는 즉시 가져오기를 중단합니다.
+Content-Length가 있으면 본문을 받기 전에 판단하고, Chromium에서는 CDP의
+Network.dataReceived 이벤트로 스트리밍 중인 바이트를 누적합니다.
+두 검사 모두 전송 바이트(압축된 크기, encodedDataLength) 기준입니다.
+"""
+
+import asyncio
+import logging
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024  # 10MB
+
+def utf8_size_exceeds(text, max_bytes):
+    """문자열의 UTF-8 바이트 수가 max_bytes를 넘는지 확인 (가능하면 인코딩 없이 판단)"""
+    if len(text) > max_bytes:
+        return True
+    if len(text) * 4 <= max_bytes:  # UTF-8은 문자당 최대 4바이트
+        return False
+    return len(text.encode('utf-8')) > max_bytes
+
+def content_length_exceeds(headers, max_bytes):
+    """Content-Length 헤더가 있고 max_bytes를 넘으면 True"""
+    value = headers.get("content-length") or headers.get("Content-Length")
+    try:
+        return value is not None and int(value) > max_bytes
+    except ValueError:
+        return False
+
+class SizeGuard:
+    """
+    페이지 하나의 메인 문서 수신 바이트를 감시
+    상한을 넘으면 exceeded를 기록하고 페이지를 닫아 진행 중인 대기를 중단시킵니다.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.received = 0
+        self.exceeded = None
+        self._page = None
+        self._document_requests = set()
+        self._main_frame_id = None
+
+    def _trip(self, reason):
+        if self.exceeded:
+            return
+        self.exceeded = reason
+        logging.warning(f"응답 크기 상한 초과로 중단: {reason} (상한 {self.max_bytes:,} bytes)")
+        if self._page is not None:
+            asyncio.ensure_future(self._page.close())
+
+    def _on_response(self, response):
+        request = response.request
+        if request.is_navigation_request() and request.frame.parent_frame is None:
+            if content_length_exceeds(response.headers, self.max_bytes):
+                self._trip(f"Content-Length {response.headers.get('content-length')}")
+
+    def _on_cdp_response(self, params):
+        if params.get("type") == "Document" and params.get("frameId") == self._main_frame_id:
+            self._document_requests.add(params["requestId"])
+
+    def _on_cdp_data(self, params):
+        if params.get("requestId") in self._document_requests:
+            # Content-Length와 같은 전송 바이트 기준 (dataLength는 압축 해제 후 크기)
+            self.received += params.get("encodedDataLength", 0)
+            if self.received > self.max_bytes:
+                self._trip(f"수신 {self.received:,} bytes")
+
+    async def attach_async(self, page):
+        """페이지에 감시 등록 (Chromium이 아니면 Content-Length 검사만 수행)"""
+        self._page = page
+        page.on("response", self._on_response)
+        if page.context.browser and page.context.browser.browser_type.name == "chromium":
+            session = await page.context.new_cdp_session(page)
+            frame_tree = await session.send("Page.getFrameTree")
+            self._main_frame_id = frame_tree["frameTree"]["frame"]["id"]
+            session.on("Network.responseReceived", self._on_cdp_response)
+            session.on("Network.dataReceived", self._on_cdp_data)
+            await session.send("Network.enable")
+
+    def check_text(self, text):
+        """최종 HTML 문자열의 UTF-8 바이트 수 검사 (렌더링 중 DOM이 커진 경우)"""
+        if text is not None and utf8_size_exceeds(text, self.max_bytes):
+            self.exceeded = self.exceeded or "렌더링된 HTML"
+            return True
+        return False
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스냅샷 일괄 기록 모듈
+쓰기 전용 스레드 하나가 대기열에 쌓인 스냅샷을 모아 한 트랜잭션으로 커밋합니다.
+호출하는 쪽은 submit() 후 바로 다음 작업을 진행하고, 필요하면 Future로 저장 완료를 기다립니다.
+스냅샷 외의 쓰기(HTTP 사전 검사 상태, 이전 스냅샷의 다시 계산한 값 등)도 submit_write()로 같은 배치에 넣습니다.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+
+from config.config import SNAPSHOT_WRITER
+from database import get_connection, close_connection
+from saver import insert_snapshot
+
+# 쓰기 스레드 종료 신호
+_STOP = object()
+
+class SnapshotWriter:
+    """대기열 + 쓰기 전용 스레드"""
+
+    def __init__(self, batch_size=None, flush_interval=None, queue_size=None):
+        self.batch_size = batch_size or SNAPSHOT_WRITER["batch_size"]
+        self.flush_interval = flush_interval or SNAPSHOT_WRITER["flush_interval"]
+        self.queue_size = queue_size or SNAPSHOT_WRITER["queue_size"]
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._stats = {
+            "submitted": 0,
+            "written": 0,
+            "failed": 0,
+            "batches": 0,
+            "max_batch": 0,
+            "total_latency_ms": 0.0,
+            "max_latency_ms": 0.0,
+        }
+
+    @property
+    def running(self):
+        # fork된 자식 프로세스에는 부모의 쓰기 스레드가 없으므로 실행 중이 아닌 것으로 본다
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    def start(self):
+        """쓰기 스레드가 실행 중이 아니면 시작"""
+        with self._lock:
+            if self.running:
+                return
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._thread = threading.Thread(target=self._run, args=(self._queue,), name="snapshot-writer", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def submit(self, url, content_hash, html_content, html_size=0, change_detected=False, change_details=None, blob_hash=None,
+               normalized_hash=None, ruleset_version=None, fingerprint=None, dom_hash=None, surface=None, surface_hash=None):
+        """
+        스냅샷 저장 요청을 대기열에 추가하고 Future 반환 (결과: 저장된 timestamp)
+        blob_hash를 주면 이미 저장된 본문을 참조 (insert_snapshot 참고)
+        대기열이 가득 차 있으면 자리가 날 때까지 대기합니다.
+        """
+        # 기록 시각은 제출 시점 기준 (같은 URL의 순서가 대기열 순서와 일치)
+        timestamp = datetime.now().isoformat()
+        return self._enqueue((url, content_hash, html_content, html_size, change_detected, change_details, timestamp, blob_hash, normalized_hash, ruleset_version, fingerprint, dom_hash, surface, surface_hash))
+
+    def submit_write(self, fn, *args, **kwargs):
+        """
+        fn(conn, *args, **kwargs)를 다음 배치 트랜잭션에서 실행하도록 대기열에 추가하고 Future 반환 (결과: fn의 반환값)
+        fn은 커밋하지 않아야 합니다 (트랜잭션은 쓰기 스레드가 관리)
+        """
+        def write(conn):
+            return fn(conn, *args, **kwargs)
+        write.__name__ = fn.__name__
+        return self._enqueue(write)
+
+    def _enqueue(self, row):
+        self.start()
+        future = Future()
+        self._queue.put((row, future, time.perf_counter()))
+        with self._lock:
+            self._stats["submitted"] += 1
+        return future
+
+    def flush(self):
+        """지금까지 제출된 스냅샷이 모두 커밋될 때까지 대기"""
+        if self.running:
+            self._queue.join()
+
+    def close(self, timeout=30):
+        """남은 스냅샷을 모두 기록하고 쓰기 스레드 종료"""
+        with self._lock:
+            if not self.running:
+                return
+            pending, thread = self._queue, self._thread
+            self._queue, self._thread, self._pid = None, None, None
+        # 쓰기 스레드도 통계 갱신에 잠금을 쓰므로 잠금 밖에서 종료를 기다린다
+        pending.put((_STOP, None, None))
+        thread.join(timeout)
+        if thread.is_alive():
+            # 남은 스냅샷은 쓰기 스레드가 계속 기록하지만, 프로세스가 곧 끝나면 유실될 수 있음
+            logging.error(f"스냅샷 기록 종료 대기 시간 초과 ({timeout}초): 아직 기록되지 않은 스냅샷 {max(0, pending.unfinished_tasks - 1)}건")
+
+    def stats(self):
+        """기록 통계: 건수, 배치 크기, 제출부터 커밋까지의 지연 시간"""
+        with self._lock:
+            stats = dict(self._stats)
+        total_latency_ms = stats.pop("total_latency_ms")
+        stats["avg_batch"] = round(stats["written"] / stats["batches"], 1) if stats["batches"] else 0
+        stats["avg_latency_ms"] = round(total_latency_ms / stats["written"], 1) if stats["written"] else 0
+        stats["max_latency_ms"] = round(stats["max_latency_ms"], 1)
+        stats["queued"] = self._queue.qsize() if self.running else 0
+        return stats
+
+    def _run(self, pending):
+        """대기열에서 최대 batch_size건 또는 flush_interval초 동안 모아 한 번에 커밋"""
+        stopping = False
+        try:
+            while not stopping:
+                batch = []
+                item = pending.get()
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    if item[0] is _STOP:
+                        stopping = True
+                        pending.task_done()
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = pending.get(timeout=max(0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                if batch:
+                    try:
+                        self._write(batch)
+                    except Exception as e:
+                        # 연결 실패 등 배치 밖의 오류도 스레드를 멈추지 않고 대기 중인 Future에 알린다
+                        logging.error(f"스냅샷 배치 기록 실패: {e}")
+                        self._fail(batch, e)
+                    finally:
+                        for _ in batch:
+                            pending.task_done()
+        finally:
+            close_connection()
+
+    def _write(self, batch):
+        """배치를 한 트랜잭션으로 기록 (실패하면 한 건씩 다시 시도하여 나머지는 살림)"""
+        conn = get_connection()
+        try:
+            with conn:
+                timestamps = [_apply(conn, row) for row, _, _ in batch]
+        except Exception as e:
+            logging.warning(f"스냅샷 일괄 기록 실패, 한 건씩 다시 기록합니다: {e}")
+            for item in batch:
+                self._write_one(conn, item)
+            return
+        self._record(batch, timestamps)
+
+    def _write_one(self, conn, item):
+        row, future, _ = item
+        try:
+            with conn:
+                timestamp = _apply(conn, row)
+        except Exception as e:
+            logging.error(f"스냅샷 기록 실패: {row.__name__ if callable(row) else row[0]}: {e}")
+            self._fail([item], e)
+            return
+        self._record([item], [timestamp])
+
+    def _fail(self, batch, error):
+        """기록하지 못한 항목의 실패 집계 및 Future에 예외 전달 (이미 완료된 Future는 건너뜀)"""
+        failed = [future for _, future, _ in batch if not future.done()]
+        with self._lock:
+            self._stats["failed"] += len(failed)
+        for future in failed:
+            future.set_exception(error)
+
+    def _record(self, batch, timestamps):
+        """커밋된 배치의 통계 갱신 및 Future 완료"""
+        now = time.perf_counter()
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["written"] += len(batch)
+            self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+            for _, _, submitted_at in batch:
+                latency_ms = (now - submitted_at) * 1000
+                self._stats["total_latency_ms"] += latency_ms
+                self._stats["max_latency_ms"] = max(self._stats["max_latency_ms"], latency_ms)
+        for (_, future, _), timestamp in zip(batch, timestamps):
+            future.set_result(timestamp)
+
+def _apply(conn, row):
+    """대기열 항목 하나를 현재 트랜잭션에 반영 (스냅샷 행이면 insert_snapshot, submit_write 항목이면 호출)"""
+    if callable(row):
+        return row(conn)
+    return insert_snapshot(conn, *row)
+
+_writer = SnapshotWriter()
+atexit.register(_writer.close)
+
+def get_writer():
+    """프로세스 공용 스냅샷 기록기 반환"""
+    return _writer
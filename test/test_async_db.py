@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+비동기 DB 인터페이스 테스트
+DB 스레드 실행, 기록 대기열 역압, 저장 후 조회 확인
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+import database
+from async_db import AsyncDatabase
+from snapshot_writer import SnapshotWriter
+
+URL = "https://mmbr.kyobobook.co.kr/login"
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "async.db")
+    monkeypatch.setattr(database, "DATABASE_PATH", path)
+    return path
+
+class HeldWriter:
+    """커밋 완료를 테스트가 직접 알리는 가짜 기록기"""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, *args, **kwargs):
+        future = Future()
+        self.futures.append(future)
+        return future
+
+def test_save_and_get_latest_off_loop_thread(db_path):
+    async def scenario():
+        db = AsyncDatabase(writer=SnapshotWriter(batch_size=10, flush_interval=0.05))
+        await db.setup()
+        loop_thread = threading.get_ident()
+        assert await db.run(threading.get_ident) != loop_thread
+
+        future = await db.save_snapshot(URL, "h1", "<html>1</html>", 14, True, "최초")
+        await db.flush()
+        assert future.result(timeout=0)
+        latest = await db.get_latest(URL)
+        await db.close()
+        return latest
+
+    latest = asyncio.run(scenario())
+    assert latest["hash"] == "h1"
+    assert latest["html"].read() == "<html>1</html>"
+
+def test_backpressure_waits_without_blocking_loop():
+    async def scenario():
+        writer = HeldWriter()
+        db = AsyncDatabase(writer=writer, max_pending=2)
+        await db.save_snapshot(URL, "h1", "a")
+        await db.save_snapshot(URL, "h2", "b")
+
+        third = asyncio.create_task(db.save_snapshot(URL, "h3", "c"))
+        # 대기열이 가득 차도 다른 작업은 계속 진행됨
+        ticks = 0
+        for _ in range(5):
+            await asyncio.sleep(0)
+            ticks += 1
+        assert ticks == 5
+        assert not third.done()
+        assert len(writer.futures) == 2
+
+        # 한 건이 커밋되면(다른 스레드에서 완료) 세 번째 요청이 들어감
+        threading.Thread(target=writer.futures[0].set_result, args=("ts",)).start()
+        await asyncio.wait_for(third, timeout=1)
+        assert len(writer.futures) == 3
+        return db.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["waits"] == 1
+    assert stats["pending"] == 2
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML 블롭 저장소 테스트
+중복 본문 제거와 기존 데이터베이스 마이그레이션 확인
+"""
+
+import sqlite3
+
+import pytest
+
+import database
+from database import MIGRATIONS, migrate, setup_database, get_latest_snapshot
+from saver import save_snapshot
+
+HTML_A = "<html><body>교보문고 로그인</body></html>"
+HTML_B = "<html><body>교보문고 로그인 (변경)</body></html>"
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "blobs.db")
+    monkeypatch.setattr(database, "DATABASE_PATH", path)
+    return path
+
+def count(path, table):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+def test_identical_html_stored_once(db_path):
+    setup_database()
+    for _ in range(5):
+        save_snapshot("https://example.com", "h1", HTML_A, len(HTML_A))
+    save_snapshot("https://example.com", "h2", HTML_B, len(HTML_B))
+
+    assert count(db_path, "snapshots") == 6
+    assert count(db_path, "blobs") == 2
+
+def test_latest_snapshot_shape_unchanged(db_path):
+    setup_database()
+    save_snapshot("https://example.com", "h1", HTML_A, len(HTML_A))
+    save_snapshot("https://example.com", "h2", HTML_B, len(HTML_B))
+
+    latest = get_latest_snapshot("https://example.com")
+    assert set(latest) == {"timestamp", "hash", "html_content", "html_size"}
+    assert latest["hash"] == "h2"
+    assert latest["html_content"] == HTML_B
+
+def test_failed_fetch_has_no_blob(db_path):
+    setup_database()
+    save_snapshot("https://example.com", "", "", 0, False, "페이지 가져오기 실패")
+    assert count(db_path, "blobs") == 0
+    assert get_latest_snapshot("https://example.com")["html_content"] == ""
+
+def test_existing_database_migrated(db_path):
+    # 블롭 저장소 이전의 스키마와 데이터
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+        CREATE TABLE snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            url TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            html_content TEXT NOT NULL,
+            html_size INTEGER,
+            change_detected BOOLEAN DEFAULT FALSE,
+            change_details TEXT
+        )
+        """)
+        rows = [(f"2025-07-0{i}T09:00:00", "https://example.com", f"h{i}", HTML_A if i < 4 else HTML_B, 10)
+                for i in range(1, 6)]
+        conn.executemany(
+            "INSERT INTO snapshots (timestamp, url, content_hash, html_content, html_size) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+
+    setup_database()
+    setup_database()  # 두 번 실행해도 안전
+
+    assert count(db_path, "blobs") == 2
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM snapshots WHERE html_content != ''").fetchone()[0] == 0
+    assert get_latest_snapshot("https://example.com")["html_content"] == HTML_B
+
+class StaleVersionConnection:
+    """처음 읽는 user_version만 이전 값으로 돌려주는 연결 (다른 프로세스가 사이에 마이그레이션한 상황)"""
+
+    def __init__(self, conn, stale_version):
+        object.__setattr__(self, "conn", conn)
+        object.__setattr__(self, "stale_version", stale_version)
+
+    def execute(self, sql, *args):
+        if sql == "PRAGMA user_version" and self.stale_version is not None:
+            cursor = self.conn.execute("SELECT ?", (self.stale_version,))
+            object.__setattr__(self, "stale_version", None)
+            return cursor
+        return self.conn.execute(sql, *args)
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.conn, name, value)
+
+def test_migration_rechecks_version_under_lock(db_path):
+    setup_database()
+    latest = MIGRATIONS[-1][0]
+    conn = sqlite3.connect(db_path)
+    try:
+        # 잠금 전에 읽은 버전이 낡았어도 이미 적용된 단계(ALTER TABLE)는 다시 실행하지 않음
+        migrate(StaleVersionConnection(conn, latest - 2))
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == latest
+    finally:
+        conn.close()
+
+def test_delta_history_rebuilds_every_version(db_path, monkeypatch):
+    import os
+    import blob_store
+
+    storage = {"mode": "delta", "keyframe_interval": 4, "compression_level": 6, "max_delta_ratio": 0.5}
+    monkeypatch.setattr(blob_store, "SNAPSHOT_STORAGE", storage)
+    setup_database()
+
+    pages_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_pages")
+    with open(os.path.join(pages_dir, "original.html"), encoding="utf-8") as f:
+        original = f.read()
+    versions = [original.replace("교보문고", f"교보문고{i}", 1) for i in range(10)]
+    for html in versions:
+        save_snapshot("https://example.com", blob_store.blob_key(html), html, len(html))
+
+    with sqlite3.connect(db_path) as conn:
+        encodings = [row[0] for row in conn.execute("SELECT encoding FROM blobs ORDER BY id")]
+        assert encodings.count("zlib") == 3  # 4개마다 키프레임
+        assert max(row[0] for row in conn.execute("SELECT chain_length FROM blobs")) == 3
+        stored = conn.execute("SELECT SUM(LENGTH(content)) FROM blobs").fetchone()[0]
+        for html in versions:
+            assert blob_store.get_blob(conn, blob_store.blob_key(html)) == html
+
+    assert stored < len(original.encode("utf-8"))
+
+def test_repack_converts_raw_history(db_path):
+    import blob_store
+
+    setup_database()
+    versions = [HTML_A * 50 + f"<p>{i}</p>" for i in range(5)]
+    raw = {"mode": "blob", "keyframe_interval": 20, "compression_level": 6, "max_delta_ratio": 0.5}
+    with database.get_connection() as conn:
+        for i, html in enumerate(versions):
+            key = blob_store.put_blob(conn, html, storage=raw)
+            conn.execute(
+                "INSERT INTO snapshots (timestamp, url, content_hash, html_content, html_size, blob_hash) VALUES (?, ?, ?, '', ?, ?)",
+                (f"2025-07-0{i + 1}T09:00:00", "https://example.com", key, len(html), key)
+            )
+
+        delta = dict(raw, mode="delta")
+        stats = blob_store.repack_blobs(conn, delta)
+        assert stats["blobs"] == 5
+        assert stats["bytes_after"] < stats["bytes_before"] / 10
+        for html in versions:
+            assert blob_store.get_blob(conn, blob_store.blob_key(html)) == html
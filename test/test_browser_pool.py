@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+브라우저 풀 컨텍스트 재사용 테스트
+컨텍스트가 같은 호스트끼리만 재사용되고, 다른 호스트에 쓰였던 컨텍스트는 새로 만들어지는지 확인 (브라우저 없이 가짜 컨텍스트 사용)
+"""
+
+import asyncio
+
+from browser_pool import BrowserPool
+
+class FakeContext:
+    def __init__(self, number):
+        self.number = number
+        self.pages = []
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+    async def clear_cookies(self):
+        pass
+
+def make_pool(size):
+    pool = BrowserPool(size=size)
+    created = []
+
+    async def new_context():
+        created.append(FakeContext(len(created)))
+        return created[-1]
+    pool._new_context = new_context
+    pool._browser = object()
+
+    async def fill():
+        pool._idle = [[await new_context(), 0, None] for _ in range(size)]
+        pool._available = asyncio.Semaphore(size)
+    return pool, created, fill
+
+def test_contexts_are_reused_only_for_the_same_host():
+    async def scenario():
+        pool, created, fill = make_pool(1)
+        await fill()
+        used = []
+        for host in ("mmbr.kyobobook.co.kr", "mmbr.kyobobook.co.kr", "www.kyobo.com", None):
+            async with pool.context(host) as context:
+                used.append(context)
+        return created, used
+
+    created, used = asyncio.run(scenario())
+    # 같은 호스트는 그대로 재사용, 다른 호스트나 호스트 미지정이면 닫고 새로 생성
+    assert [context.number for context in used] == [0, 0, 1, 2]
+    assert created[0].closed and created[1].closed and not created[2].closed
+
+def test_same_host_context_is_preferred():
+    async def scenario():
+        pool, created, fill = make_pool(2)
+        await fill()
+        async with pool.context("a.example") as first:
+            async with pool.context("b.example") as second:
+                pass
+        async with pool.context("b.example") as again:
+            pass
+        return first, second, again, created
+
+    first, second, again, created = asyncio.run(scenario())
+    assert again is second and first is not second
+    assert len(created) == 2
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+보고서 생성 테스트
+기간/URL 필터, gzip CSV, 배치 단위 스트리밍 확인
+"""
+
+import csv
+import gzip
+import sqlite3
+
+import pytest
+
+import csv_report
+import database
+from database import setup_database, get_connection
+from saver import insert_snapshot
+
+URL = "https://mmbr.kyobobook.co.kr/login"
+OTHER = "https://www.kyobo.com"
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "report.db")
+    monkeypatch.setattr(database, "DATABASE_PATH", path)
+    setup_database()
+    with get_connection() as conn:
+        for day in range(1, 11):
+            for url in (URL, OTHER):
+                insert_snapshot(conn, url, f"{url}-{day}" * 2, f"<html>{day}</html>", 13 + day // 10,
+                                day % 3 == 0, "변경" if day % 3 == 0 else None, timestamp=f"2025-08-{day:02d}T09:30:00")
+    return path
+
+def read_rows(path, opener=open):
+    with opener(path, 'rt', newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+def test_filtered_csv_report(db_path, tmp_path):
+    output = str(tmp_path / "report.csv")
+    count = csv_report.generate_report(output, start="2025-08-03", end="2025-08-05", url=URL)
+
+    rows = read_rows(output)
+    assert count == 3
+    assert rows[0] == csv_report.COLUMNS
+    assert [row[0] for row in rows[1:]] == ["2025-08-03", "2025-08-04", "2025-08-05"]
+    assert rows[1][1:] == ["09:30:00", URL, "변경감지", "변경", "13", f"{URL}-3"[:10]]
+    assert rows[2][3:5] == ["변경없음", "N/A"]
+
+def test_gzip_report_streams_in_batches(db_path, tmp_path, monkeypatch):
+    batch_sizes = []
+    original = csv_report.iter_snapshot_batches
+
+    def tracking(*args, **kwargs):
+        for rows in original(*args, **kwargs):
+            batch_sizes.append(len(rows))
+            yield rows
+    monkeypatch.setattr(csv_report, "iter_snapshot_batches", tracking)
+
+    output = str(tmp_path / "report.csv.gz")
+    assert csv_report.generate_report(output, batch_size=6) == 20
+    assert batch_sizes == [6, 6, 6, 2]
+    rows = read_rows(output, gzip.open)
+    assert len(rows) == 21
+    # 시간순 정렬
+    assert [row[0] for row in rows[1:]] == sorted(row[0] for row in rows[1:])
+
+def test_report_query_uses_index(db_path):
+    with sqlite3.connect(db_path) as conn:
+        plan = " ".join(str(row) for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM snapshots WHERE timestamp >= ? ORDER BY timestamp, id", ("2025-08-01",)
+        ))
+    assert "idx_snapshots_timestamp" in plan
+
+def test_parquet_requires_pyarrow(db_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_report, "pa", None)
+    with pytest.raises(RuntimeError):
+        csv_report.generate_report(str(tmp_path / "report.parquet"))
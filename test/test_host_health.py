@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+호스트 회로 차단기 / 적응형 타임아웃 테스트
+"""
+
+import time
+
+import pytest
+
+import database
+import host_health
+from host_health import (allow_request, record_success, record_failure, record_latency,
+                         timeout_budget, backoff_seconds, get_host_health)
+
+HOST = "sso.kyobo.com:5443"
+BREAKER = {"failure_threshold": 3, "base_backoff": 300, "max_backoff": 3600}
+
+@pytest.fixture(autouse=True)
+def temp_database(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "health.db"))
+    database.setup_database()
+
+def test_backoff_grows_exponentially_and_caps():
+    assert backoff_seconds(2, BREAKER) == 0
+    assert backoff_seconds(3, BREAKER) == 300
+    assert backoff_seconds(4, BREAKER) == 600
+    assert backoff_seconds(10, BREAKER) == 3600
+
+def test_breaker_opens_after_threshold():
+    for _ in range(2):
+        assert record_failure(HOST, "timeout", BREAKER) == 0
+        assert allow_request(HOST)[0]
+    assert record_failure(HOST, "timeout", BREAKER) == 300
+
+    allowed, retry_in = allow_request(HOST)
+    assert not allowed
+    assert 290 < retry_in <= 300
+    assert get_host_health(HOST)["last_error"] == "timeout"
+
+def test_half_open_allows_single_trial(monkeypatch):
+    for _ in range(3):
+        record_failure(HOST, "timeout", BREAKER)
+
+    # 차단 시간이 지난 시점
+    future = time.time() + 301
+    monkeypatch.setattr(host_health.time, "time", lambda: future)
+    assert allow_request(HOST, trial_seconds=60) == (True, 0)
+    assert not allow_request(HOST, trial_seconds=60)[0]
+
+def test_success_closes_breaker():
+    for _ in range(3):
+        record_failure(HOST, "timeout", BREAKER)
+    record_success(HOST)
+    assert allow_request(HOST) == (True, 0)
+    assert get_host_health(HOST)["consecutive_failures"] == 0
+
+def test_timeout_budget_follows_latency():
+    url = "https://www.kyobo.com/dgt/web/dtm/lc/tu/login"
+    budget = {"min_ms": 5000, "max_ms": 90000, "deviations": 4, "min_samples": 3}
+    assert timeout_budget(url, budget) == 90000
+
+    for _ in range(10):
+        record_latency(url, 2000)
+    assert timeout_budget(url, budget) == 5000
+
+    for _ in range(10):
+        record_latency(url, 20000)
+    assert 20000 < timeout_budget(url, budget) < 90000
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+동시 실행 제한 테스트
+동시에 슬롯을 요청해도 호스트별/전역 상한을 넘지 않는지, 예외가 나도 슬롯이 반환되는지 확인 (브라우저 없이 가짜 작업 사용)
+"""
+
+import asyncio
+
+import pytest
+
+from host_limiter import HostLimiter
+
+URLS = ["https://a.example/1", "https://a.example/2", "https://a.example/3", "https://a.example/4",
+        "https://b.example/1", "https://b.example/2", "https://b.example/3"]
+
+def test_per_host_and_global_caps_hold_under_concurrency():
+    async def scenario():
+        limiter = HostLimiter(max_concurrency=3, max_per_host=2)
+        running, peak = {}, {}
+        total = [0, 0]
+
+        async def crawl(url):
+            host = url.split("/")[2]
+            running[host] = running.get(host, 0) + 1
+            total[0] += 1
+            peak[host] = max(peak.get(host, 0), running[host])
+            total[1] = max(total[1], total[0])
+            await asyncio.sleep(0.01)
+            running[host] -= 1
+            total[0] -= 1
+            return url
+
+        results = await asyncio.gather(*(limiter.run(url, crawl(url)) for url in URLS))
+        return results, peak, total[1]
+
+    results, peak, total_peak = asyncio.run(scenario())
+    assert results == URLS
+    assert max(peak.values()) == 2 and total_peak == 3
+
+def test_slot_is_released_on_exception():
+    async def scenario():
+        limiter = HostLimiter(max_concurrency=1, max_per_host=1)
+
+        async def fail():
+            raise RuntimeError("크롤링 실패")
+
+        with pytest.raises(RuntimeError):
+            await limiter.run("https://a.example/1", fail())
+        # 슬롯이 반환되지 않았다면 다음 진입이 시간 초과됨
+        async def enter():
+            async with limiter.slot("https://a.example/2"):
+                return True
+        return await asyncio.wait_for(enter(), timeout=1)
+
+    assert asyncio.run(scenario())
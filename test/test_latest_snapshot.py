@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+최신 스냅샷 조회 테스트
+latest_snapshots 테이블 갱신, (url, timestamp) 인덱스 사용, 스키마 마이그레이션 확인
+"""
+
+import sqlite3
+
+import pytest
+
+import database
+from database import setup_database, get_latest_snapshot, get_change_history, MIGRATIONS
+from saver import save_snapshot
+
+URL = "https://mmbr.kyobobook.co.kr/login"
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "latest.db")
+    monkeypatch.setattr(database, "DATABASE_PATH", path)
+    return path
+
+def test_latest_state_updated_with_each_insert(db_path):
+    setup_database()
+    save_snapshot(URL, "h1", "<html>1</html>", 14, True, "최초")
+    save_snapshot(URL, "h2", "<html>2</html>", 14, True, "변경")
+    save_snapshot(URL, "", "", 0, False, "페이지 가져오기 실패")
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM latest_snapshots").fetchone()[0] == 1
+    latest = get_latest_snapshot(URL)
+    assert latest["hash"] == ""
+    assert latest["html_content"] == ""
+
+    save_snapshot(URL, "h2", "<html>2</html>", 14, False, "변경 없음")
+    assert get_latest_snapshot(URL)["html_content"] == "<html>2</html>"
+
+def test_history_queries_use_index(db_path):
+    setup_database()
+    with sqlite3.connect(db_path) as conn:
+        plan = " ".join(str(row) for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT timestamp, change_detected FROM snapshots WHERE url = ? ORDER BY timestamp DESC LIMIT 20",
+            (URL,)
+        ))
+    assert "idx_snapshots_url_timestamp" in plan
+
+def test_v2_database_upgraded(db_path):
+    # v2까지 적용된 데이터베이스 준비
+    current = list(MIGRATIONS)
+    database.MIGRATIONS[:] = [m for m in current if m[0] <= 2]
+    try:
+        setup_database()
+        with sqlite3.connect(db_path) as conn:
+            conn.executemany(
+                "INSERT INTO snapshots (timestamp, url, content_hash, html_content, html_size) VALUES (?, ?, ?, '', 0)",
+                [("2025-07-01T09:00:00", URL, "old"), ("2025-07-02T09:00:00", URL, "new"),
+                 ("2025-07-01T09:00:00", "https://www.kyobo.com", "other")]
+            )
+    finally:
+        database.MIGRATIONS[:] = current
+
+    setup_database()
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == MIGRATIONS[-1][0]
+    assert get_latest_snapshot(URL)["hash"] == "new"
+    assert get_latest_snapshot("https://www.kyobo.com")["hash"] == "other"
+    assert [changed for _, changed in get_change_history(URL)] == [False, False]
+
+def test_meta_does_not_read_html(db_path, monkeypatch):
+    import blob_store
+    setup_database()
+    save_snapshot(URL, "h1", "<html>교보문고</html>", 24, True, "최초")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("본문을 읽으면 안 됨")
+    monkeypatch.setattr(blob_store, "get_blob", fail)
+    monkeypatch.setattr(blob_store, "iter_blob", fail)
+
+    meta = database.get_latest_snapshot_meta(URL)
+    assert meta["hash"] == "h1"
+    assert meta["html_size"] == 24
+    assert meta["html"].key == meta["blob_hash"]
+
+@pytest.mark.parametrize("mode", ["blob", "delta"])
+def test_lazy_html_streams_in_chunks(db_path, monkeypatch, mode):
+    import blob_store
+    monkeypatch.setattr(blob_store, "SNAPSHOT_STORAGE", dict(blob_store.SNAPSHOT_STORAGE, mode=mode))
+    setup_database()
+    # 3바이트 한글이 조각 경계에 걸치도록 구성
+    lines = [f"<p>교보생명 로그인 {blob_store.blob_key(str(n))}</p>\n" for n in range(400)]
+    first = "<html><body>" + "".join(lines) + "</body></html>"
+    second = first.replace("</body>", "<p>공지</p></body>")
+    save_snapshot(URL, "h1", first, len(first.encode('utf-8')), True, "최초")
+    save_snapshot(URL, "h2", second, len(second.encode('utf-8')), True, "변경")
+
+    handle = database.get_latest_snapshot_meta(URL)["html"]
+    chunks = list(handle.chunks(chunk_size=1000))
+    assert len(chunks) > 1
+    assert "".join(chunks) == second
+    assert handle.read() == second
+    assert get_latest_snapshot(URL)["html_content"] == second
+    # 첫 버전은 raw(blob 모드) 또는 zlib 키프레임(delta 모드)
+    keyframe = blob_store.LazyHtml(database.get_connection, blob_store.blob_key(first))
+    assert len(list(keyframe.chunks(chunk_size=1000))) > 1
+    assert keyframe.read() == first
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+가져오기 지표 테스트
+시간/일 집계 갱신, 히스토그램 백분위수, 원본 행 정리 확인
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import database
+from database import setup_database
+from metrics import record_fetch, latency_percentile, host_summary, percentile_from_histogram, prune_fetch_metrics, latency_bucket
+
+LOGIN = "https://mmbr.kyobobook.co.kr/login"
+HOME = "https://www.kyobo.com/"
+NOW = datetime(2025, 9, 8, 12, 0, 0)
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "metrics.db")
+    monkeypatch.setattr(database, "DATABASE_PATH", path)
+    setup_database()
+    return path
+
+def test_percentile_from_histogram():
+    assert percentile_from_histogram([], 0.95) is None
+    # 100건이 모두 (1000, 2000] 구간이면 p50은 구간 중간
+    assert percentile_from_histogram([(1000, 0), (2000, 100)], 0.5) == 1500
+    assert percentile_from_histogram([(500, 90), (1000, 10)], 0.95) == 750
+    assert percentile_from_histogram([(90000, 1), (10 ** 9, 9)], 0.95) == 90000
+    assert latency_bucket(1000) == 1000 and latency_bucket(1001) == 2000
+
+def test_rollups_maintained_incrementally(db_path):
+    # 로그인: 하루 전 두 시간대에 걸쳐 100건 (1~100초 중 일부), 홈: 실패와 건너뜀
+    for n in range(100):
+        fetched_at = NOW - timedelta(days=1) + timedelta(minutes=n)
+        record_fetch(LOGIN, "ok", 400 if n < 90 else 20000, 1000, n == 0, fetched_at)
+    record_fetch(HOME, "failed", 90000, 0, False, NOW - timedelta(days=2))
+    record_fetch(HOME, "skipped", None, 0, False, NOW - timedelta(days=2))
+
+    with sqlite3.connect(db_path) as conn:
+        hours = conn.execute(
+            "SELECT bucket, fetches FROM metric_rollups WHERE period = 'hour' AND host = 'mmbr.kyobobook.co.kr' ORDER BY bucket"
+        ).fetchall()
+        assert hours == [("2025-09-07T12", 60), ("2025-09-07T13", 40)]
+        assert conn.execute("SELECT COUNT(*) FROM fetch_metrics").fetchone()[0] == 102
+
+    summary = host_summary(since=NOW - timedelta(days=7), until=NOW)
+    login = summary["mmbr.kyobobook.co.kr"]
+    assert (login["fetches"], login["failures"], login["changes"], login["bytes"]) == (100, 0, 1, 100000)
+    assert login["avg_ms"] == 2360 and login["max_ms"] == 20000
+    # 90%가 500ms 이하, 나머지 10%는 (15000, 20000] 구간
+    assert login["p95_ms"] == 17500
+    home = summary["www.kyobo.com"]
+    # 한 건뿐이면 (60000, 90000] 구간 안에서 보간
+    assert (home["fetches"], home["failures"], home["p95_ms"]) == (2, 1, 88500)
+
+    assert latency_percentile("mmbr.kyobobook.co.kr", NOW - timedelta(days=7), NOW) == pytest.approx(17500)
+    assert latency_percentile(since=NOW - timedelta(days=7), until=NOW, percentile=0.5) < 500
+    # 기간 밖이면 집계 없음
+    assert latency_percentile(since=NOW - timedelta(hours=1), until=NOW) is None
+
+def test_prune_keeps_rollups(db_path, monkeypatch):
+    record_fetch(LOGIN, "ok", 1000, 10, False, NOW - timedelta(days=40))
+    record_fetch(LOGIN, "ok", 1000, 10, False, NOW - timedelta(days=1))
+    assert prune_fetch_metrics(NOW, batch_size=1) == 1
+    summary = host_summary(since=NOW - timedelta(days=60), until=NOW)
+    assert summary["mmbr.kyobobook.co.kr"]["fetches"] == 2
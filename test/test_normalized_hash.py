@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+정규화 해시 저장 테스트
+스냅샷에 저장한 정규화 해시/구조 지문/보안 표면 기록으로 비교하고, 규칙 버전이 바뀌었거나 값이 없는 경우에만
+이전 본문을 다시 처리하여 기록 대기열로 저장하는지 확인
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+import database
+import monitor_all_sites
+from async_db import get_database
+from config.normalization_rules import NORMALIZATION_RULESET_VERSION
+from database import setup_database, get_baseline_snapshot, get_connection
+from monitor_all_sites import analyze_html, load_baseline
+from saver import insert_snapshot, save_snapshot
+from simple_compare import compare_normalized_hash, normalized_hash
+
+URL = "https://mmbr.kyobobook.co.kr/login"
+PAGE = '<html><script src="/a.js?t=1712345678"></script><p>로그인</p></html>'
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "normalized.db")
+    monkeypatch.setattr(database, "DATABASE_PATH", path)
+    setup_database()
+    return path
+
+def baseline():
+    """record_result와 같이 비동기 DB로 비교 기준을 읽고, 다시 계산한 값이 커밋될 때까지 대기"""
+    async def scenario():
+        db = get_database()
+        try:
+            return await load_baseline(db, URL)
+        finally:
+            await db.close()
+    return asyncio.run(scenario())
+
+def fail(*args):
+    raise AssertionError("이전 본문을 다시 처리하면 안 됨")
+
+def test_stored_values_are_used_without_reading_history(db_path, monkeypatch):
+    digest, tree, surface = analyze_html(PAGE, URL)
+    with get_connection() as conn:
+        insert_snapshot(conn, URL, "h1", PAGE, len(PAGE), True, "최초", normalized_hash=digest,
+                        ruleset_version=NORMALIZATION_RULESET_VERSION, fingerprint=tree, surface=surface)
+
+    monkeypatch.setattr(monitor_all_sites, "analyze_html", fail)
+    previous = baseline()
+    assert (previous["normalized_hash"], previous["fingerprint"], previous["surface"]) == (digest, tree, surface)
+    # 동적 파라미터만 다른 새 페이지는 같은 해시
+    assert normalized_hash(PAGE.replace("1712345678", "1799999999"), URL) == digest
+
+def test_stale_ruleset_version_is_recomputed_once(db_path, monkeypatch):
+    save_snapshot(URL, "h1", PAGE, len(PAGE), True, "최초", "old-digest", NORMALIZATION_RULESET_VERSION - 1)
+    save_snapshot(URL, "h2", PAGE, len(PAGE), False, "이전 버전 스냅샷")
+
+    digest, tree, surface = analyze_html(PAGE, URL)
+    previous = baseline()
+    assert (previous["normalized_hash"], previous["fingerprint"], previous["surface"]) == (digest, tree, surface)
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT normalized_hash, ruleset_version FROM snapshots ORDER BY id").fetchall()
+        latest = conn.execute("SELECT normalized_hash, ruleset_version, dom_hash, surface_hash FROM latest_snapshots").fetchone()
+    # 비교 기준인 마지막 스냅샷만 다시 계산
+    assert rows == [("old-digest", NORMALIZATION_RULESET_VERSION - 1), (digest, NORMALIZATION_RULESET_VERSION)]
+    assert latest[:2] == rows[1] and latest[2] == tree[0] and latest[3]
+
+    # 저장된 뒤에는 다시 계산하지 않음
+    monkeypatch.setattr(monitor_all_sites, "analyze_html", fail)
+    assert baseline() == previous
+
+def test_failed_snapshot_is_not_a_baseline(db_path):
+    assert baseline() is None
+    digest = normalized_hash(PAGE, URL)
+    save_snapshot(URL, "h1", PAGE, len(PAGE), True, "최초", digest, NORMALIZATION_RULESET_VERSION)
+    save_snapshot(URL, "", "", 0, False, "페이지 가져오기 실패")
+
+    snapshot = get_baseline_snapshot(URL)
+    assert snapshot["hash"] == "h1"
+    assert snapshot["html"].read() == PAGE
+    assert baseline()["normalized_hash"] == digest
+
+def test_compare_normalized_hash_needs_no_database():
+    digest = normalized_hash(PAGE, URL)
+    assert compare_normalized_hash(None, digest) == (True, "최초 스크래핑 성공")
+    assert compare_normalized_hash(digest, normalized_hash(PAGE.replace("1712345678", "1799999999"), URL))[0] is False
+    assert compare_normalized_hash(digest, normalized_hash(PAGE.replace("로그인", "변조"), URL)) == (True, "내용 변경 감지")
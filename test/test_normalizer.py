@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML 정규화 엔진 테스트
+규칙이 순서대로 적용되는지, 잘못된 규칙을 거부하는지, 사이트별 규칙이 적용되는지 확인
+"""
+
+import pytest
+
+import normalizer
+from config import normalization_rules
+from normalizer import Normalizer, get_normalizer, normalize
+
+def test_default_rules_normalize_dynamic_values():
+    html = (
+        '<link href="/css/a.css?v=2024.01.02.3"><script src="/js/a.js?t=1712345678"></script>'
+        '<script>var TNK_SR = "0123456789abcdef0123456789abcdef"; var plainText=loginId+"20240102030405";</script>'
+        '<a href="/sso?InitechEamNoCacheNonce=abc%2B%3D">x</a>'
+        '<iframe id="gitple-loader-frame" src="x" title="상담 3건"></iframe>'
+        '<body class="main is-header" style="display: none;"><input value="20240102030405">'
+    )
+    assert normalize(html) == (
+        '<link href="/css/a.css?v=TIMESTAMP"><script src="/js/a.js?t=TIMESTAMP"></script>'
+        '<script>var TNK_SR = "TNK_SR_TOKEN"; var plainText=loginId+"DATETIME_VALUE";</script>'
+        '<a href="/sso?InitechEamNoCacheNonce=INITECH_NONCE_TOKEN">x</a>'
+        '<iframe id="gitple-loader-frame" src="x" title="GITPLE_TITLE"></iframe>'
+        '<body class="main "><input value="DATETIME_VALUE">'
+    )
+
+def test_rules_apply_in_order():
+    engine = Normalizer([
+        {"name": "asset", "pattern": r"\?t=\d+", "replacement": "?t=TIMESTAMP"},
+        {"name": "hex_token", "pattern": r"[0-9a-f]{32}", "replacement": "TOKEN"},
+        {"name": "wrapped", "pattern": r"\[(TOKEN)\]", "replacement": r"<\1>"},
+    ])
+    # 뒤 규칙은 앞 규칙의 결과에 적용
+    assert engine.normalize("a.js?t=123 [0123456789abcdef0123456789abcdef]") == "a.js?t=TIMESTAMP <TOKEN>"
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError):
+        Normalizer([{"name": "bad_ref", "pattern": r"(a)b", "replacement": r"\2"}])
+    with pytest.raises(ValueError):
+        Normalizer([{"name": "dup", "pattern": "a", "replacement": "b"}, {"name": "dup", "pattern": "c", "replacement": "d"}])
+
+def test_site_rules_apply_only_to_their_host(monkeypatch):
+    monkeypatch.setattr(normalization_rules, "SITE_NORMALIZATION_RULES", {
+        "www.example.com": [{"name": "visitor_count", "pattern": r"(방문자 )\d+", "replacement": r"\1N"}],
+    })
+    monkeypatch.setattr(normalizer, "_normalizers", {})
+
+    html = "<p>방문자 1234</p>"
+    assert normalize(html, "https://www.example.com/login") == "<p>방문자 N</p>"
+    assert normalize(html, "https://other.example.com/") == html
+    assert get_normalizer("https://www.example.com/a") is get_normalizer("https://www.example.com/b")
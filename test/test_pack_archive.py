@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML 팩 파일 테스트
+추가/읽기, 손상된 끝부분 처리, 인덱스 재작성, 디렉토리 변환, 비교 스크립트 연동 확인
+"""
+
+import os
+
+import compare_all_scrapes
+import saver
+from pack_archive import PackReader, append_html, convert_directory, pack_paths, rebuild_index
+
+def test_append_and_random_access(tmp_path):
+    base_dir = str(tmp_path / "kyobo_scraping_2025-09-01")
+    pages = {f"교보문고/로그인_0930{n:02d}_rendered.html": f"<html>교보문고 {n}</html>" * (n + 1) for n in range(5)}
+    for name, html in pages.items():
+        location = append_html(base_dir, name, html)
+        assert location.endswith("#" + name)
+
+    with PackReader(base_dir) as reader:
+        assert reader.names() == list(pages)
+        # 역순으로 읽어도 각 레코드만 바로 읽음
+        for name in reversed(list(pages)):
+            assert reader.read(name) == pages[name]
+
+def test_truncated_tail_and_reindex(tmp_path):
+    base_dir = str(tmp_path / "kyobo_scraping_2025-09-01")
+    append_html(base_dir, "교보생명/로그인_093000.html", "<html>1</html>")
+    append_html(base_dir, "교보생명/로그인_100000.html", "<html>2</html>")
+    pack_path, index_path = pack_paths(base_dir)
+    # 기록 중 중단된 레코드와 인덱스 줄
+    with open(pack_path, "ab") as f:
+        f.write(b"KPK1\x00\x00\x00\x10partial")
+    with open(index_path, "a", encoding="utf-8") as f:
+        f.write('{"name": "교보생명/깨진')
+
+    with PackReader(base_dir) as reader:
+        assert len(reader.names()) == 2
+
+    os.remove(index_path)
+    assert rebuild_index(pack_path) == 2
+    with PackReader(base_dir) as reader:
+        assert reader.read("교보생명/로그인_100000.html") == "<html>2</html>"
+
+def test_convert_directory_and_compare(tmp_path, monkeypatch, capsys):
+    base_dir = tmp_path / "kyobo_scraping_2025-09-01"
+    company_dir = base_dir / "교보증권"
+    company_dir.mkdir(parents=True)
+    (company_dir / "로그인_090000_initial.html").write_text("<html>정적</html>", encoding="utf-8")
+    (company_dir / "로그인_090000_rendered.html").write_text("<html>\n<p>이전</p>\n</html>", encoding="utf-8")
+
+    stats = convert_directory(str(base_dir), remove=True)
+    assert stats["added"] == 2 and stats["removed"] == 2
+    assert not base_dir.exists()
+
+    # 변환 후에는 팩 파일 방식으로 새 스크랩 저장
+    monkeypatch.setattr(saver, "ARCHIVE_BACKEND", "pack")
+    saver.save_html_to_file(str(base_dir), "교보증권", "로그인", "100000_rendered", "<html>\n<p>이후</p>\n</html>")
+
+    monkeypatch.setattr(compare_all_scrapes, "BASE_SCRAPES_DIR", str(tmp_path))
+    assert compare_all_scrapes.get_latest_scrape_dir() == str(base_dir)
+    compare_all_scrapes.compare_latest_two_snapshots()
+    output = capsys.readouterr().out
+    assert "로그인_100000_rendered.html" in output
+    assert "로그인_090000_rendered.html" in output
+    assert "-<p>이후</p>" in output and "+<p>이전</p>" in output
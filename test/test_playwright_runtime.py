@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+동기 호출용 Playwright 런타임 테스트
+시간 초과된 호출의 코루틴이 취소되어 빌린 자원을 돌려주는지 확인 (브라우저 없이 런타임 루프만 사용)
+"""
+
+import asyncio
+import os
+import threading
+
+import pytest
+
+from playwright_runtime import PlaywrightRuntime
+
+def test_timed_out_call_is_cancelled():
+    runtime = PlaywrightRuntime()
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    # 브라우저 풀 대신 빈 객체로 실행 중인 런타임처럼 설정
+    runtime._loop, runtime._thread, runtime._pool, runtime._pid = loop, thread, object(), os.getpid()
+    released = threading.Event()
+
+    async def slow(pool):
+        try:
+            await asyncio.sleep(10)
+        finally:
+            released.set()
+
+    try:
+        with pytest.raises(TimeoutError):
+            runtime.run(slow, timeout=0.05)
+        assert released.wait(1)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(1)
+        loop.close()
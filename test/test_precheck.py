@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP 사전 검사 테스트
+test_pages/ 를 로컬 HTTP 서버로 제공하고 조건부 요청/정적 해시 비교 결과를 확인
+"""
+
+import functools
+import os
+import shutil
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import database
+from precheck import check_static, commit_static_state
+
+TEST_PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_pages")
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def served_dir(tmp_path, monkeypatch):
+    """임시 DB를 사용하고, 임시 폴더를 로컬 HTTP 서버로 제공"""
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "test.db"))
+    database.setup_database()
+
+    site = tmp_path / "site"
+    site.mkdir()
+    shutil.copy(os.path.join(TEST_PAGES_DIR, "original.html"), site / "page.html")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=str(site)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield site, f"http://127.0.0.1:{server.server_port}/page.html"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def check(url, **kwargs):
+    """모니터와 같이 저장된 이전 상태를 읽어 사전 검사"""
+    return check_static(url, database.get_http_state(url), **kwargs)
+
+def commit(url, result):
+    with database.get_connection() as conn:
+        commit_static_state(conn, url, result)
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime + 10, stat.st_mtime + 10))
+
+def test_first_check_requires_render(served_dir):
+    site, url = served_dir
+    result = check(url)
+    assert result["render"] is True
+    assert result["reason"] == "first_check"
+
+def test_not_modified_skips_render(served_dir):
+    site, url = served_dir
+    commit(url, check(url))
+
+    result = check(url)
+    assert result["status"] == 304
+    assert result["render"] is False
+
+def test_render_required_always_renders(served_dir):
+    site, url = served_dir
+    commit(url, check(url))
+
+    result = check(url, render_required=True)
+    assert result["reason"] == "not_modified"
+    assert result["render"] is True
+
+def test_same_static_content_skips_render(served_dir):
+    site, url = served_dir
+    commit(url, check(url))
+
+    # 파일 시각만 바뀌면 200 응답이지만 정규화 해시는 같다
+    bump_mtime(site / "page.html")
+    result = check(url)
+    assert result["status"] == 200
+    assert result["reason"] == "static_same"
+    assert result["render"] is False
+    # 바뀐 검증자는 호출자가 저장 (사전 검사는 DB에 쓰지 않음)
+    assert result["state"]["static_hash"] == database.get_http_state(url)["static_hash"]
+
+def test_changed_static_content_renders(served_dir):
+    site, url = served_dir
+    commit(url, check(url))
+
+    shutil.copy(os.path.join(TEST_PAGES_DIR, "url_modified.html"), site / "page.html")
+    bump_mtime(site / "page.html")
+    result = check(url)
+    assert result["reason"] == "static_changed"
+    assert result["render"] is True
+
+def test_state_not_saved_until_committed(served_dir):
+    site, url = served_dir
+    check(url)
+    assert database.get_http_state(url) is None
+
+def test_oversized_page_is_not_read(served_dir):
+    site, url = served_dir
+    result = check(url, max_bytes=1024)
+    assert result["reason"] == "too_large"
+    assert result["render"] is True
+    assert result["state"] is None
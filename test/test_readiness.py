@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+렌더링 완료 대기 전략 테스트
+요소 등장, 네트워크 유휴, 상한 시간 초과 시 각 전략이 올바른 사유를 돌려주는지 확인 (브라우저 없이 가짜 페이지 사용)
+"""
+
+import asyncio
+
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from readiness import wait_until_ready_async
+
+class FakePage:
+    """호출을 기록하고, 지정한 메서드는 예외를 던지는 가짜 페이지"""
+
+    def __init__(self, fail=None, evaluate_results=None):
+        self.fail = fail or {}
+        self.evaluate_results = list(evaluate_results or [])
+        self.calls = []
+
+    def _call(self, name, *args):
+        self.calls.append((name,) + args)
+        error = self.fail.get(name)
+        if error is not None:
+            raise error
+
+    async def wait_for_selector(self, selector, state=None, timeout=None):
+        self._call("wait_for_selector", selector, timeout)
+
+    async def wait_for_load_state(self, state, timeout=None):
+        self._call("wait_for_load_state", state)
+
+    async def evaluate(self, script, args):
+        self._call("evaluate")
+        result = self.evaluate_results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+def test_selector_strategy_returns_when_element_appears():
+    page = FakePage()
+    reason = asyncio.run(wait_until_ready_async(page, {"type": "selector", "selector": "#loginForm", "timeout_ms": 5000}))
+    assert reason == "selector"
+    assert page.calls == [("wait_for_selector", "#loginForm", 5000)]
+
+def test_networkidle_strategy_returns_when_network_is_idle():
+    page = FakePage()
+    reason = asyncio.run(wait_until_ready_async(page, {"type": "networkidle", "timeout_ms": 5000, "extra_delay": (0, 0.01)}))
+    assert reason == "networkidle"
+    assert page.calls == [("wait_for_load_state", "networkidle")]
+
+def test_timeout_falls_back_without_raising():
+    timeout = PlaywrightTimeoutError("Timeout 100ms exceeded")
+    for strategy, fail in (
+        ({"type": "selector", "selector": "#never", "timeout_ms": 100}, {"wait_for_selector": timeout}),
+        ({"type": "networkidle", "timeout_ms": 100}, {"wait_for_load_state": timeout}),
+        ({"type": "dom_quiet", "timeout_ms": 100}, {"wait_for_load_state": timeout}),
+    ):
+        assert asyncio.run(wait_until_ready_async(FakePage(fail=fail), strategy)) == "timeout"
+
+def test_dom_quiet_restarts_after_navigation():
+    page = FakePage(evaluate_results=[PlaywrightError("Execution context was destroyed"), {"reason": "quiet", "elapsed": 1000}])
+    assert asyncio.run(wait_until_ready_async(page, {"type": "dom_quiet", "quiet_ms": 500, "timeout_ms": 5000})) == "quiet"
+    assert [call[0] for call in page.calls] == ["wait_for_load_state", "evaluate", "wait_for_load_state", "evaluate"]
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+요청 차단 테스트
+차단 대상 리소스 종류/호스트는 abort, 문서와 XHR 요청은 continue_ 되고 건수가 집계되는지 확인 (브라우저 없이 가짜 라우트 사용)
+"""
+
+import asyncio
+
+from request_filter import RequestFilter
+
+class FakeFrame:
+    def __init__(self, parent_frame=None):
+        self.parent_frame = parent_frame
+
+class FakeRequest:
+    def __init__(self, url, resource_type, navigation=False, frame=None):
+        self.url = url
+        self.resource_type = resource_type
+        self._navigation = navigation
+        self.frame = frame or FakeFrame()
+
+    def is_navigation_request(self):
+        return self._navigation
+
+class FakeRoute:
+    def __init__(self, request):
+        self.request = request
+        self.result = None
+
+    async def abort(self, error_code=None):
+        self.result = "abort"
+
+    async def continue_(self):
+        self.result = "continue"
+
+RULES = {"resource_types": ["image", "font", "document"], "url_patterns": [r"gitple\.io", r"google-analytics\.com"]}
+
+def test_blocked_requests_are_aborted_and_counted():
+    request_filter = RequestFilter(RULES)
+    requests = {
+        "image": FakeRequest("https://www.kyobobook.co.kr/logo.png", "image"),
+        "font": FakeRequest("https://fonts.gstatic.com/a.woff2", "font"),
+        "widget": FakeRequest("https://widget.gitple.io/app.js", "script"),
+        "beacon": FakeRequest("https://www.google-analytics.com/collect", "xhr"),
+        # 최상위 문서는 규칙에 document가 있어도 허용, iframe 문서는 규칙대로 차단
+        "document": FakeRequest("https://mmbr.kyobobook.co.kr/login", "document", navigation=True),
+        "iframe": FakeRequest("https://ads.example/frame", "document", navigation=True, frame=FakeFrame(FakeFrame())),
+        "xhr": FakeRequest("https://mmbr.kyobobook.co.kr/api/session", "xhr"),
+        "script": FakeRequest("https://mmbr.kyobobook.co.kr/js/app.js", "script"),
+    }
+    routes = {name: FakeRoute(request) for name, request in requests.items()}
+
+    async def handle_all():
+        for route in routes.values():
+            await request_filter.handle_async(route)
+    asyncio.run(handle_all())
+
+    assert {name: route.result for name, route in routes.items()} == {
+        "image": "abort",
+        "font": "abort",
+        "widget": "abort",
+        "beacon": "abort",
+        "document": "continue",
+        "iframe": "abort",
+        "xhr": "continue",
+        "script": "continue",
+    }
+    assert request_filter.stats() == {
+        "allowed": 3,
+        "blocked": 5,
+        "blocked_by_type": {"image": 1, "font": 1, "script": 1, "xhr": 1, "document": 1},
+    }
+
+def test_filter_without_rules_is_not_attached():
+    class FakePage:
+        routed = False
+
+        async def route(self, pattern, handler):
+            self.routed = True
+
+    page = FakePage()
+    asyncio.run(RequestFilter().attach_async(page))
+    assert not page.routed
+    asyncio.run(RequestFilter(RULES).attach_async(page))
+    assert page.routed
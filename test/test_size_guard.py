@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+응답 크기 제한 테스트
+Content-Length나 스트리밍 중 누적된 전송 바이트가 상한을 넘으면 중단 사유를 기록하고 페이지를 닫는지 확인 (브라우저 없이 가짜 페이지/CDP 세션 사용)
+"""
+
+import asyncio
+
+from size_guard import SizeGuard
+
+class FakeEmitter:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+class FakeSession(FakeEmitter):
+    async def send(self, method, params=None):
+        if method == "Page.getFrameTree":
+            return {"frameTree": {"frame": {"id": "main"}}}
+        return {}
+
+class FakeFrame:
+    def __init__(self, parent_frame=None):
+        self.parent_frame = parent_frame
+
+class FakeRequest:
+    def __init__(self, frame):
+        self.frame = frame
+
+    def is_navigation_request(self):
+        return True
+
+class FakeResponse:
+    def __init__(self, headers, frame=None):
+        self.headers = headers
+        self.request = FakeRequest(frame or FakeFrame())
+
+class FakeBrowserType:
+    def __init__(self, name):
+        self.name = name
+
+class FakeBrowser:
+    def __init__(self, name):
+        self.browser_type = FakeBrowserType(name)
+
+class FakeContext:
+    def __init__(self, browser_name):
+        self.browser = FakeBrowser(browser_name)
+        self.session = FakeSession()
+
+    async def new_cdp_session(self, page):
+        return self.session
+
+class FakePage(FakeEmitter):
+    def __init__(self, browser_name="chromium"):
+        super().__init__()
+        self.context = FakeContext(browser_name)
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+def run_guard(max_bytes, events, browser_name="chromium"):
+    """감시를 등록하고 (발생 대상, 이벤트, 값) 목록을 차례로 전달한 뒤 (guard, page) 반환"""
+    async def scenario():
+        page = FakePage(browser_name)
+        guard = SizeGuard(max_bytes)
+        await guard.attach_async(page)
+        for target, event, value in events:
+            emitter = page if target == "page" else page.context.session
+            emitter.handlers[event](value)
+        # 페이지 닫기는 이벤트 핸들러에서 예약되므로 한 번 양보
+        await asyncio.sleep(0)
+        return guard, page
+    return asyncio.run(scenario())
+
+def document(request_id, frame_id="main"):
+    return ("cdp", "Network.responseReceived", {"requestId": request_id, "type": "Document", "frameId": frame_id})
+
+def data(request_id, encoded, decoded):
+    return ("cdp", "Network.dataReceived", {"requestId": request_id, "encodedDataLength": encoded, "dataLength": decoded})
+
+def test_content_length_over_cap_trips_and_closes_page():
+    guard, page = run_guard(1000, [("page", "response", FakeResponse({"content-length": "5000"}))], browser_name="firefox")
+    assert guard.exceeded == "Content-Length 5000"
+    assert page.closed
+    # 하위 프레임 문서와 상한 이하 응답은 무시
+    guard, page = run_guard(1000, [
+        ("page", "response", FakeResponse({"content-length": "5000"}, FakeFrame(FakeFrame()))),
+        ("page", "response", FakeResponse({"content-length": "900"})),
+    ])
+    assert guard.exceeded is None and not page.closed
+
+def test_streamed_bytes_over_cap_trip_and_close_page():
+    guard, page = run_guard(1000, [document("doc"), data("doc", 600, 2000), data("doc", 600, 2000)])
+    assert guard.received == 1200
+    assert guard.exceeded == "수신 1,200 bytes"
+    assert page.closed
+
+def test_streamed_bytes_use_wire_size_of_main_document_only():
+    # 압축 해제 크기(dataLength)가 커도 전송 바이트가 상한 이하면 중단하지 않음
+    guard, page = run_guard(1000, [
+        document("doc"),
+        document("frame", frame_id="child"),
+        data("doc", 400, 4000),
+        data("frame", 5000, 5000),
+        data("image", 5000, 5000),
+    ])
+    assert guard.received == 400
+    assert guard.exceeded is None and not page.closed
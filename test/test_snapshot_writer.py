@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스냅샷 일괄 기록 테스트
+배치 커밋, 스냅샷 외 쓰기의 같은 배치 기록, 실패 격리, WAL 모드에서 읽기/쓰기 동시 진행 확인
+"""
+
+import logging
+import sqlite3
+import threading
+
+import pytest
+
+import database
+from database import setup_database, get_connection, get_latest_snapshot
+from precheck import commit_static_state
+import snapshot_writer
+from snapshot_writer import SnapshotWriter
+
+URL = "https://mmbr.kyobobook.co.kr/login"
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "writer.db")
+    monkeypatch.setattr(database, "DATABASE_PATH", path)
+    setup_database()
+    return path
+
+def test_snapshots_committed_in_batches(db_path):
+    writer = SnapshotWriter(batch_size=10, flush_interval=0.2)
+    futures = [
+        writer.submit(f"{URL}?n={n % 5}", f"h{n}", f"<html>{n}</html>", 13, True, "변경")
+        for n in range(25)
+    ]
+    writer.close()
+
+    assert all(future.result(timeout=5) for future in futures)
+    stats = writer.stats()
+    assert stats["written"] == 25
+    assert stats["failed"] == 0
+    assert 3 <= stats["batches"] <= 25
+    assert stats["max_batch"] <= 10
+    assert stats["queued"] == 0
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0] == 25
+    # 같은 URL은 제출 순서대로 기록되어 마지막 제출이 최신 상태
+    assert get_latest_snapshot(f"{URL}?n=4")["html_content"] == "<html>24</html>"
+
+def test_failed_row_does_not_lose_batch(db_path):
+    writer = SnapshotWriter(batch_size=10, flush_interval=1)
+    good = writer.submit(URL, "h1", "<html>1</html>", 14)
+    bad = writer.submit(None, "h2", "<html>2</html>", 14)
+    writer.close()
+
+    assert good.result(timeout=5)
+    with pytest.raises(sqlite3.IntegrityError):
+        bad.result(timeout=5)
+    assert writer.stats()["failed"] == 1
+    assert get_latest_snapshot(URL)["hash"] == "h1"
+
+def test_other_writes_share_the_batch(db_path):
+    writer = SnapshotWriter(batch_size=10, flush_interval=1)
+    snapshot = writer.submit(URL, "h1", "<html>1</html>", 14)
+    state = writer.submit_write(commit_static_state, URL, {"state": {"etag": "e1", "last_modified": None, "static_hash": "s1"}})
+    writer.close()
+
+    assert snapshot.result(timeout=5)
+    state.result(timeout=5)
+    assert writer.stats()["batches"] == 1
+    assert database.get_http_state(URL)["etag"] == "e1"
+
+def test_connection_error_fails_batch_and_keeps_writer(db_path, monkeypatch):
+    writer = SnapshotWriter(batch_size=10, flush_interval=0.05)
+    original = snapshot_writer.get_connection
+    def broken():
+        raise sqlite3.OperationalError("unable to open database file")
+    monkeypatch.setattr(snapshot_writer, "get_connection", broken)
+    failed = writer.submit(URL, "h1", "<html>1</html>", 14)
+    # 대기열이 비워지므로 flush가 멈추지 않는다
+    writer.flush()
+    with pytest.raises(sqlite3.OperationalError):
+        failed.result(timeout=5)
+
+    monkeypatch.setattr(snapshot_writer, "get_connection", original)
+    saved = writer.submit(URL, "h2", "<html>2</html>", 14)
+    writer.close()
+    assert saved.result(timeout=5)
+    assert writer.stats()["failed"] == 1
+    assert writer.stats()["written"] == 1
+
+def test_close_timeout_is_logged(db_path, monkeypatch, caplog):
+    release = threading.Event()
+    original = snapshot_writer.insert_snapshot
+    def slow(*args, **kwargs):
+        release.wait(5)
+        return original(*args, **kwargs)
+    monkeypatch.setattr(snapshot_writer, "insert_snapshot", slow)
+    writer = SnapshotWriter(batch_size=1, flush_interval=0.05)
+    futures = [writer.submit(URL, f"h{n}", f"<html>{n}</html>", 14) for n in range(3)]
+
+    with caplog.at_level(logging.ERROR):
+        writer.close(timeout=0.1)
+    assert "시간 초과" in caplog.text
+    # 쓰기 스레드는 남은 스냅샷을 계속 기록
+    release.set()
+    assert all(future.result(timeout=5) for future in futures)
+
+def test_readers_not_blocked_by_open_write(db_path):
+    conn = get_connection()
+    assert get_connection() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    writer = sqlite3.connect(db_path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("INSERT INTO http_state (url, static_hash, checked_at) VALUES ('x', 'h', 'now')")
+    try:
+        # 쓰기 트랜잭션이 열려 있어도 다른 연결은 기다리지 않고 커밋된 상태를 읽는다
+        reader = sqlite3.connect(db_path, timeout=0)
+        assert reader.execute("SELECT COUNT(*) FROM http_state").fetchone()[0] == 0
+        reader.close()
+    finally:
+        writer.execute("COMMIT")
+        writer.close()
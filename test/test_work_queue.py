@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite 작업 큐 테스트
+임대의 원자성, 만료된 임대 회수, 실패 재시도, 워커의 임대 연장을 확인
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import database
+import monitor_all_sites
+from work_queue import enqueue_targets, lease_job, complete_job, fail_job, reclaim_expired_leases, queue_counts
+
+TARGETS = [
+    ("교보문고", f"서비스{i}", f"https://example.com/page{i}")
+    for i in range(20)
+]
+
+@pytest.fixture(autouse=True)
+def temp_database(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "queue.db"))
+    database.setup_database()
+
+def test_jobs_leased_in_order_and_completed():
+    run_id = enqueue_targets(TARGETS[:3])
+    urls = []
+    while (job := lease_job(run_id, "w1")) is not None:
+        urls.append(job["url"])
+        assert complete_job(job["id"], "w1")
+    assert urls == [url for _, _, url in TARGETS[:3]]
+    assert queue_counts(run_id)["done"] == 3
+
+def test_concurrent_workers_never_share_a_job():
+    run_id = enqueue_targets(TARGETS)
+    leased = []
+    lock = threading.Lock()
+
+    def worker(name):
+        while (job := lease_job(run_id, name)) is not None:
+            with lock:
+                leased.append(job["id"])
+            complete_job(job["id"], name)
+
+    threads = [threading.Thread(target=worker, args=(f"w{n}",)) for n in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(leased) == sorted(set(leased))
+    assert len(leased) == len(TARGETS)
+
+def test_expired_lease_is_taken_over():
+    run_id = enqueue_targets(TARGETS[:1])
+    job = lease_job(run_id, "dead-worker", lease_seconds=0.01)
+    assert lease_job(run_id, "w2") is None  # 아직 임대 중
+
+    time.sleep(0.05)
+    retaken = lease_job(run_id, "w2")
+    assert retaken["id"] == job["id"]
+    assert retaken["attempts"] == 2
+    # 임대를 잃은 워커의 완료 처리는 무시된다
+    assert not complete_job(job["id"], "dead-worker")
+    assert complete_job(job["id"], "w2")
+
+def test_failed_job_retried_until_max_attempts():
+    run_id = enqueue_targets(TARGETS[:1])
+    for attempt in range(1, 4):
+        job = lease_job(run_id, "w1", max_attempts=3)
+        assert job["attempts"] == attempt
+        fail_job(job["id"], "w1", "오류", max_attempts=3)
+    assert lease_job(run_id, "w1", max_attempts=3) is None
+    assert queue_counts(run_id)["failed"] == 1
+
+def test_reclaim_marks_exhausted_leases_failed():
+    run_id = enqueue_targets(TARGETS[:2])
+    lease_job(run_id, "w1", lease_seconds=0.01, max_attempts=1)
+    lease_job(run_id, "w1", lease_seconds=60, max_attempts=1)
+    time.sleep(0.05)
+    assert reclaim_expired_leases(run_id, max_attempts=1) == 1
+    counts = queue_counts(run_id)
+    assert counts["failed"] == 1
+    assert counts["leased"] == 1
+
+class FakePool:
+    def __init__(self, size=1):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+def run_slow_worker(monkeypatch, tmp_path, run_id, during_crawl):
+    """임대 시간보다 오래 걸리는 가져오기로 워커 하나를 실행 (가져오는 동안 during_crawl 호출)"""
+    crawled = []
+
+    async def slow_crawl(pool, url, tiered):
+        crawled.append(url)
+        await asyncio.sleep(0.3)
+        await asyncio.to_thread(during_crawl)
+        await asyncio.sleep(0.3)
+        return {"initial_html": "<html><p>로그인</p></html>"}
+
+    monkeypatch.setattr(monitor_all_sites, "JOB_LEASE_SECONDS", 0.3)
+    monkeypatch.setattr(monitor_all_sites, "BrowserPool", FakePool)
+    monkeypatch.setattr(monitor_all_sites, "crawl_target", slow_crawl)
+    monkeypatch.setattr(monitor_all_sites, "save_html_to_file", lambda *args: "skipped")
+    monkeypatch.setattr(monitor_all_sites, "setup_logging", lambda: logging.getLogger("test_work_queue"))
+    asyncio.run(monitor_all_sites.run_worker("w1", run_id, str(tmp_path), "000000", tiered=False, poll_interval=0.05))
+    return crawled
+
+def test_worker_renews_lease_while_crawling(tmp_path, monkeypatch):
+    run_id = enqueue_targets(TARGETS[:1])
+    # 임대 시간(0.3초)이 지나도 가져오는 동안은 다른 워커가 가져가지 못함
+    taken = []
+    crawled = run_slow_worker(monkeypatch, tmp_path, run_id, lambda: taken.append(lease_job(run_id, "w2")))
+    assert taken == [None]
+    assert len(crawled) == 1
+    assert queue_counts(run_id)["done"] == 1
+    with sqlite3.connect(database.DATABASE_PATH) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0] == 1
+
+def test_worker_drops_result_after_losing_lease(tmp_path, monkeypatch):
+    run_id = enqueue_targets(TARGETS[:1])
+    stolen = []
+
+    def steal_once():
+        # 첫 시도 중에만 다른 워커가 임대를 가져간 것처럼 변경
+        if not stolen:
+            stolen.append(True)
+            with sqlite3.connect(database.DATABASE_PATH) as conn:
+                conn.execute("UPDATE jobs SET lease_owner = 'w2'")
+    crawled = run_slow_worker(monkeypatch, tmp_path, run_id, steal_once)
+    # 첫 결과는 버려지고, 임대가 만료된 뒤 다시 가져와 한 번만 기록
+    assert len(crawled) == 2
+    with sqlite3.connect(database.DATABASE_PATH) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0] == 1
+        assert conn.execute("SELECT status, attempts FROM jobs").fetchone() == ("done", 2)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite 작업 큐 모듈
+모니터링 대상을 jobs 테이블에 넣고, 여러 워커 프로세스가 임대(lease) 방식으로
+하나씩 가져가 처리합니다. 임대 기간이 지난 작업(워커 비정상 종료 등)은
+다른 워커가 다시 가져갑니다.
+"""
+
+import time
+import uuid
+from datetime import datetime
+
+from config.config import JOB_LEASE_SECONDS
+from database import get_connection
+
+DEFAULT_MAX_ATTEMPTS = 3
+
+def enqueue_targets(targets, run_id=None):
+    """(관계사, 서비스, URL) 목록을 새 실행(run_id)의 작업으로 등록하고 run_id 반환"""
+    run_id = run_id or datetime.now().strftime("%Y%m%d%H%M%S") + "-" + uuid.uuid4().hex[:6]
+    with get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO jobs (run_id, position, company, service, url) VALUES (?, ?, ?, ?, ?)",
+            [(run_id, i, company, service, url) for i, (company, service, url) in enumerate(targets)]
+        )
+    return run_id
+
+def lease_job(run_id, worker_id, lease_seconds=JOB_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    대기 중이거나 임대가 만료된 작업 하나를 원자적으로 임대
+    가져갈 작업이 없으면 None 반환
+    """
+    now = time.time()
+    conn = get_connection()
+    isolation_level = conn.isolation_level
+    try:
+        conn.isolation_level = None
+        # 쓰기 잠금을 먼저 잡아 다른 워커와 같은 작업을 고르지 않도록 한다
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            """
+            SELECT id, company, service, url, attempts FROM jobs
+            WHERE run_id = ? AND attempts < ?
+              AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?))
+            ORDER BY position LIMIT 1
+            """,
+            (run_id, max_attempts, now)
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+            (worker_id, now + lease_seconds, row[0])
+        )
+        conn.execute("COMMIT")
+        return {
+            "id": row[0],
+            "company": row[1],
+            "service": row[2],
+            "url": row[3],
+            "attempts": row[4] + 1
+        }
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        # 재사용되는 연결이므로 닫지 않고 트랜잭션 모드만 되돌린다
+        conn.isolation_level = isolation_level
+
+def renew_lease(job_id, worker_id, lease_seconds=JOB_LEASE_SECONDS):
+    """작업 임대 연장 (다른 워커에게 넘어갔으면 False)"""
+    with get_connection() as conn:
+        cursor = conn.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (time.time() + lease_seconds, job_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+def complete_job(job_id, worker_id):
+    """작업 완료 처리 (다른 워커에게 넘어갔으면 False)"""
+    with get_connection() as conn:
+        cursor = conn.execute(
+            "UPDATE jobs SET status = 'done', lease_expires = NULL, finished_at = ? WHERE id = ? AND lease_owner = ?",
+            (datetime.now().isoformat(), job_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+def fail_job(job_id, worker_id, error, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """작업 실패 처리 - 시도 횟수가 남아 있으면 다시 대기 상태로 돌린다"""
+    with get_connection() as conn:
+        cursor = conn.execute(
+            """
+            UPDATE jobs SET
+                status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                lease_owner = NULL, lease_expires = NULL, last_error = ?,
+                finished_at = CASE WHEN attempts >= ? THEN ? ELSE NULL END
+            WHERE id = ? AND lease_owner = ?
+            """,
+            (max_attempts, str(error), max_attempts, datetime.now().isoformat(), job_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+def reclaim_expired_leases(run_id, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    임대 기간이 지난 작업을 정리하고 정리한 건수 반환
+    재시도 가능한 작업은 대기 상태로, 시도 횟수를 다 쓴 작업은 실패로 표시
+    """
+    with get_connection() as conn:
+        cursor = conn.execute(
+            """
+            UPDATE jobs SET
+                status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                lease_owner = NULL, lease_expires = NULL,
+                last_error = COALESCE(last_error, '임대 만료')
+            WHERE run_id = ? AND status = 'leased' AND lease_expires < ?
+            """,
+            (max_attempts, run_id, time.time())
+        )
+        return cursor.rowcount
+
+def queue_counts(run_id):
+    """실행(run_id)의 상태별 작업 수"""
+    with get_connection() as conn:
+        rows = conn.execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE run_id = ? GROUP BY status",
+            (run_id,)
+        ).fetchall()
+    counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+    counts.update(dict(rows))
+    return counts